@@ -36,11 +36,18 @@ def check_turn(turn, ref):
     return "legal"
 
 
+def run(instrs):
+    """
+    Checks the turn in the last instruction, after the placements before it.
+    """
+    ref = init_ref(instrs[:-1])
+    return check_turn(instrs[-1], ref)
+
+
 if __name__ == "__main__":
     try:
         instrs = json.loads(sys.stdin.read())
-        ref = init_ref(instrs[:-1])
-        result = check_turn(instrs[-1], ref)
+        result = run(instrs)
     except (json.JSONDecodeError, TsuroError) as e:
         print(f"Error: {e}", file=sys.stderr)
         exit(code=1)
@@ -1,6 +1,7 @@
 import argparse
 import sys
 
+from Player.strategy import STRATEGIES
 from Remote import client
 
 
@@ -10,7 +11,18 @@ def parse_args(args):
     parser.add_argument("ip", type=str, help="the ip address to connect to")
     parser.add_argument("name", type=str, help="the name of the user")
     parser.add_argument(
-        "strategy", type=str, choices=["dumb", "second"], help="the name of the strategy"
+        "strategy", type=str, choices=sorted(STRATEGIES), help="the name of the strategy"
+    )
+    parser.add_argument(
+        "--full-state",
+        action="store_true",
+        help="ask for the whole game state every turn, rather than the changes",
+    )
+    parser.add_argument(
+        "--binary", action="store_true", help="ask for messages in the compact binary encoding"
+    )
+    parser.add_argument(
+        "--ponder", action="store_true", help="think during the other players' turns"
     )
     args = parser.parse_args(args)
     return args
@@ -18,4 +30,12 @@ def parse_args(args):
 
 if __name__ == "__main__":
     args = parse_args(sys.argv[1:])
-    client.start_client(args.ip, args.port, args.name, args.strategy)
+    client.start_client(
+        args.ip,
+        args.port,
+        args.name,
+        args.strategy,
+        not args.full_state,
+        "binary" if args.binary else "json",
+        args.ponder,
+    )
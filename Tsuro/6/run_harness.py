@@ -12,7 +12,7 @@ SERVER_PORT = "8000"
 
 
 def start_server():
-    subprocess.call([f"{PATH}/xserver"])
+    subprocess.call([f"{PATH}/xserver", "--games", "1"])
 
 
 def start_client(name: str, strategy: str):
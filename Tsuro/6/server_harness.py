@@ -10,10 +10,18 @@ def parse_args(args):
     parser.add_argument(
         "ip", type=str, nargs="?", default="127.0.0.1", help="the ip address to connect to"
     )
+    parser.add_argument(
+        "--games", type=int, help="the number of games to host before stopping, default: no limit"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="serve the timings of every game over HTTP on this port, default: no metrics",
+    )
     args = parser.parse_args(args)
     return args
 
 
 if __name__ == "__main__":
     args = parse_args(sys.argv[1:])
-    server.start_server(args.ip, args.port)
+    server.start_server(args.ip, args.port, args.games, args.metrics_port)
@@ -0,0 +1,130 @@
+"""
+A compact, append-only log of a game, written by the referee as the game is
+played, and replayed without the players, see :mod:`Admin.replay`.
+
+The log is a text file with a JSON value per line. The first line describes
+the game:
+
+    {"players": [["white", "dumb-0"], ...], "deck": [...], "seed": 4500}
+
+where `players` are the color and name of each player in turn order, and any
+other members are passed in by whoever recorded the game, e.g. its seed. Every
+following line is an event, appended as it happens:
+
+    ["place", [...]]                   a placement, see `Placement.to_list`
+    ["out", "white", "EJECTED", 2]     a player left the game, and the round
+    ["end"]                            the game is over
+"""
+import json
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from Common.board import Board
+from Common.constants import Color, PlayerState
+from Common.placement import Placement, PlacementFactory
+from Common.tiles import Port, Tile
+
+
+PLACE = "place"
+OUT = "out"
+END = "end"
+
+
+class GameRecorder:
+    """Appends the events of a game to a log, see :class:`Admin.referee.Referee`."""
+
+    def __init__(self, stream, **info):
+        """
+        :param stream: the text stream to write the log to
+        :param info: other members of the first line of the log, e.g. the seed
+            the game was dealt with
+        """
+        self.stream = stream
+        self.info = info
+
+    def start(self, turn_order, deck: List[int]):
+        """
+        :param turn_order: the players in turn order, with their colors
+            assigned
+        :param deck: the order tile indices are dealt in
+        """
+        players = [[Color(p.color).value, p.name] for p in turn_order]
+        self._write({"players": players, "deck": deck, **self.info})
+
+    def placed(self, placement: Placement):
+        self._write([PLACE, placement.to_list()])
+
+    def removed(self, color, state: PlayerState, round_number: int):
+        self._write([OUT, Color(color).value, state.name, round_number])
+
+    def end(self):
+        self._write([END])
+        self.stream.flush()
+
+    def _write(self, value):
+        self.stream.write(json.dumps(value, separators=(",", ":")) + "\n")
+
+
+def read_log(stream) -> Tuple[Dict, Iterator[List]]:
+    """
+    :param stream: a text stream of a log written by :class:`GameRecorder`
+    :return: the description of the game, and an iterator over its events
+    """
+    info = json.loads(stream.readline())
+    events = (json.loads(line) for line in stream if line.strip())
+    return info, events
+
+
+class Token(NamedTuple):
+    """Where a player is on a replayed board, as drawn by the observer."""
+
+    color: Color
+    tile: Tile
+    port: Port
+
+
+class Frame(NamedTuple):
+    """The game after a placement, see :func:`replay`."""
+
+    # the number of placements made
+    number: int
+    board: Board
+    tokens: List[Token]
+
+
+def replay(events, stop: Optional[int] = None) -> Iterator[Frame]:
+    """
+    Replays the events of a log, yielding the empty board and then the game
+    after each placement.
+
+    The board, and the tiles on it, are updated in place between frames, so
+    draw each frame before moving on to the next.
+
+    :param events: the events, as returned by :func:`read_log`
+    :param stop: optional, the number of placements to stop after
+    """
+    board = Board()
+    number = 0
+    yield Frame(number, board, [])
+
+    for event in events:
+        if event[0] != PLACE:
+            continue
+        if stop is not None and number >= stop:
+            return
+
+        board.apply(PlacementFactory.create(event[1]))
+        number += 1
+        yield Frame(number, board, _tokens(board))
+
+
+def count_placements(events) -> int:
+    """:return: the number of placements among the events of a log"""
+    return sum(1 for event in events if event[0] == PLACE)
+
+
+def _tokens(board: Board):
+    tokens = []
+    for color in board.starts:
+        tile, port = board.locate(board.player_end(color))
+        tokens.append(Token(color, tile, port))
+    return tokens
@@ -0,0 +1,255 @@
+"""
+Timings and counts of what the referee spends each turn on, see
+:class:`RefereeMetrics`, exported in the Prometheus text format or as JSON.
+
+The phases of a turn are:
+
+- `broadcast`: sending every player the game state
+- `deal`: moving on to the next player and dealing their hand
+- `next_move`: waiting for the player's move, which for a remote player is
+  mostly the time the client takes
+- `validate`: checking the move against the rules, also timed by rule
+- `submit`: placing the tile and moving the players
+- `update_states`: finding which players are out
+
+and, on a server, `drain`: waiting for the game states to be sent.
+"""
+import json
+from bisect import bisect_left
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+
+# upper bounds of the histogram buckets in seconds, from the time a rule
+# takes to the time a remote player has to move
+DEFAULT_BUCKETS = (
+    0.000_01,
+    0.000_025,
+    0.000_05,
+    0.000_1,
+    0.000_25,
+    0.000_5,
+    0.001,
+    0.002_5,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+class Counter:
+    """A count by label value."""
+
+    def __init__(self, name: str, description: str, label: Optional[str] = None):
+        """
+        :param description: what is counted, exported as the HELP line
+        :param label: the name of the label values are counted by, if any
+        """
+        self.name = name
+        self.description = description
+        self.label = label
+        self.values: Dict[Optional[str], float] = {}
+
+    def inc(self, value: Optional[str] = None, amount: float = 1):
+        """
+        :param value: the label value to count, `None` without a label
+        """
+        self.values[value] = self.values.get(value, 0) + amount
+
+    def to_prometheus(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        for value, count in sorted(self.values.items(), key=_by_label):
+            lines.append(f"{self.name}{_labels(self.label, value)} {_number(count)}")
+        return lines
+
+    def to_json(self):
+        return {_key(value): count for value, count in sorted(self.values.items(), key=_by_label)}
+
+
+class Histogram:
+    """A distribution of observed values, by label value, in fixed buckets."""
+
+    def __init__(
+        self, name: str, description: str, label: Optional[str] = None, buckets=DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.description = description
+        self.label = label
+        self.buckets: Tuple[float, ...] = tuple(buckets)
+        # the number of values in each bucket, not cumulative, the last
+        # being the values over the largest bound
+        self.counts: Dict[Optional[str], List[int]] = {}
+        self.sums: Dict[Optional[str], float] = {}
+        self.maxima: Dict[Optional[str], float] = {}
+
+    def observe(self, value: Optional[str], amount: float):
+        """
+        :param value: the label value, `None` without a label
+        :param amount: the observed value, e.g. seconds
+        """
+        counts = self.counts.get(value)
+        if counts is None:
+            counts = self.counts[value] = [0] * (len(self.buckets) + 1)
+            self.sums[value] = 0.0
+            self.maxima[value] = amount
+        counts[bisect_left(self.buckets, amount)] += 1
+        self.sums[value] += amount
+        if amount > self.maxima[value]:
+            self.maxima[value] = amount
+
+    def quantile(self, value: Optional[str], q: float):
+        """
+        Estimates a quantile the way Prometheus does, by interpolating within
+        the bucket it falls in.
+
+        :return: the estimate, or `None` if nothing was observed
+        """
+        counts = self.counts.get(value)
+        if not counts:
+            return None
+
+        rank = q * sum(counts)
+        seen = 0
+        for i, count in enumerate(counts):
+            if count and seen + count >= rank:
+                if i == len(self.buckets):
+                    # over the largest bound, the largest value is the best
+                    # estimate
+                    return self.maxima[value]
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = min(self.buckets[i], self.maxima[value])
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.maxima[value]
+
+    def to_prometheus(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for value, counts in sorted(self.counts.items(), key=_by_label):
+            total = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                total += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _labels(self.label, value, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {total}")
+            labels = _labels(self.label, value)
+            lines.append(f"{self.name}_sum{labels} {_number(self.sums[value])}")
+            lines.append(f"{self.name}_count{labels} {total}")
+        return lines
+
+    def to_json(self):
+        summaries = {}
+        for value, counts in sorted(self.counts.items(), key=_by_label):
+            count = sum(counts)
+            summaries[_key(value)] = {
+                "count": count,
+                "sum": self.sums[value],
+                "mean": self.sums[value] / count,
+                "max": self.maxima[value],
+                "p50": self.quantile(value, 0.5),
+                "p90": self.quantile(value, 0.9),
+                "p99": self.quantile(value, 0.99),
+            }
+        return summaries
+
+
+def _by_label(item):
+    return "" if item[0] is None else item[0]
+
+
+def _key(value):
+    return "" if value is None else value
+
+
+def _labels(label, value, *extra):
+    pairs = [f'{label}="{value}"'] if label is not None and value is not None else []
+    pairs.extend(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metrics:
+    """A set of counters and histograms, exported together."""
+
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, *args, **kwargs) -> Counter:
+        metric = Counter(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, *args, **kwargs) -> Histogram:
+        metric = Histogram(*args, **kwargs)
+        self.metrics.append(metric)
+        return metric
+
+    def to_prometheus(self) -> str:
+        """:return: the metrics in the Prometheus text exposition format"""
+        return "".join(line + "\n" for metric in self.metrics for line in metric.to_prometheus())
+
+    def to_json(self):
+        """
+        :return: the counts of every counter, and the count, sum, mean,
+            maximum and estimated quantiles of every histogram, by label
+        """
+        return {metric.name: metric.to_json() for metric in self.metrics}
+
+    def dumps(self):
+        return json.dumps(self.to_json(), indent=2)
+
+
+class RefereeMetrics(Metrics):
+    """
+    Where the referee spends its time, for any number of games, see
+    :class:`Admin.referee.Referee`.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        super().__init__()
+        self.turns = self.counter("tsuro_turns_total", "Turns played.")
+        self.games = self.counter("tsuro_games_total", "Games played to the end.")
+        self.players_out = self.counter(
+            "tsuro_players_out_total", "Players out of a game, by reason.", "state"
+        )
+        self.rule_violations = self.counter(
+            "tsuro_rule_violations_total", "Moves rejected, by the rule they broke.", "rule"
+        )
+        self.phase_seconds = self.histogram(
+            "tsuro_turn_phase_seconds", "Time spent on each phase of a turn.", "phase", buckets
+        )
+        self.rule_seconds = self.histogram(
+            "tsuro_rule_seconds", "Time spent checking moves against each rule.", "rule", buckets
+        )
+
+    def lap(self, phase: str, start: float) -> float:
+        """
+        Records the time since `start` as spent on the phase.
+
+        :param start: the `time.perf_counter` at the start of the phase
+        :return: the current `time.perf_counter`, to start the next phase
+        """
+        now = perf_counter()
+        self.phase_seconds.observe(phase, now - start)
+        return now
+
+    def rule_checked(self, rule, seconds: float, is_valid: bool):
+        """
+        Records the time a rule took to check a move, see
+        :meth:`Common.rules.CompiledRules.validate_timed`.
+        """
+        name = type(rule).__name__
+        self.rule_seconds.observe(name, seconds)
+        if not is_valid:
+            self.rule_violations.inc(name)
@@ -1,44 +1,86 @@
-from Common.board import *
-from Common.render import *
-from Common.tiles import *
+from Common.board import Board
 
 
 """
 Observer is responsible for rendering the state of the game. This includes the game board,
 displaying which player's turn it is, and showing that player's current hand.
+
+The rendering dependencies, PIL and aggdraw, are imported by `Common.render`,
+which is only imported once something is drawn.
 """
 
 
+class BoardRenderer:
+    """
+    Composes images of the board by pasting the cached tile images, see
+    :func:`Common.render.get_sprites`.
+
+    In incremental mode, the same image is updated on every call, and only the
+    cells that changed since the previous call are pasted again.
+    """
+
+    def __init__(self, incremental=True):
+        from PIL import Image
+
+        from Common.render import HEIGHT, WIDTH
+
+        self.incremental = incremental
+        self.image = Image.new("RGBA", (Board.SIZE * WIDTH, Board.SIZE * HEIGHT), "lightgray")
+        # the (face, tokens) drawn at each cell, by x + y * SIZE
+        self._drawn = [None] * (Board.SIZE * Board.SIZE)
+
+    def render(self, board, players):
+        """
+        :return: the image of the board with the players on it; in
+            incremental mode it is updated by the next call, so copy it to
+            keep it
+        """
+        from Common.render import HEIGHT, WIDTH, get_sprites
+
+        if not self.incremental:
+            self._drawn = [None] * (Board.SIZE * Board.SIZE)
+
+        # the (color, port) of the players on each cell
+        tokens = {}
+        for p in players:
+            if p.tile is not None and p.tile.x is not None:
+                tokens.setdefault((p.tile.x, p.tile.y), []).append((p.color, p.port))
+
+        sprites = get_sprites()
+        for y in range(Board.SIZE):
+            for x in range(Board.SIZE):
+                tile = board.get_tile_at(x, y)
+                face = None if tile is None else tile.face
+                cell_tokens = tuple(tokens.get((x, y), ()))
+
+                drawn = (face, cell_tokens)
+                if self._drawn[x + y * Board.SIZE] == drawn:
+                    continue
+
+                img = sprites.empty if face is None else sprites.face(face, cell_tokens)
+                self.image.paste(img, (x * WIDTH, y * HEIGHT))
+                self._drawn[x + y * Board.SIZE] = drawn
+
+        return self.image
+
+
 # renders the state of the board given the board and its players
-def render_board(board, players, turn=None):
-    # grid is a 2d array, check at [x][y]
+def render_board(board, players, turn=None, renderer=None):
+    """
+    :param renderer: optional, the :class:`BoardRenderer` to draw the board
+        with, e.g., one kept across the turns of a game to only redraw what
+        changed
+    """
+    from PIL import Image
+
+    from Common.render import draw_turn
+
     size = board.SIZE * 100
     background = Image.new("RGBA", (size + 500, size), "lightgray")
-    draw = aggdraw.Draw(background)
-
-    count = 0
-    for i in range(Board.SIZE):
-        for j in range(Board.SIZE):
-            obj_at = board.get_tile_at(i, j)
-            # must check if the object at an x,y position is a tile or None
-            if obj_at is None:
-                count += 1
-                # print("NONE - ")
-                # print(count)
-                img = draw_empty_space()
-                draw = aggdraw.Draw(img)
-            else:
-                player = None
-                for p in players:
-                    if p.tile == obj_at:
-                        player = p
-                        break
-
-                # else, if no players have this tile...
-                img = draw_tile(obj_at, player)
-                draw = aggdraw.Draw(img)
-
-            background.paste(img, (i * 100, j * 100))
+
+    if renderer is None:
+        renderer = BoardRenderer(incremental=False)
+    background.paste(renderer.render(board, players), (0, 0))
 
     if turn is not None:
         img2 = draw_turn(turn)
@@ -46,19 +88,18 @@ def render_board(board, players, turn=None):
         background.paste(img2, (1000, 0))
         background.paste(player_hand, (1000, 150))
 
-    draw.flush()
     return background
 
 
 # renders the hand of the player whose turn it is
 def render_hand(player):
+    from PIL import Image
+
+    from Common.render import get_sprites
+
     hand = Image.new("RGBA", (300, 100), "lightgray")
-    draw = aggdraw.Draw(hand)
     tilenum = 0
     for tile in player.tile_hand:
-        img = draw_tile(tile, None)
-        draw = aggdraw.Draw(img)
-        hand.paste(img, (0, tilenum * 100))
+        hand.paste(get_sprites().face(tile.face), (0, tilenum * 100))
 
-    draw.flush()
     return hand
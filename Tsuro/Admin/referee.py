@@ -1,14 +1,15 @@
 from collections import defaultdict
 from operator import attrgetter
-from typing import DefaultDict, Dict, List, Set, Tuple
+from time import perf_counter
+from typing import DefaultDict, Dict, List, Optional, Tuple
 
 from Common import rules
 from Common.board import Board
-from Common.constants import Color, OutOfBounds, PlayerState
+from Common.constants import Color, PlayerState
 from Common.errors import InvalidGameError
 from Common.placement import Placement
-from Common.tiles import Port, Tile
-from Common.utils import get_coordinates_in_direction
+from Common.rules import CompiledRules
+from Common.tiles import Tile
 from Player.player import Player
 
 
@@ -16,17 +17,47 @@ class Referee:
     MIN_PLAYERS = 3
     MAX_PLAYERS = 5
 
-    def __init__(self, players: List, rules=rules.ALL.copy()):
+    def __init__(
+        self, players: List, rules=rules.ALL.copy(), deck=None, recorder=None, metrics=None
+    ):
+        """
+        :param players: the players, in no particular order
+        :param rules: the rules every move is checked against
+        :param deck: optional, the order tile indices are dealt in, repeated
+            as needed; defaults to every tile in index order
+        :param recorder: optional, the :class:`Admin.gamelog.GameRecorder` to
+            log the game to
+        :param metrics: optional, the :class:`Admin.metrics.RefereeMetrics`
+            to time the phases of every turn, and every rule, with
+        """
         if not (self.MIN_PLAYERS <= len(players) <= self.MAX_PLAYERS):
             raise InvalidGameError(f"Invalid number of players {len(players)}")
 
         self.players: List[Player] = players
-        self.rules: List[rules.Rule] = rules
+        self.rules = rules
+        self.deck: List[int] = list(range(Tile.NUMBER_OF_TILES) if deck is None else deck)
+        self.recorder = recorder
+        self.metrics = metrics
 
         self._assign_turn_order()
         self._assign_colors()
         self._initialize()
 
+        if self.recorder is not None:
+            self.recorder.start(self.turn_order, self.deck)
+
+    @property
+    def rules(self):
+        """
+        The rules every move is checked against, in order. Assign a new list
+        to change them.
+        """
+        return self.validator.rules
+
+    @rules.setter
+    def rules(self, rules):
+        self.validator = CompiledRules(rules)
+
     @property
     def turn(self):
         """
@@ -40,11 +71,45 @@ class Referee:
         :return: true if the turn was run, false if the game is over
         :rtype: bool
         """
+        player = self.start_turn()
+        if player is None:
+            return False
+
+        if self.metrics is None:
+            self.finish_turn(player.next_move())
+            return True
+
+        start = perf_counter()
+        next_move = player.next_move()
+        self.metrics.lap("next_move", start)
+        self.finish_turn(next_move)
+        return True
+
+    def start_turn(self):
+        """
+        Starts a turn: sends every player the game state and deals the hand
+        of the player whose turn it is. Ends the game when no player is
+        active.
+
+        Together with :meth:`finish_turn`, lets the caller ask for the move
+        however it likes, e.g., without blocking on a remote player.
+
+        :return: the player to ask for a move, or `None` if the game is over
+        :rtype: Optional[Player]
+        """
         if len(self.active) == 0:
             for player in self.players:
                 player.receive_game_end(self.dead)
 
-            return False
+            if self.recorder is not None:
+                self.recorder.end()
+            if self.metrics is not None:
+                self.metrics.games.inc()
+            return None
+
+        metrics = self.metrics
+        if metrics is not None:
+            start = perf_counter()
 
         for player in self.players:
             player.receive_gamestate(
@@ -53,16 +118,41 @@ class Referee:
                 self.players,
             )
 
+        if metrics is not None:
+            start = metrics.lap("broadcast", start)
+
         self._change_player_turn()
         self._give_player_tiles(self.turn)
 
-        # prompt the player for their next move, submit it if valid
-        next_move = self._ask_for_move()
+        if metrics is not None:
+            metrics.lap("deal", start)
+            metrics.turns.inc()
+        return self.turn
+
+    def finish_turn(self, next_move: Optional[Placement]):
+        """
+        Finishes the turn started by :meth:`start_turn`: submits the move if
+        it is valid, otherwise ejects the player.
+
+        :param next_move: the move of the player whose turn it is, `None` if
+            they did not submit one
+        """
+        metrics = self.metrics
+        if metrics is None:
+            next_move = self._check_move(next_move)
+            if next_move is not None:
+                self._submit_move(next_move)
+                self._update_player_states()
+            return
+
+        start = perf_counter()
+        next_move = self._check_move(next_move)
+        start = metrics.lap("validate", start)
         if next_move is not None:
             self._submit_move(next_move)
+            start = metrics.lap("submit", start)
             self._update_player_states()
-
-        return True
+            metrics.lap("update_states", start)
 
     def add_placements(self, placements: List[Placement]):
         """
@@ -86,6 +176,7 @@ class Referee:
                 continue
             player.receive_color(color)
             self.players_by_color[color] = player
+        self.colors: Dict[Player, Color] = {p: c for c, p in self.players_by_color.items()}
 
     def _initialize(self):
         """Initializes instance variables."""
@@ -98,8 +189,6 @@ class Referee:
         self.dead: DefaultDict[int, List[Tuple[Player, PlayerState]]] = defaultdict(list)
         # card indices valid for the current turn, assigned to each player
         self.player_cards: DefaultDict[Player, List[int]] = defaultdict(list)
-        # a set of player starting positions, for detecting collisions
-        self.start_positions: Set[Tuple[Tile, Port]] = set()
         # the game board
         self.board = Board()
         # the number of tiles to give the player on each turn
@@ -124,23 +213,21 @@ class Referee:
         """Gives the player whose turn it is their hand."""
         new_hand_indices = []
         for i in range(self.tile_hand_amount):
-            new_hand_indices.append(self.next_tile_index)
-            self.next_tile_index = (self.next_tile_index + 1) % Tile.NUMBER_OF_TILES
+            new_hand_indices.append(self.deck[self.next_tile_index])
+            self.next_tile_index = (self.next_tile_index + 1) % len(self.deck)
 
         self.player_cards[self.turn] = new_hand_indices
         self.turn.receive_tiles([Tile.Builder.build(i).readonly() for i in new_hand_indices])
 
-    def _ask_for_move(self):
+    def _check_move(self, next_move: Optional[Placement]):
         """
-        Prompts the player for their next move.
+        Checks the move of the player whose turn it is.
 
         Ejects the player if they request an illegal move.
 
         :return: the next move, if valid, otherwise, `None`
         :rtype: Optional[Placement]
         """
-        next_move = self.turn.next_move()
-
         if next_move is None:
             self.turn.receive_move_failure("Did not submit a move")
             self._inactivate_player(self.turn, PlayerState.EJECTED)
@@ -152,29 +239,27 @@ class Referee:
             self._inactivate_player(self.turn, PlayerState.EJECTED)
             return None
 
-        for rule in self.rules:
-            is_valid, message = rule.is_valid(next_move, self.board.readonly(), self.turn)
-            if not is_valid:
-                # ejects player from game for an illegal move
-                self.turn.receive_move_failure(message)
-                self._inactivate_player(self.turn, PlayerState.EJECTED)
-                return None
+        if self.metrics is None:
+            is_valid, message = self.validator.validate(next_move, self.board, self.turn)
+        else:
+            is_valid, message = self.validator.validate_timed(
+                next_move, self.board, self.turn, self.metrics.rule_checked
+            )
+        if not is_valid:
+            # ejects player from game for an illegal move
+            self.turn.receive_move_failure(message)
+            self._inactivate_player(self.turn, PlayerState.EJECTED)
+            return None
 
         return next_move
 
     def _submit_move(self, next_move: Placement):
         """Submits the player's next move to the board."""
-        tile = next_move.build_tile()
-        self.board.add_tile(tile, next_move.x, next_move.y)
+        self.board.apply(next_move)
+        if self.recorder is not None:
+            self.recorder.placed(next_move)
         self.turn.receive_move_success()
-
-        player = self.players_by_color[next_move.color]
-        player.tile = tile
-        if next_move.is_initial:
-            self.start_positions.add((tile, next_move.port))
-            player.port = tile.get_exit_port(next_move.port)
-        else:
-            player.port = tile.get_exit_port(player.port.neighbor)
+        self._move_player(self.players_by_color[next_move.color])
 
     def _increment_turn(self):
         """
@@ -196,6 +281,10 @@ class Referee:
         """Removes players from the game for the given reason."""
         self.active = [p for p in self.active if p is not player]
         self.dead[self.round].append((player, reason))
+        if self.recorder is not None:
+            self.recorder.removed(self.colors[player], reason, self.round)
+        if self.metrics is not None:
+            self.metrics.players_out.inc(reason.name)
 
     def _update_player_states(self):
         """Updates the states of all active players."""
@@ -205,6 +294,17 @@ class Referee:
             if state is not PlayerState.ALIVE:
                 self._inactivate_player(player, state)
 
+    def _move_player(self, player: Player):
+        """
+        Moves the player to the end of their path.
+
+        :return: the endpoint at the end of the player's path
+        :rtype: int
+        """
+        end = self.board.player_end(self.colors[player])
+        player.tile, player.port = self.board.locate(end)
+        return end
+
     def _get_player_state(self, player: Player):
         """
         Determines the state of the given player in the game.
@@ -213,27 +313,16 @@ class Referee:
         :rtype: PlayerState
         """
         # short-circuit if the player hasn't made their first move, yet
-        if player.tile is None:
+        if self.colors[player] not in self.board.starts:
             return PlayerState.ALIVE
 
-        adjacent = self.board.get_tile_at(
-            *get_coordinates_in_direction(player.tile.x, player.tile.y, player.port.direction)
-        )
-
-        if adjacent is not None and adjacent is not OutOfBounds:
-            # advance the player onto the adjacent tile and recur
-            player.tile = adjacent
-            player.port = adjacent.get_exit_port(player.port.neighbor)
-            return self._get_player_state(player)
-
-        elif adjacent is OutOfBounds:
-            death_tile = (player.tile, player.port)
+        end = self._move_player(player)
 
-            if death_tile in self.start_positions:
-                # a player has collided if they end at another's start position
-                return PlayerState.COLLIDED
+        if not self.board.is_border_endpoint(end):
+            return PlayerState.ALIVE
 
-            return PlayerState.DEAD
+        if end in self.board.starts.values():
+            # a player has collided if they end at another's start position
+            return PlayerState.COLLIDED
 
-        elif adjacent is None:
-            return PlayerState.ALIVE
+        return PlayerState.DEAD
@@ -0,0 +1,253 @@
+"""
+Exports the games recorded in logs, see :mod:`Admin.gamelog`, as animations
+with a frame after every placement.
+
+    python3 -m Admin.replay logs/game-0.log --out game-0.gif
+    python3 -m Admin.replay logs/*.log --out frames/ --workers 8
+
+Frames are streamed out as they are rendered, so memory use does not grow with
+the length of a game: an animated GIF is written a frame at a time, with only
+the region that changed since the previous frame, and a frame directory gets a
+PNG per frame. With several workers, each worker process replays the log up to
+its own range of frames and renders them, and at most a few ranges are held
+in memory waiting to be written in order.
+"""
+import argparse
+import os
+import sys
+from collections import deque
+from multiprocessing import Pool
+from typing import List
+
+from PIL import GifImagePlugin, Image, ImageChops
+
+from Admin.gamelog import count_placements, read_log, replay
+from Admin.observer import BoardRenderer
+from Common.constants import Color
+from Common.render import HEIGHT, WIDTH, get_sprites
+from Common.tiles import FACES_BY_CODE, Port
+
+
+# the number of frames each worker renders at a time
+CHUNK_SIZE = 8
+
+
+class GifWriter:
+    """
+    Writes an animated GIF a frame at a time.
+
+    Every frame is mapped to the same palette, see :func:`palette`, so frames
+    after the first only hold the rectangle that changed.
+    """
+
+    def __init__(self, stream, duration=500, loop=0):
+        """
+        :param stream: the binary stream to write to
+        :param duration: how long to show each frame, in milliseconds
+        :param loop: the number of times to play the animation, 0 for ever
+        """
+        self.stream = stream
+        self.duration = duration
+        self.loop = loop
+        self.previous = None
+
+    def add(self, im):
+        """
+        Writes the image as the next frame.
+
+        :param im: the image, or the result of :func:`quantize`
+        """
+        frame = im if im.mode == "P" else quantize(im)
+        if self.previous is None:
+            header, _ = GifImagePlugin.getheader(frame, info={"loop": self.loop})
+            self.stream.write(b"".join(header))
+            bbox = (0, 0) + frame.size
+        else:
+            # the palette indices only differ where the frame changed
+            bbox = ImageChops.difference(self.previous, frame).getbbox() or (0, 0, 1, 1)
+
+        data = GifImagePlugin.getdata(frame.crop(bbox), offset=bbox[:2], duration=self.duration)
+        self.stream.write(b"".join(data))
+        self.previous = frame
+
+    def close(self):
+        self.stream.write(b";")
+
+
+_palette = None
+
+
+def palette():
+    """
+    :return: a palette image covering the colors of the rendered board: the
+        background, the tiles, and every player's token
+    """
+    global _palette
+    if _palette is None:
+        sprites = get_sprites()
+        face = FACES_BY_CODE[0]
+        swatch = Image.new("RGB", (WIDTH * (len(Color) + 2), HEIGHT), "lightgray")
+        swatch.paste(sprites.empty, (WIDTH, 0))
+        for i, color in enumerate(Color, 2):
+            swatch.paste(sprites.face(face, ((color, Port.A), (color, Port.C))), (WIDTH * i, 0))
+        _palette = swatch.quantize(colors=256)
+    return _palette
+
+
+def quantize(im):
+    """:return: the image mapped to the shared :func:`palette`"""
+    return im.convert("RGB").quantize(palette=palette(), dither=Image.Dither.NONE)
+
+
+def render_frames(path, start=0, stop=None, scale=1.0):
+    """
+    Replays the log at the given path, yielding the image of each frame from
+    `start` up to `stop`.
+
+    The images are reused between frames, copy them to keep them.
+    """
+    renderer = BoardRenderer()
+    with open(path) as stream:
+        _, events = read_log(stream)
+        for frame in replay(events, stop=None if stop is None else stop - 1):
+            if frame.number < start:
+                continue
+            im = renderer.render(frame.board, frame.tokens)
+            if scale != 1.0:
+                im = im.resize((round(im.width * scale), round(im.height * scale)))
+            yield im
+
+
+def _render_chunk(args):
+    """
+    Renders a range of frames in a worker, either saving them to a directory
+    and returning their paths, or returning them mapped to the shared palette.
+    """
+    path, start, stop, scale, directory = args
+    frames = []
+    for number, im in enumerate(render_frames(path, start, stop, scale), start):
+        if directory is not None:
+            im.save(frame_path(directory, number))
+            frames.append(frame_path(directory, number))
+        else:
+            frames.append(quantize(im))
+    return frames
+
+
+def frame_path(directory, number):
+    return os.path.join(directory, f"frame-{number:03d}.png")
+
+
+def _frames_in_parallel(pool, path, scale, directory, workers):
+    """
+    Renders the frames of a game across the pool, yielding them in order, with
+    at most two ranges of frames per worker in flight.
+    """
+    with open(path) as stream:
+        frames = count_placements(read_log(stream)[1]) + 1
+
+    chunks = iter(range(0, frames, CHUNK_SIZE))
+    pending = deque()
+    while True:
+        while len(pending) < 2 * workers:
+            start = next(chunks, None)
+            if start is None:
+                break
+            args = (path, start, min(start + CHUNK_SIZE, frames), scale, directory)
+            pending.append(pool.apply_async(_render_chunk, (args,)))
+
+        if not pending:
+            return
+        yield from pending.popleft().get()
+
+
+def export(path, out, pool=None, workers=1, scale=1.0, duration=500):
+    """
+    Exports the game recorded in a log.
+
+    :param path: the path of the log
+    :param out: the path of a `.gif` file to write, or of a directory to
+        write a PNG per frame to
+    :param pool: optional, a `multiprocessing.Pool` of `workers` processes to
+        render the frames with
+    :param scale: how much to scale the frames by
+    :param duration: how long to show each frame of a GIF, in milliseconds
+    :return: the number of frames written
+    """
+    directory = None if out.lower().endswith(".gif") else out
+    if directory is not None:
+        os.makedirs(directory, exist_ok=True)
+
+    if pool is not None:
+        frames = _frames_in_parallel(pool, path, scale, directory, workers)
+    else:
+        frames = render_frames(path, scale=scale)
+
+    if directory is not None:
+        count = 0
+        for number, im in enumerate(frames):
+            # frames rendered in the pool are saved by the workers
+            if pool is None:
+                im.save(frame_path(directory, number))
+            count += 1
+        return count
+
+    count = 0
+    with open(out, "wb") as stream:
+        writer = GifWriter(stream, duration=duration)
+        for im in frames:
+            writer.add(im)
+            count += 1
+        writer.close()
+    return count
+
+
+def parse_args(args: List[str]):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("logs", nargs="+", help="the game logs to export")
+    parser.add_argument(
+        "--out",
+        required=True,
+        help="a .gif file, or a directory, for a single log; a directory for several logs",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["gif", "png"],
+        default="gif",
+        help="with several logs, export each as a GIF or a directory of PNG frames",
+    )
+    parser.add_argument("--workers", type=int, default=1, help="the number of worker processes")
+    parser.add_argument("--scale", type=float, default=1.0, help="how much to scale frames by")
+    parser.add_argument(
+        "--duration", type=int, default=500, help="how long to show each frame, in milliseconds"
+    )
+    return parser.parse_args(args)
+
+
+def _outputs(args):
+    """:return: the output path of each log"""
+    if len(args.logs) == 1:
+        return [args.out]
+
+    outputs = []
+    for log in args.logs:
+        name = os.path.splitext(os.path.basename(log))[0]
+        outputs.append(os.path.join(args.out, name + (".gif" if args.format == "gif" else "")))
+    return outputs
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    outputs = _outputs(args)
+    if len(args.logs) > 1:
+        os.makedirs(args.out, exist_ok=True)
+
+    pool = Pool(args.workers) if args.workers > 1 else None
+    try:
+        for log, out in zip(args.logs, outputs):
+            count = export(log, out, pool, args.workers, args.scale, args.duration)
+            print(f"{out}: {count} frames", flush=True)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
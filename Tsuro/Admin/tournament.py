@@ -0,0 +1,254 @@
+"""
+Plays many games of Tsuro between in-process players, across a pool of
+worker processes, and aggregates the results by strategy.
+
+    python3 -m Admin.tournament dumb second --games 1000 --workers 8
+
+With `--logs DIR`, every game is also logged to `DIR/game-<id>.log`, see
+:mod:`Admin.gamelog`, to be exported with :mod:`Admin.replay`.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from functools import partial
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from Admin.gamelog import GameRecorder
+from Admin.referee import Referee
+from Common.constants import PlayerState
+from Common.tiles import Tile
+from Player.player import Player
+from Player.strategy import STRATEGIES
+
+
+class GameSpec(NamedTuple):
+    """A game to play, see :func:`play_game`."""
+
+    game_id: int
+    seed: int
+    # the name of each player's strategy, see `STRATEGIES`
+    strategies: Sequence[str]
+
+
+def play_game(spec: GameSpec, log_dir: Optional[str] = None):
+    """
+    Plays one game to completion.
+
+    The seed decides the turn order and the order tiles are dealt in, so
+    replaying a spec replays the same game.
+
+    :param log_dir: optional, the directory to log the game to
+    :return: a JSON-serializable summary of the game
+    """
+    if log_dir is not None:
+        with open(os.path.join(log_dir, f"game-{spec.game_id}.log"), "w") as stream:
+            return _play_game(spec, GameRecorder(stream, game=spec.game_id, seed=spec.seed))
+    return _play_game(spec)
+
+
+def _play_game(spec: GameSpec, recorder: Optional[GameRecorder] = None):
+    rng = random.Random(spec.seed)
+    seats = list(range(len(spec.strategies)))
+    rng.shuffle(seats)
+    deck = list(range(Tile.NUMBER_OF_TILES))
+    rng.shuffle(deck)
+
+    players = [
+        Player(name=f"{strategy}-{i}", age=seat, strategy=STRATEGIES[strategy]())
+        for i, (strategy, seat) in enumerate(zip(spec.strategies, seats))
+    ]
+    strategies = {player: strategy for player, strategy in zip(players, spec.strategies)}
+
+    start = time.perf_counter()
+    referee = Referee(players, deck=deck, recorder=recorder)
+    turns = 0
+    while referee.run_turn():
+        turns += 1
+    elapsed = time.perf_counter() - start
+
+    # the players that survived the longest win, unless they were ejected
+    last_round = max(
+        (
+            round_number
+            for round_number, deaths in referee.dead.items()
+            if any(state is not PlayerState.EJECTED for _, state in deaths)
+        ),
+        default=None,
+    )
+
+    results = []
+    for round_number, deaths in sorted(referee.dead.items()):
+        for player, state in deaths:
+            results.append(
+                {
+                    "name": player.name,
+                    "strategy": strategies[player],
+                    "state": state.name,
+                    "round": round_number,
+                    "winner": round_number == last_round and state is not PlayerState.EJECTED,
+                }
+            )
+
+    return {
+        "game": spec.game_id,
+        "seed": spec.seed,
+        "turns": turns,
+        "seconds": elapsed,
+        "players": results,
+    }
+
+
+def schedule_games(strategies: Sequence[str], games: int, players: int, seed: int = 0):
+    """
+    Schedules games between players with strategies drawn at random.
+
+    :return: a list of :class:`GameSpec`
+    """
+    rng = random.Random(seed)
+    return [
+        GameSpec(i, rng.getrandbits(32), [rng.choice(strategies) for _ in range(players)])
+        for i in range(games)
+    ]
+
+
+def schedule_pairings(strategies: Sequence[str], players: int, repeat: int = 1, seed: int = 0):
+    """
+    Schedules every combination of the strategies filling the given number
+    of seats, each played `repeat` times with different seeds.
+
+    :return: a list of :class:`GameSpec`
+    """
+    rng = random.Random(seed)
+    pairings = itertools.combinations_with_replacement(strategies, players)
+    return [
+        GameSpec(i, rng.getrandbits(32), list(pairing))
+        for i, pairing in enumerate(p for p in pairings for _ in range(repeat))
+    ]
+
+
+def run_tournament(
+    specs: Iterable[GameSpec], workers: int = None, log_dir: Optional[str] = None
+) -> Iterator[Dict]:
+    """
+    Plays the games, yielding each summary as soon as its game ends.
+
+    :param workers: the number of worker processes; defaults to one per CPU,
+        and 1 plays every game in this process
+    :param log_dir: optional, the directory to log every game to
+    """
+    play = partial(play_game, log_dir=log_dir)
+    if workers == 1:
+        for spec in specs:
+            with quiet_logging():
+                result = play(spec)
+            yield result
+        return
+
+    with Pool(processes=workers, initializer=logging.disable, initargs=(logging.ERROR,)) as pool:
+        yield from pool.imap_unordered(play, specs, chunksize=8)
+
+
+class TournamentStats:
+    """Win and elimination counts by strategy."""
+
+    def __init__(self):
+        self.games = 0
+        self.seconds = 0.0
+        self.by_strategy: Dict[str, Counter] = defaultdict(Counter)
+
+    def add(self, result: Dict):
+        """Adds the summary of a game from :func:`play_game`."""
+        self.games += 1
+        self.seconds += result["seconds"]
+
+        winners = sum(p["winner"] for p in result["players"])
+        for p in result["players"]:
+            counts = self.by_strategy[p["strategy"]]
+            counts["seats"] += 1
+            counts[p["state"].lower()] += 1
+            if p["winner"]:
+                counts["wins"] += 1
+                if winners > 1:
+                    counts["shared_wins"] += 1
+
+    def to_json(self):
+        return {
+            "games": self.games,
+            "seconds": self.seconds,
+            "strategies": {
+                strategy: {**counts, "win_rate": counts["wins"] / counts["seats"]}
+                for strategy, counts in sorted(self.by_strategy.items())
+            },
+        }
+
+
+@contextmanager
+def quiet_logging():
+    """
+    Keeps the players from logging every move and ejection until the block
+    ends, and then logs as before.
+    """
+    previous = logging.root.manager.disable
+    logging.disable(logging.ERROR)
+    try:
+        yield
+    finally:
+        logging.disable(previous)
+
+
+def parse_args(args: List[str]):
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "strategies", nargs="+", choices=sorted(STRATEGIES), help="the strategies to play"
+    )
+    parser.add_argument(
+        "--games", type=int, default=100, help="the number of games to play at random"
+    )
+    parser.add_argument(
+        "--pairings",
+        type=int,
+        metavar="REPEAT",
+        help="play every pairing of the strategies this many times, instead of --games",
+    )
+    parser.add_argument(
+        "--players",
+        type=int,
+        default=Referee.MIN_PLAYERS,
+        choices=range(Referee.MIN_PLAYERS, Referee.MAX_PLAYERS + 1),
+        help="the number of players in each game",
+    )
+    parser.add_argument("--workers", type=int, help="the number of worker processes")
+    parser.add_argument("--seed", type=int, default=0, help="the seed for scheduling games")
+    parser.add_argument(
+        "--results", action="store_true", help="print the summary of every game as it ends"
+    )
+    parser.add_argument("--logs", metavar="DIR", help="log every game to this directory")
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+
+    if args.pairings is not None:
+        specs = schedule_pairings(args.strategies, args.players, args.pairings, args.seed)
+    else:
+        specs = schedule_games(args.strategies, args.games, args.players, args.seed)
+
+    if args.logs is not None:
+        os.makedirs(args.logs, exist_ok=True)
+
+    stats = TournamentStats()
+    for result in run_tournament(specs, args.workers, args.logs):
+        stats.add(result)
+        if args.results:
+            print(json.dumps(result), flush=True)
+
+    print(json.dumps(stats.to_json(), indent=2))
@@ -1,6 +1,8 @@
-from Common.constants import OutOfBounds
-from Common.tiles import ReadOnlyTile
-from Common.utils import get_or_default
+from Common.constants import Direction, OutOfBounds
+from Common.errors import InvalidPlacementError
+from Common.paths import PathEngine
+from Common.tiles import Port, ReadOnlyTile
+from Common.zobrist import player_key, tile_key
 
 
 class Position:
@@ -15,42 +17,289 @@ class Position:
 class Board:
     SIZE = 10
 
+    # The grid is stored as one flat row-major array, padded with a ring of
+    # border cells on every side. Every neighbor of a cell on the board is
+    # therefore a valid index, and walking off the board lands on a border
+    # cell instead of raising or wrapping around.
+    STRIDE = SIZE + 2
+
+    # contents of `Board.cells`; a placed tile is stored as its face code + 1
+    EMPTY = 0
+    BORDER = 0xFF
+
+    # offsets between the index of a cell and the index of its neighbor
+    OFFSETS = {
+        Direction.NORTH: -STRIDE,
+        Direction.EAST: 1,
+        Direction.SOUTH: STRIDE,
+        Direction.WEST: -1,
+    }
+
     def __init__(self):
-        self.grid = [[None for _ in range(Board.SIZE)] for _ in range(Board.SIZE)]
-        self.tiles = set()
+        stride = Board.STRIDE
+        # one byte per cell, see `EMPTY` and `BORDER`
+        self.cells = bytearray(stride * stride)
+        # the tile objects, laid out like `cells`
+        self._tiles = [None] * (stride * stride)
+
+        for i in range(stride):
+            for cell in (i, (stride - 1) * stride + i, i * stride, i * stride + stride - 1):
+                self.cells[cell] = Board.BORDER
+                self._tiles[cell] = OutOfBounds
+
+        # where every open path on the board leads
+        self.paths = _EMPTY_PATHS.copy()
+        # the endpoint off of the board each player entered from, by color
+        self.starts = {}
+        # Zobrist hash of the tiles and the player positions on the board, see
+        # :mod:`Common.zobrist`
+        self.key = 0
+        # undo log of (cell, path engine marker, color of a player that
+        # entered the board with the placement or None, previous key), newest
+        # last
+        self._history = []
+
         self.players = {}
         self.turn = None
         self.round = 0
 
+    @staticmethod
+    def cell_index(x: int, y: int):
+        """
+        :return: the index into `cells` of the given coordinates, only valid
+            for coordinates on the board or one cell off of its edge
+        """
+        return (y + 1) * Board.STRIDE + x + 1
+
+    @staticmethod
+    def cell_coordinates(cell: int):
+        """
+        :return: the x- and y-coordinates of the cell at the given index
+        """
+        y, x = divmod(cell, Board.STRIDE)
+        return x - 1, y - 1
+
+    @property
+    def grid(self):
+        """
+        The tiles on the board as a list of rows, `None` where empty.
+        """
+        stride = Board.STRIDE
+        return [
+            self._tiles[(y + 1) * stride + 1 : (y + 1) * stride + 1 + Board.SIZE]
+            for y in range(Board.SIZE)
+        ]
+
+    @property
+    def tiles(self):
+        """
+        The set of tiles placed on the board.
+        """
+        return {tile for tile in self._tiles if tile is not None and tile is not OutOfBounds}
+
     def set_players(self, players):
         temp = {}
         for player in players:
             temp[player.color] = player.tile
         self.players = temp
 
-    def add_tile(self, tile: ReadOnlyTile, x: int, y: int):
+    def add_tile(self, tile, x: int, y: int):
         """
         Places the tile at the given coordinates.
-        
+
         :param tile: the :class:`Tile` to place
         :param x: the x-coordinate of the tile to be placed, must be in the
             valid range for the board
         :param y: the y-coordinate of the tile to be placed, must be in the
             valid range for the board
+        :raise InvalidPlacementError: if there is a tile at the coordinates
         """
-        self.grid[y][x] = tile
-        self.tiles.add(tile)
+        self._place(tile, x, y)
+
+    def apply(self, placement):
+        """
+        Places the tile of the placement, moving the players on the board.
+
+        The placement can be taken back with :meth:`undo`. Placements are not
+        validated, see :mod:`Common.rules`.
+
+        :param placement: the :class:`Common.placement.Placement` to apply
+        """
+        color = placement.color if placement.is_initial else None
+        self._place(placement.build_tile(), placement.x, placement.y, color)
+        if color is not None:
+            start = self.paths.across(Board.endpoint(placement.x, placement.y, placement.port))
+            self.starts[color] = start
+            self.key ^= player_key(color, self.paths.ends[start])
+
+    def undo(self):
+        """
+        Takes back the most recent placement, whether it was placed with
+        :meth:`add_tile` or :meth:`apply`.
+        """
+        cell, mark, color, self.key = self._history.pop()
+        self.cells[cell] = Board.EMPTY
+        self._tiles[cell] = None
+        self.paths.rollback(mark)
+        if color is not None:
+            del self.starts[color]
+
+    def _place(self, tile, x, y, color=None):
+        cell = (y + 1) * Board.STRIDE + x + 1
+        # the paths and the key only follow placements on empty cells
+        if self.cells[cell] != Board.EMPTY:
+            raise InvalidPlacementError(f"There is already a tile at {x}, {y}")
+        ends = self.paths.ends
+        self._history.append((cell, self.paths.mark(), color, self.key))
+
+        # only the players facing the cell are moved by the placement
+        moved = [c for c, start in self.starts.items() if ends[start] >> 3 == cell]
+        key = self.key ^ tile_key(cell, tile.face.code)
+        for c in moved:
+            key ^= player_key(c, ends[self.starts[c]])
+
+        self.cells[cell] = tile.face.code + 1
+        self._tiles[cell] = tile
+        self.paths.place(cell, tile.face)
         tile.x, tile.y = x, y
 
+        for c in moved:
+            key ^= player_key(c, ends[self.starts[c]])
+        self.key = key
+
+    def track_player(self, color, x: int, y: int, port: Port):
+        """
+        Starts following the path of a player from their current position,
+        for boards that did not see the player's initial placement.
+
+        :param x: the x-coordinate of the tile the player is on
+        :param y: the y-coordinate of the tile the player is on
+        :param port: the port of the tile the player is on
+        """
+        if color in self.starts:
+            self.key ^= player_key(color, self.player_end(color))
+
+        front = self.paths.across(Board.endpoint(x, y, port))
+        # the far end of a player's path is where they entered the board
+        self.starts[color] = self.paths.ends[front]
+        self.key ^= player_key(color, front)
+
+    def player_end(self, color):
+        """
+        :return: the endpoint at the end of the path of the player with the
+            given color
+        """
+        return self.paths.ends[self.starts[color]]
+
+    @property
+    def version(self):
+        """
+        The number of placements in the undo log, see :meth:`placed_since`.
+        """
+        return len(self._history)
+
+    def placed_since(self, version: int):
+        """
+        :param version: an earlier :attr:`version` of the board, with no
+            placement undone since
+        :return: the tiles placed since the board was at that version, oldest
+            first
+        """
+        return [self._tiles[cell] for cell, _, _, _ in self._history[version:]]
+
+    def copy(self):
+        """
+        :return: an independent copy of the board, without its undo log
+        """
+        board = Board.__new__(Board)
+        board.cells = bytearray(self.cells)
+        board._tiles = list(self._tiles)
+        board.paths = self.paths.copy()
+        board.starts = dict(self.starts)
+        board.key = self.key
+        board._history = []
+        board.players = dict(self.players)
+        board.turn = self.turn
+        board.round = self.round
+        return board
+
     def get_tile_at(self, x: int, y: int):
         """
         :return: Tile instance, None, or OutOfBounds
         """
-        return get_or_default(get_or_default(self.grid, y, default=[]), x, default=OutOfBounds)
+        # coordinates one step off the board resolve to the padding
+        if -1 <= x <= Board.SIZE and -1 <= y <= Board.SIZE:
+            return self._tiles[(y + 1) * Board.STRIDE + x + 1]
+        return OutOfBounds
+
+    def get_tile_at_cell(self, cell: int):
+        """
+        :return: Tile instance, None, or OutOfBounds at the given cell index
+        """
+        return self._tiles[cell]
+
+    @staticmethod
+    def endpoint(x: int, y: int, port: Port):
+        """
+        :return: the path endpoint at the given port of the given cell, see
+            :class:`Common.paths.PathEngine`
+        """
+        return ((y + 1) * Board.STRIDE + x + 1) * 8 + port.value
+
+    def path_end(self, endpoint: int):
+        """
+        :return: the endpoint at the other end of the path from the given
+            open endpoint
+        """
+        return self.paths.ends[endpoint]
+
+    def trace(self, face, x: int, y: int, entry_port: Port):
+        """
+        Determines where a path would end if the face was placed on the
+        given empty space, and the path entered it through the given port.
+
+        :param face: the :class:`Common.tiles.TileFace` to place
+        :return: the endpoint at the end of the path
+        """
+        return self.paths.trace((y + 1) * Board.STRIDE + x + 1, face, entry_port)
+
+    def is_border_endpoint(self, endpoint: int):
+        """
+        :return: whether the endpoint lies off of the board, meaning that a
+            path ending there leads off the board
+        """
+        return self.cells[endpoint >> 3] == Board.BORDER
+
+    def locate(self, endpoint: int):
+        """
+        Finds the tile and port a path ends on.
+
+        :param endpoint: the open endpoint at the end of the path, e.g. the
+            result of :meth:`path_end`
+        :return: the tile and the port of the tile facing the endpoint
+        """
+        across = self.paths.across(endpoint)
+        return self._tiles[across >> 3], Port(across & 7)
 
     def readonly(self):
         return ReadOnlyBoard(board=self)
 
+    @classmethod
+    def from_json(cls, json):
+        """
+        :param json: the board as returned by :meth:`ReadOnlyBoard.get_json`
+        :return: a new board with the tiles placed
+        """
+        board = cls()
+        for y, row in enumerate(json):
+            for x, tile in enumerate(row):
+                if tile is not None:
+                    board.add_tile(ReadOnlyTile.json_to_tile(tile), x, y)
+        return board
+
+
+_EMPTY_PATHS = PathEngine(Board.STRIDE, Board.OFFSETS)
+
 
 class ReadOnlyBoard:
     def __init__(self, board):
@@ -66,6 +315,32 @@ class ReadOnlyBoard:
             tile = tile.readonly()
         return tile
 
+    @property
+    def key(self):
+        return self.__board.key
+
+    @property
+    def version(self):
+        return self.__board.version
+
+    def placed_since(self, version: int):
+        return [tile.readonly() for tile in self.__board.placed_since(version)]
+
+    def path_end(self, endpoint: int):
+        return self.__board.path_end(endpoint)
+
+    def trace(self, face, x: int, y: int, entry_port):
+        return self.__board.trace(face, x, y, entry_port)
+
+    def is_border_endpoint(self, endpoint: int):
+        return self.__board.is_border_endpoint(endpoint)
+
+    def copy(self):
+        """
+        :return: a writable copy of the board, e.g. for searching ahead
+        """
+        return self.__board.copy()
+
     def get_json(self):
         # only readonlytile has a get json method right now
         return [
@@ -75,9 +350,4 @@ class ReadOnlyBoard:
 
     @classmethod
     def json_to_board(self, json):
-        board = Board()
-        board.grid = [
-            [ReadOnlyTile.json_to_tile(tile) if tile is not None else None for tile in row]
-            for row in json
-        ]
-        return board.readonly()
+        return Board.from_json(json).readonly()
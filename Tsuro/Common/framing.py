@@ -0,0 +1,118 @@
+"""
+Framing for the messages sent between the server and clients.
+
+Every message is sent as a frame: its length as a 4-byte big-endian
+unsigned integer, followed by that many bytes of payload.
+"""
+import struct
+
+
+HEADER = struct.Struct(">I")
+# frames larger than this are rejected rather than buffered
+MAX_FRAME_SIZE = 1 << 24
+
+
+def encode_frame(payload):
+    """
+    :param payload: the bytes of the message
+    :return: the frame to send
+    :rtype: bytes
+    """
+    return HEADER.pack(len(payload)) + payload
+
+
+def _check_size(size):
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {size} bytes is larger than {MAX_FRAME_SIZE}")
+
+
+class FrameReader:
+    """
+    Reads frames from a blocking socket.
+
+    Data is received straight into a reusable buffer with `recv_into`, so a
+    single read may bring in several frames, or only part of one; frames are
+    returned one at a time as they are completed. The buffer grows to fit the
+    largest frame received.
+    """
+
+    def __init__(self, connection, buffer_size=1 << 16):
+        """
+        :param connection: the socket to read from
+        :param buffer_size: the initial size of the buffer
+        """
+        self.connection = connection
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        # the unread data is buffer[start:end]
+        self.start = 0
+        self.end = 0
+
+    def next_frame(self):
+        """
+        Returns the payload of the next frame, receiving more data as needed.
+
+        The payload is a view into the buffer, and is only valid until the
+        next call.
+
+        :return: the payload, or `None` if the connection was closed
+        :rtype: Optional[memoryview]
+        """
+        while True:
+            available = self.end - self.start
+            if available >= HEADER.size:
+                (size,) = HEADER.unpack_from(self.buffer, self.start)
+                _check_size(size)
+                if available >= HEADER.size + size:
+                    begin = self.start + HEADER.size
+                    self.start = begin + size
+                    return self.view[begin : self.start]
+
+                self._make_room(HEADER.size + size)
+            else:
+                self._make_room(HEADER.size)
+
+            received = self.connection.recv_into(self.view[self.end :])
+            if received == 0:
+                return None
+            self.end += received
+
+    def _make_room(self, frame_size):
+        """
+        Makes sure a frame of the given size, starting with the unread data,
+        fits in the buffer.
+        """
+        if self.start + frame_size <= len(self.buffer):
+            return
+
+        unread = self.end - self.start
+        if frame_size > len(self.buffer):
+            # replaced rather than resized, since the last frame returned may
+            # still be viewing the old buffer
+            buffer = bytearray(max(frame_size, 2 * len(self.buffer)))
+            buffer[:unread] = self.view[self.start : self.end]
+            self.buffer, self.view = buffer, memoryview(buffer)
+        else:
+            # copied first, since the regions may overlap
+            self.buffer[:unread] = bytes(self.view[self.start : self.end])
+        self.start, self.end = 0, unread
+
+
+async def read_frame(reader):
+    """
+    Reads a frame from an `asyncio.StreamReader`.
+
+    :return: the payload, or `None` if the connection was closed
+    :rtype: Optional[bytes]
+    """
+    # imported here, since asyncio is slow to import, and only the server
+    # reads frames asynchronously
+    import asyncio
+
+    try:
+        header = await reader.readexactly(HEADER.size)
+        (size,) = HEADER.unpack(header)
+        _check_size(size)
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError:
+        return None
@@ -0,0 +1,121 @@
+from array import array
+
+from Common.tiles import Port
+
+
+class PathEngine:
+    """
+    Keeps track of where every open path on a board leads.
+
+    Paths are followed between endpoints. An endpoint is a port of a cell,
+    encoded as `cell * 8 + port.value`, where `cell` is an index into
+    :attr:`Common.board.Board.cells`. The open endpoints are the ports of
+    every empty cell, and the ports of the border cells facing the board.
+
+    For every open endpoint, `ends` holds the open endpoint at the other end
+    of its path, so `ends[ends[e]] == e`. On an empty board the path from a
+    port of a cell leads straight across the edge to the adjacent port of
+    its neighbor. Placing a tile joins the paths entering the cell through
+    each pair of connected ports, so finding where a path ends up is a
+    single lookup no matter how many tiles it crosses.
+
+    Every change to `ends` is recorded in `journal`, so placements can be
+    rolled back, see :meth:`mark` and :meth:`rollback`.
+    """
+
+    def __init__(self, stride, offsets):
+        """
+        :param stride: the width of the padded board, including the border
+        :param offsets: a mapping from :class:`Direction` to the difference
+            between the index of a cell and that of its neighbor
+        """
+        # neighbors[endpoint & 7] is added to an endpoint to get the endpoint
+        # on the other side of the edge it faces
+        self.neighbors = tuple(
+            offsets[port.direction] * 8 + port.neighbor.value - port.value for port in Port
+        )
+        self.ends = array("h", [-1]) * (stride * stride * 8)
+        # flat list of (endpoint, previous end) pairs, oldest first
+        self.journal = []
+
+        for y in range(1, stride - 1):
+            for x in range(1, stride - 1):
+                cell = y * stride + x
+                for port in Port:
+                    endpoint = cell * 8 + port.value
+                    across = endpoint + self.neighbors[port.value]
+                    self.ends[endpoint] = across
+                    # the endpoint is on a border cell when it is off the board
+                    self.ends[across] = endpoint
+
+    def copy(self):
+        """
+        :return: an independent copy of this engine
+        """
+        engine = PathEngine.__new__(PathEngine)
+        engine.neighbors = self.neighbors
+        engine.ends = array("h", self.ends)
+        engine.journal = []
+        return engine
+
+    def mark(self):
+        """
+        :return: a marker for the current state, to pass to :meth:`rollback`
+        """
+        return len(self.journal)
+
+    def rollback(self, mark):
+        """
+        Undoes every placement since the given marker was taken.
+        """
+        ends, journal = self.ends, self.journal
+        while len(journal) > mark:
+            previous = journal.pop()
+            ends[journal.pop()] = previous
+
+    def across(self, endpoint):
+        """
+        :return: the endpoint on the other side of the edge the given endpoint
+            faces
+        """
+        return endpoint + self.neighbors[endpoint & 7]
+
+    def place(self, cell, face):
+        """
+        Joins the paths entering the given empty cell through each pair of
+        ports connected by the face.
+        """
+        ends, journal = self.ends, self.journal
+        base = cell * 8
+        for connection in face.connections:
+            end1 = ends[base + connection.port1.value]
+            end2 = ends[base + connection.port2.value]
+
+            if end1 != base + connection.port2.value:
+                journal += (end1, ends[end1], end2, ends[end2])
+                ends[end1] = end2
+                ends[end2] = end1
+            # otherwise, both ports are ends of the same path and placing the
+            # tile closes it into a loop that no player can be on
+
+    def trace(self, cell, face, entry_port):
+        """
+        Follows a path as if the face was placed on the given empty cell,
+        without placing it. The result is meaningless, but still returned,
+        when the cell is not empty.
+
+        :param entry_port: the port the path enters the cell through
+        :return: the endpoint at the end of the path
+        """
+        ends = self.ends
+        base = cell * 8
+        end = ends[base + face.exits[entry_port.value].value]
+        # the path may leave the cell only to enter it again through another
+        # port, continue through the face until it leaves for good; this uses
+        # each connection at most once, unless the path being followed is a
+        # loop, which no player can be on
+        for _ in face.connections:
+            if end >> 3 != cell:
+                break
+            end = ends[base + face.exits[end & 7].value]
+        return end
@@ -47,6 +47,13 @@ class Placement(ABC):
             "y": self.y,
         }
 
+    def to_list(self):
+        """
+        :return: the placement in the list format read by
+            :meth:`PlacementFactory.create`
+        """
+        return [self.color.value, self.index, self.rotation.value, self.x, self.y]
+
 
 class IntermediatePlacement(Placement):
     pass
@@ -71,6 +78,9 @@ class InitialPlacement(Placement):
         json["port"] = self.port.name
         return json
 
+    def to_list(self):
+        return [self.index, self.rotation.value, self.color.value, self.port.name, self.x, self.y]
+
 
 class PlacementFactory:
     @classmethod
@@ -2,7 +2,7 @@ import aggdraw
 from PIL import Image, ImageFont
 
 from Common.constants import Color
-from Common.tiles import Connection, Port, Tile
+from Common.tiles import FACES_BY_CODE, Port, Tile
 
 
 # constants
@@ -63,7 +63,9 @@ def draw_connections(im, connections):
     draw = aggdraw.Draw(im)
     pen = aggdraw.Pen("black", 0.5)
 
-    for c in connections:
+    # in a fixed order, since overlapping curves blend differently depending
+    # on the order they are drawn in, and sets of ports are ordered by hash
+    for c in sorted(connections, key=lambda c: (c.port1.value, c.port2.value)):
         xy1 = port_location(c.port1)
         xy2 = port_location(c.port2)
 
@@ -76,17 +78,20 @@ def draw_connections(im, connections):
     draw.flush()
 
 
-def draw_tile(tile, player):
-    """Draws the tile."""
-    # print("reached real tile")
+def draw_face(face):
+    """Rasterizes a tile face."""
     im = Image.new("RGBA", (WIDTH, HEIGHT), "white")
     draw_base(im)
-    draw_connections(im, tile.connections)
-    if player is not None:
-        draw_token(im, player)
+    draw_connections(im, face.connections)
     return im
 
 
+def draw_tile(tile, player):
+    """Draws the tile."""
+    tokens = () if player is None else ((player.color, player.port),)
+    return get_sprites().face(tile.face, tokens).copy()
+
+
 def draw_empty_space():
     # print("reached")
     im = Image.new("RGBA", (WIDTH, HEIGHT), "white")
@@ -100,21 +105,70 @@ def draw_empty_space():
 # passed a player and a color
 def draw_token(im, player):
     # where im is the already-rendered tile
+    _draw_token(im, player.color, player.port)
+
+
+def _draw_token(im, color, port):
     draw = aggdraw.Draw(im)
-    # print("Has a player")
     # tuple with x and y coords of the point
-    c = get_color(player.color)
+    c = get_color(color)
     pen = aggdraw.Pen("black", 0.5)  # draw border
     brush = aggdraw.Brush(c)  # fill
-    # print(port_location(player.port))
-    # print(isinstance(player.color, str))
 
     bb = lambda xy: bounding_box(*xy, PORT_RADIUS + 5)
-    draw.ellipse(bb(port_location(player.port)), pen, brush)
+    draw.ellipse(bb(port_location(port)), pen, brush)
     draw.flush()
 
 
+class SpriteCache:
+    """
+    Tile images that are rasterized once and then reused: every tile face,
+    the empty cell, and the faces with player tokens on them as they come up.
+
+    The images are shared, copy them before drawing on them.
+    """
+
+    def __init__(self):
+        # faces[face code]
+        self.faces = [draw_face(face) for face in FACES_BY_CODE]
+        self.empty = draw_empty_space()
+        self._tokens = {}
+
+    def face(self, face, tokens=()):
+        """
+        :param face: the :class:`Common.tiles.TileFace` to draw
+        :param tokens: a tuple of the (color, port) of each player on the tile
+        :return: the image of the face, with the tokens on it
+        """
+        if not tokens:
+            return self.faces[face.code]
+
+        key = (face.code, tokens)
+        im = self._tokens.get(key)
+        if im is None:
+            im = self.faces[face.code].copy()
+            for color, port in tokens:
+                _draw_token(im, color, port)
+            self._tokens[key] = im
+        return im
+
+
+_sprites = None
+
+
+def get_sprites():
+    """
+    :return: the :class:`SpriteCache`, rasterized on first use
+    """
+    global _sprites
+    if _sprites is None:
+        _sprites = SpriteCache()
+    return _sprites
+
+
 def get_color(color):
+    # proxies of remote players hold their color's value
+    color = Color(color)
     if color == Color.GREEN:
         return "green"
     if color == Color.BLUE:
@@ -129,7 +183,7 @@ def get_color(color):
 
 def draw_turn(player):
     tile = player.next_move().build_tile()
-    tile_im = draw_tile(tile, None)
+    tile_im = get_sprites().face(tile.face)
 
     im = Image.new("RGBA", (100, 150), "white")
     im.paste(tile_im, (0, 50))
@@ -146,7 +200,7 @@ def draw_turn(player):
 if __name__ == "__main__":
     # with premade tile
     t = Tile.Builder.build(2)
-    img = draw_tile(t)
+    img = draw_tile(t, None)
     img.show()
 
     # with the actual structure- passed a generic tile w no connections yet
@@ -1,6 +1,10 @@
-from abc import ABC, abstractmethod
+from abc import ABC
+from time import perf_counter
+from typing import NamedTuple, Optional
 
 from Common.constants import Direction, OutOfBounds, Rotation
+from Common.placement import InitialPlacement, IntermediatePlacement
+from Common.tiles import FACES, Port
 from Common.utils import get_coordinates_in_direction
 
 
@@ -8,10 +12,106 @@ class InvalidMoveError(Exception):
     pass
 
 
+class MoveFacts:
+    """
+    The facts about a move that rules are checked against.
+
+    Facts are computed once per move and shared by every rule, the costlier
+    ones only when first needed.
+    """
+
+    def __init__(self, next_move, board, player):
+        self.move = next_move
+        self.board = board
+        self.player = player
+
+        self.x, self.y = next_move.x, next_move.y
+        self.is_initial = next_move.is_initial
+        self.is_occupied = board.get_tile_at(self.x, self.y) is not None
+        self.on_border = self.x in (0, board.SIZE - 1) or self.y in (0, board.SIZE - 1)
+
+        if player.tile is None:
+            # the position in front of the player, and the port the player
+            # enters the placed tile through
+            self.front = None
+            self.entry_port = getattr(next_move, "port", None)
+        else:
+            self.front = get_coordinates_in_direction(
+                player.tile.x, player.tile.y, player.port.direction
+            )
+            self.entry_port = player.port.neighbor
+
+        self._neighbors = None
+        self._survives = None
+        self._can_survive = None
+
+    @property
+    def neighbors(self):
+        """
+        The tiles, `None` or `OutOfBounds` next to the space, by direction.
+        """
+        if self._neighbors is None:
+            self._neighbors = {
+                d: self.board.get_tile_at(*get_coordinates_in_direction(self.x, self.y, d))
+                for d in Direction
+            }
+        return self._neighbors
+
+    @property
+    def survives(self):
+        """
+        Whether the player stays on the board after the move.
+        """
+        if self._survives is None:
+            self._survives = self._will_survive(self.move.build_tile().face)
+        return self._survives
+
+    @property
+    def can_survive(self):
+        """
+        Whether any tile in the player's hand, at any rotation, placed on the
+        same space would keep the player on the board.
+        """
+        if self._can_survive is None:
+            self._can_survive = any(
+                self._will_survive(face)
+                for tile in self.player.tile_hand
+                for face in FACES[tile.index]
+            )
+        return self._can_survive
+
+    def _will_survive(self, face):
+        end = self.board.trace(face, self.x, self.y, self.entry_port)
+        return not self.board.is_border_endpoint(end)
+
+
 class Rule(ABC):
-    @abstractmethod
+    """
+    A rule implements :meth:`check`, to share the facts about a move with
+    other rules, see :class:`CompiledRules`, or :meth:`is_valid`.
+    """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.check is Rule.check and cls.is_valid is Rule.is_valid:
+            raise TypeError(f"{cls.__name__} must implement check or is_valid")
+
     def is_valid(self, next_move, board, player):
-        pass
+        """
+        :return: whether the move is valid and, if not, why not
+        :rtype: Tuple[bool, Optional[str]]
+        """
+        return self.check(MoveFacts(next_move, board, player))
+
+    def check(self, facts):
+        """
+        Checks a move, described by its :class:`MoveFacts`, with
+        :meth:`is_valid` unless overridden.
+
+        :return: whether the move is valid and, if not, why not
+        :rtype: Tuple[bool, Optional[str]]
+        """
+        return self.is_valid(facts.move, facts.board, facts.player)
 
 
 class UnoccupiedSpace(Rule):
@@ -19,8 +119,8 @@ class UnoccupiedSpace(Rule):
 
     ERROR_MSG = "space occupied"
 
-    def is_valid(self, next_move, board, player):
-        if board.get_tile_at(next_move.x, next_move.y) is None:
+    def check(self, facts):
+        if not facts.is_occupied:
             return True, None
         else:
             return False, self.ERROR_MSG
@@ -29,59 +129,27 @@ class UnoccupiedSpace(Rule):
 class WillPlayerSurvive(Rule):
     ERROR_MSG = "player does not survive"
 
-    def is_valid(self, next_move, board, player):
-        # has the player at the exit port
-        tile = next_move.build_tile() if player.tile is None else player.tile
-        port = tile.get_exit_port(next_move.port) if player.port is None else player.port
-
-        if self._will_survive(tile, next_move.x, next_move.y, port.neighbor, board):
-            # short circuit if the player's move is valid
+    def check(self, facts):
+        if facts.entry_port is None or facts.is_occupied or facts.survives:
+            # short circuit if the player's move is valid, or this rule does
+            # not apply to it
             return True, None
 
-        x, y = get_coordinates_in_direction(tile.x, tile.y, port.direction)
-
         # otherwise, figure out if they have any survivable moves
-        if any(
-            self._will_survive(t, x, y, port.neighbor, board) for t in self._possible_tiles(player)
-        ):
+        if facts.can_survive:
             return False, self.ERROR_MSG
 
         # there are no survivable moves, allow this one
         return True, None
 
-    def _possible_tiles(self, player):
-        for t in player.tile_hand:
-            for _ in Rotation:
-                t.rotate_by(Rotation.ONE)
-                yield t
-
-    def _will_survive(self, tile, x, y, entry_port, board):
-        exit_port = tile.get_exit_port(entry_port)
-        next_x, next_y = get_coordinates_in_direction(x, y, exit_port.direction)
-        next_tile = board.get_tile_at(next_x, next_y)
-
-        if next_tile is OutOfBounds:
-            # the player moves off the board
-            return False
-        elif next_tile is None:
-            # the player reaches an unoccupied space on the board
-            return True
-        else:
-            return self._will_survive(next_tile, next_x, next_y, exit_port.neighbor, board)
-
 
 class FirstMoveOnBorder(Rule):
     """First move must be placed on border."""
 
     ERROR_MSG = "not_on_border"
 
-    def is_valid(self, next_move, board, player):
-        if next_move.is_initial and not (
-            next_move.x == 0
-            or next_move.x == board.SIZE - 1
-            or next_move.y == 0
-            or next_move.y == board.SIZE - 1
-        ):
+    def check(self, facts):
+        if facts.is_initial and not facts.on_border:
             return False, self.ERROR_MSG
 
         return True, None
@@ -92,12 +160,9 @@ class FirstMoveCheckNeighbors(Rule):
 
     ERROR_MSG = "has neighbor"
 
-    def is_valid(self, next_move, board, player):
-        if next_move.is_initial:
-            for direction in Direction:
-                tile = board.get_tile_at(
-                    *get_coordinates_in_direction(next_move.x, next_move.y, direction)
-                )
+    def check(self, facts):
+        if facts.is_initial:
+            for tile in facts.neighbors.values():
                 if tile is not OutOfBounds and tile is not None:
                     return False, self.ERROR_MSG
 
@@ -109,14 +174,9 @@ class FirstMoveOutsidePort(Rule):
 
     ERROR_MSG = "port not on outside edge"
 
-    def is_valid(self, next_move, board, player):
-        if next_move.is_initial:
-            tile = board.get_tile_at(
-                *get_coordinates_in_direction(next_move.x, next_move.y, next_move.port.direction)
-            )
-
-            if tile is not OutOfBounds:
-                return False, self.ERROR_MSG
+    def check(self, facts):
+        if facts.is_initial and facts.neighbors[facts.move.port.direction] is not OutOfBounds:
+            return False, self.ERROR_MSG
 
         return True, None
 
@@ -124,14 +184,9 @@ class FirstMoveOutsidePort(Rule):
 class IntermediateCheckPlacement(Rule):
     ERROR_MSG = "not adjacent to occupied port"
 
-    def is_valid(self, next_move, board, player):
-        if not next_move.is_initial:
-            correct_x, correct_y = get_coordinates_in_direction(
-                player.tile.x, player.tile.y, player.port.direction
-            )
-
-            if next_move.x != correct_x or next_move.y != correct_y:
-                return False, self.ERROR_MSG
+    def check(self, facts):
+        if not facts.is_initial and facts.front != (facts.x, facts.y):
+            return False, self.ERROR_MSG
 
         return True, None
 
@@ -147,17 +202,71 @@ class InitialPlacementFirstOnly(Rule):
 
     ERROR_MSG = "initial placements are first round only"
 
-    def is_valid(self, next_move, board, player):
+    def check(self, facts):
         if (
-            player.tile is None
-            and not next_move.is_initial
-            or player.tile is not None
-            and next_move.is_initial
+            facts.player.tile is None
+            and not facts.is_initial
+            or facts.player.tile is not None
+            and facts.is_initial
         ):
             return False, self.ERROR_MSG
         return True, None
 
 
+class CompiledRules:
+    """
+    Checks moves against a list of rules, sharing one :class:`MoveFacts`
+    between all of them.
+    """
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        self._checks = tuple(rule.check for rule in self.rules)
+
+    def validate(self, next_move, board, player):
+        """
+        Checks the move against the rules, in order, stopping at the first
+        rule it violates.
+
+        :return: whether the move is valid and, if not, why not
+        :rtype: Tuple[bool, Optional[str]]
+        """
+        facts = MoveFacts(next_move, board, player)
+        for check in self._checks:
+            is_valid, message = check(facts)
+            if not is_valid:
+                return False, message
+        return True, None
+
+    def validate_timed(self, next_move, board, player, record):
+        """
+        Like :meth:`validate`, timing each rule checked.
+
+        Facts shared by several rules are computed by the first rule to need
+        them, and count towards its time.
+
+        :param record: called with each rule checked, the seconds it took,
+            and whether the move passed it
+        """
+        facts = MoveFacts(next_move, board, player)
+        for rule, check in zip(self.rules, self._checks):
+            start = perf_counter()
+            is_valid, message = check(facts)
+            record(rule, perf_counter() - start, is_valid)
+            if not is_valid:
+                return False, message
+        return True, None
+
+    def violations(self, next_move, board, player):
+        """
+        :return: the messages of every rule the move violates, in order
+        :rtype: List[str]
+        """
+        facts = MoveFacts(next_move, board, player)
+        results = (check(facts) for check in self._checks)
+        return [message for is_valid, message in results if not is_valid]
+
+
 ALL = [
     # before other rules, ensure that when an initial placement is used, the
     # player has no tile, and vice-versa
@@ -172,3 +281,102 @@ ALL = [
     # these rules are applicable to intermediate placements only
     IntermediateCheckPlacement(),
 ]
+
+
+class LegalMove(NamedTuple):
+    """A placement allowed by the rules in :data:`ALL`."""
+
+    index: int
+    rotation: Rotation
+    x: int
+    y: int
+    # the starting port, for initial placements only
+    port: Optional[Port] = None
+
+    @property
+    def is_initial(self):
+        return self.port is not None
+
+    def to_placement(self, color):
+        """
+        :param color: the :class:`Color` of the player making the move
+        :return: the :class:`Common.placement.Placement` for this move
+        """
+        if self.is_initial:
+            return InitialPlacement(
+                self.index, self.rotation.value, color.value, self.x, self.y, self.port.name
+            )
+        return IntermediatePlacement(self.index, self.rotation.value, color.value, self.x, self.y)
+
+
+def generate_legal_moves(board, player):
+    """
+    Finds every move the player can make that is allowed by the rules in
+    :data:`ALL`, for every tile in their hand at every rotation.
+
+    This gives the same result as checking each candidate placement against
+    every rule, but checks each position once, rather than once per rule and
+    candidate, and decides whether the player has a survivable alternative
+    once per position rather than once per candidate.
+
+    :param board: the :class:`Common.board.Board` or a read only version
+    :param player: the player, with their hand, tile and port
+    :return: a list of :class:`LegalMove`, ordered by position, then by tile
+        in hand, then by rotation
+    """
+    # a hand can hold the same tile twice, which makes the same moves
+    indices = dict.fromkeys(tile.index for tile in player.tile_hand)
+    faces = [face for index in indices for face in FACES[index]]
+
+    if player.tile is None:
+        moves = []
+        for x, y, port in initial_positions(board):
+            moves.extend(_moves_at(board, faces, x, y, port, port))
+        return moves
+
+    x, y = get_coordinates_in_direction(player.tile.x, player.tile.y, player.port.direction)
+    if board.get_tile_at(x, y) is not None:
+        # the player has left the board, or the space is somehow occupied
+        return []
+
+    return _moves_at(board, faces, x, y, player.port.neighbor, None)
+
+
+def initial_positions(board):
+    """
+    Yields the empty border spaces without neighbors, and the ports facing
+    off of the board on each, see :class:`FirstMoveOnBorder`,
+    :class:`FirstMoveCheckNeighbors` and :class:`FirstMoveOutsidePort`.
+    """
+    last = board.SIZE - 1
+    for y in range(board.SIZE):
+        for x in range(board.SIZE) if y in (0, last) else (0, last):
+            if board.get_tile_at(x, y) is not None:
+                continue
+
+            neighbors = {
+                direction: board.get_tile_at(*get_coordinates_in_direction(x, y, direction))
+                for direction in Direction
+            }
+            if any(t is not None and t is not OutOfBounds for t in neighbors.values()):
+                continue
+
+            for port in Port:
+                if neighbors[port.direction] is OutOfBounds:
+                    yield x, y, port
+
+
+def _moves_at(board, faces, x, y, entry_port, port):
+    """
+    :return: the moves placing each face at the given space which the player
+        survives, or all of them if none are survivable, see
+        :class:`WillPlayerSurvive`
+    """
+    surviving = [
+        face
+        for face in faces
+        if not board.is_border_endpoint(board.trace(face, x, y, entry_port))
+    ]
+    return [
+        LegalMove(face.index, face.rotation, x, y, port) for face in (surviving or faces)
+    ]
@@ -1,6 +1,6 @@
 import enum
 import json
-from copy import deepcopy
+from typing import NamedTuple
 
 from Common.constants import Direction, OutOfBounds, Rotation
 from Common.errors import InvalidTileError
@@ -19,48 +19,109 @@ class Port(enum.Enum):
 
     @classmethod
     def rotated_by(cls, port, rotation):
-        return Port((port.value + rotation.value / 90 * 2) % 8)
+        return _PORTS[(port.value + rotation.value // 90 * 2) % 8]
 
     @property
     def neighbor(self):
-        return {
-            Port.A: Port.F,
-            Port.B: Port.E,
-            Port.C: Port.H,
-            Port.D: Port.G,
-            Port.E: Port.B,
-            Port.F: Port.A,
-            Port.G: Port.D,
-            Port.H: Port.C,
-        }[self]
+        return _NEIGHBORS[self.value]
 
     @property
     def direction(self):
-        return {
-            Port.A: Direction.NORTH,
-            Port.B: Direction.NORTH,
-            Port.C: Direction.EAST,
-            Port.D: Direction.EAST,
-            Port.E: Direction.SOUTH,
-            Port.F: Direction.SOUTH,
-            Port.G: Direction.WEST,
-            Port.H: Direction.WEST,
-        }[self]
-
-
-class Connection:
-    def __init__(self, port1, port2):
-        self.port1 = port1
-        self.port2 = port2
-        self._ports = (port1, port2)
+        return _DIRECTIONS[self.value]
+
+
+# lookup tables for the port properties above, indexed by `Port.value`
+_PORTS = tuple(Port)
+# fmt: off
+_NEIGHBORS = (Port.F, Port.E, Port.H, Port.G, Port.B, Port.A, Port.D, Port.C)
+_DIRECTIONS = (
+    Direction.NORTH, Direction.NORTH,
+    Direction.EAST, Direction.EAST,
+    Direction.SOUTH, Direction.SOUTH,
+    Direction.WEST, Direction.WEST,
+)
+# fmt: on
+
+
+class Connection(NamedTuple):
+    """
+    A path between two ports of a tile. Immutable, so that it can be shared
+    by every tile showing the same face.
+
+    Connections used to be mutable: `rotate_by` rotated one in place, and
+    two connections were only equal if they were the same object. Use
+    :meth:`rotated_by` instead, which returns a new connection; connections
+    between the same ports are now equal and hash alike.
+    """
+
+    port1: Port
+    port2: Port
 
     def __repr__(self):
         return f"({self.port1}, {self.port2})"
 
-    def rotate_by(self, rotation):
-        self.port1 = Port.rotated_by(self.port1, rotation)
-        self.port2 = Port.rotated_by(self.port2, rotation)
-        self._ports = (self.port1, self.port2)
+    @property
+    def _ports(self):
+        """:return: both ports, as the connection used to keep them"""
+        return (self.port1, self.port2)
+
+    def rotated_by(self, rotation):
+        """
+        :return: the connection between the ports after rotating them
+        """
+        return Connection(
+            Port.rotated_by(self.port1, rotation), Port.rotated_by(self.port2, rotation)
+        )
+
+
+class TileFace:
+    """
+    A tile index at one fixed rotation.
+
+    Faces are built once, when this module is imported, and are shared by
+    every :class:`Tile` showing that face. They must never be mutated.
+    """
+
+    __slots__ = ("index", "rotation", "code", "connections", "exits")
+
+    def __init__(self, index, rotation, port_pairs):
+        """
+        :param index: the index of the tile
+        :param rotation: the :class:`Rotation` of this face
+        :param port_pairs: the connected port names at the base rotation, as
+            found in `static/tiles.json`
+        """
+        self.index = index
+        self.rotation = rotation
+        # compact identifier of the face, unique across all faces
+        self.code = index * 4 + rotation.value // 90
+        self.connections = frozenset(
+            Connection(Port[a], Port[b]).rotated_by(rotation) for a, b in port_pairs
+        )
+
+        # exits[port.value] is the port connected to `port`
+        exits = [None] * len(_PORTS)
+        for c in self.connections:
+            exits[c.port1.value], exits[c.port2.value] = c.port2, c.port1
+        self.exits = tuple(exits)
+
+    def __repr__(self):
+        return f"TileFace<index={self.index}, {self.rotation}>"
+
+
+def _load_faces(filename):
+    """
+    Loads every tile at every rotation.
+
+    :return: a tuple indexed by tile index, of tuples indexed by quarter turns
+    """
+    with open(filename) as f:
+        tile_connections = json.load(f)
+
+    return tuple(
+        tuple(TileFace(index, rotation, port_pairs) for rotation in Rotation)
+        for index, port_pairs in enumerate(tile_connections)
+    )
 
 
 class Tile:
@@ -75,39 +136,24 @@ class Tile:
             if index < 0 or index >= Tile.NUMBER_OF_TILES:
                 raise InvalidTileError(f"No such tile with index {index}")
 
-            with open(cls.TILES_FILE) as f:
-                tile_connections = json.load(f)
-
-            # construct the tile
-            connections = (
-                Connection(Port[port_a], Port[port_b])
-                for port_a, port_b in tile_connections[index]
-            )
-            tile = Tile(index=index, connections=connections)
-
-            # rotate the tile
-            if rotation is not Rotation.NONE:
-                tile.rotate_by(rotation)
+            return Tile(face=FACES[index][rotation.value // 90])
 
-            return tile
+    __slots__ = ("__face", "x", "y")
 
-    def __init__(self, index, connections):
+    def __init__(self, face):
         """
         Constructs a tile.
 
-        :param index: the index of the tile being constructed
-        :param connections: the connections for this tile at its base rotation
+        :param face: the :class:`TileFace` the tile is showing
         """
-        # rotation, index, and connections should not be modifiable, these are
-        # set by the builder to avoid tampering with the tile representation
-        self.__index = index
-        self.__connections = set(connections)
-        self.__rotation = Rotation.NONE
+        # the face is shared by every tile with the same index and rotation,
+        # so it is never modified; rotating the tile swaps the face instead
+        self.__face = face
         self.x = None
         self.y = None
 
     def __repr__(self):
-        conns = " ".join(str(c) for c in self.__connections)
+        conns = " ".join(str(c) for c in self.__face.connections)
         return f"Tile<index={self.index}, {conns}>"
 
     def __eq__(self, other):
@@ -118,27 +164,32 @@ class Tile:
 
     @property
     def rotation(self):
-        return self.__rotation
+        return self.__face.rotation
 
     @property
     def index(self):
-        return self.__index
+        return self.__face.index
+
+    @property
+    def face(self):
+        return self.__face
 
     @property
     def connections(self):
-        return deepcopy(self.__connections)
+        """
+        The connections of the tile's face. Connections are immutable, so they
+        are shared rather than copied.
+
+        :rtype: frozenset
+        """
+        return self.__face.connections
 
     def get_exit_port(self, entry_port):
-        for c in self.__connections:
-            if c.port1 is entry_port:
-                return c.port2
-            elif c.port2 is entry_port:
-                return c.port1
+        return self.__face.exits[entry_port.value]
 
     def rotate_by(self, rotation):
-        for c in self.__connections:
-            c.rotate_by(rotation)
-        self.__rotation = Rotation((self.__rotation.value + rotation.value) % 360)
+        turns = (self.__face.rotation.value + rotation.value) // 90 % 4
+        self.__face = FACES[self.__face.index][turns]
 
     def readonly(self):
         return ReadOnlyTile(tile=self)
@@ -162,6 +213,10 @@ class ReadOnlyTile:
     def index(self):
         return self.__tile.index
 
+    @property
+    def face(self):
+        return self.__tile.face
+
     @property
     def connections(self):
         return self.__tile.connections
@@ -204,3 +259,9 @@ class ReadOnlyTile:
         tile.x = json["x"]
         tile.y = json["y"]
         return tile
+
+
+# every tile at every rotation, see `_load_faces`
+FACES = _load_faces(Tile.Builder.TILES_FILE)
+# the same faces, indexed by `TileFace.code`
+FACES_BY_CODE = tuple(face for faces in FACES for face in faces)
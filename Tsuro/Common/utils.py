@@ -1,9 +1,10 @@
 import json
 import logging
 import os
-import sys
 
+from Common import wire
 from Common.constants import Direction
+from Common.framing import encode_frame
 
 
 log = logging.getLogger(__name__)
@@ -50,19 +51,32 @@ def revolve(size, clockwise):
                 curr_y += y_incr
 
 
-def receive_input(connection, max_buffer_size):
-    client_input = connection.recv(max_buffer_size)
-    client_input_size = sys.getsizeof(client_input)
+def encode_message(msg):
+    """
+    Encodes a message to send over a connection, as a frame of JSON.
+
+    :param msg: the JSON-serializable message
+    :rtype: bytes
+    """
+    return encode_frame(json.dumps(msg).encode("utf8"))
 
-    if client_input_size > max_buffer_size:
-        log.warning("The input size is greater than expected {}".format(client_input_size))
 
-    decoded_input = client_input.decode("utf8").rstrip()  # decode and strip end of line
-    result = process_input(decoded_input)
-    return result
+def receive_input(frames):
+    """
+    Reads a message sent with :func:`encode_message`, or encoded with any
+    codec from :mod:`Common.wire`.
+
+    :param frames: the :class:`Common.framing.FrameReader` of the connection
+    :return: the decoded message, or `None` if the connection was closed
+    """
+    payload = frames.next_frame()
+    if payload is None:
+        return None
+
+    return wire.decode(payload)
 
 
 def process_input(input_str):
-    log.info("Processing input received from the client")
+    log.debug("Processing input received from the client")
     result = json.loads(input_str)
     return result
@@ -0,0 +1,372 @@
+"""
+Encodings for the messages sent between the server and clients.
+
+Messages are handled as dicts, as described in `Planning/protocol.md`, and
+encoded with either codec:
+
+- :data:`JSON`, the default, encodes them as JSON objects.
+- :data:`BINARY` packs them with `struct`: a byte for the message type,
+  followed by a byte tagging each member and its packed value. Tiles are
+  packed as a byte for their index and rotation, and a byte for their cell.
+  Members it has no packing for are sent as JSON, under their own tag.
+
+Both codecs encode members separately from the message, so members shared by
+several messages can be encoded once, see :class:`Player.player.SharedGameState`.
+A JSON message always starts with `{`, which is never a binary message type,
+so :func:`decode` tells them apart by the first byte.
+"""
+import json
+import struct
+
+from Common.constants import ClientMessage, Color, PlayerState, ServerMessage
+
+
+class JsonCodec:
+    name = "json"
+
+    def members(self, contents):
+        """
+        :param contents: a dict of message members
+        :return: the encoded members, to pass to :meth:`message`
+        :rtype: bytes
+        """
+        return json.dumps(contents).encode("utf-8")[1:-1]
+
+    def message(self, msg_type, shared=b"", contents=None):
+        """
+        :param msg_type: the `type` of the message
+        :param shared: encoded members from :meth:`members`
+        :param contents: a dict of the other members of the message
+        :return: the encoded message
+        :rtype: bytes
+        """
+        data = json.dumps({**(contents or {}), "type": msg_type}).encode("utf-8")
+        if shared:
+            data = b"{" + shared + b", " + data[1:]
+        return data
+
+    def encode(self, msg):
+        return self.message(msg["type"], contents=msg)
+
+    def decode(self, payload):
+        return json.loads(str(payload, "utf-8"))
+
+
+# the values of the enumerated members, each packed as their index
+_TYPES = tuple(m.value for m in ServerMessage) + tuple(m.value for m in ClientMessage)
+_COLORS = tuple(c.value for c in Color)
+# the names of `Common.tiles.Port`, which can't be imported here since it
+# depends on `Common.utils`, which depends on this
+_PORTS = tuple("ABCDEFGH")
+_STATES = tuple(s.name for s in PlayerState) + ("delta", "full")
+_PLACEMENT_TYPES = ("INITIAL", "INTERMEDIATE")
+
+# packs a missing value
+_NONE = 0xFF
+_NONE16 = 0xFFFF
+_U8 = struct.Struct("B")
+_U16 = struct.Struct(">H")
+_U32 = struct.Struct(">I")
+_TILE = struct.Struct("BB")
+
+_BOARD_SIZE = 10
+
+
+def _pack_u8(out, value):
+    out += _U8.pack(_NONE if value is None else value)
+
+
+def _unpack_u8(data, offset):
+    (value,) = _U8.unpack_from(data, offset)
+    return (None if value == _NONE else value), offset + 1
+
+
+def _pack_u16(out, value):
+    out += _U16.pack(_NONE16 if value is None else value)
+
+
+def _unpack_u16(data, offset):
+    (value,) = _U16.unpack_from(data, offset)
+    return (None if value == _NONE16 else value), offset + 2
+
+
+def _enum(values):
+    """
+    :return: the pack and unpack functions for one of the values, or None
+    """
+    indices = {value: i for i, value in enumerate(values)}
+
+    def pack(out, value):
+        out += _U8.pack(_NONE if value is None else indices[value])
+
+    def unpack(data, offset):
+        (i,) = _U8.unpack_from(data, offset)
+        return (None if i == _NONE else values[i]), offset + 1
+
+    return pack, unpack
+
+
+def _pack_string(out, value):
+    data = value.encode("utf-8")
+    out += _U16.pack(len(data))
+    out += data
+
+
+def _unpack_string(data, offset):
+    (size,) = _U16.unpack_from(data, offset)
+    offset += 2
+    return str(data[offset : offset + size], "utf-8"), offset + size
+
+
+def _pack_tile(out, tile):
+    """Packs a tile, or None, as its face code and cell."""
+    if tile is None:
+        out += _TILE.pack(_NONE, _NONE)
+        return
+    x, y = tile["x"], tile["y"]
+    cell = _NONE if x is None else y * _BOARD_SIZE + x
+    out += _TILE.pack(tile["index"] * 4 + tile["rotation"] // 90, cell)
+
+
+def _unpack_tile(data, offset):
+    code, cell = _TILE.unpack_from(data, offset)
+    if code == _NONE:
+        return None, offset + 2
+    x, y = (None, None) if cell == _NONE else (cell % _BOARD_SIZE, cell // _BOARD_SIZE)
+    return {"index": code // 4, "rotation": code % 4 * 90, "x": x, "y": y}, offset + 2
+
+
+def _list(pack_item, unpack_item):
+    """
+    :return: the pack and unpack functions for a list of up to 255 items
+    """
+
+    def pack(out, items):
+        out += _U8.pack(len(items))
+        for item in items:
+            pack_item(out, item)
+
+    def unpack(data, offset):
+        (n,) = _U8.unpack_from(data, offset)
+        offset += 1
+        items = []
+        for _ in range(n):
+            item, offset = unpack_item(data, offset)
+            items.append(item)
+        return items, offset
+
+    return pack, unpack
+
+
+def _pack_board(out, board):
+    """Packs the rows of a board as a byte per cell, 0 if empty."""
+    for row in board:
+        for tile in row:
+            out += _U8.pack(0 if tile is None else tile["index"] * 4 + tile["rotation"] // 90 + 1)
+
+
+def _unpack_board(data, offset):
+    board = []
+    for y in range(_BOARD_SIZE):
+        row = []
+        for x, code in enumerate(data[offset : offset + _BOARD_SIZE]):
+            code -= 1
+            row.append(
+                None
+                if code < 0
+                else {"index": code // 4, "rotation": code % 4 * 90, "x": x, "y": y}
+            )
+        board.append(row)
+        offset += _BOARD_SIZE
+    return board, offset
+
+
+_pack_color, _unpack_color = _enum(_COLORS)
+_pack_port, _unpack_port = _enum(_PORTS)
+_pack_state, _unpack_state = _enum(_STATES)
+
+
+def _pack_player(out, player):
+    """Packs a player's color, tile, and their port and state in a byte."""
+    _pack_color(out, player["color"])
+    _pack_tile(out, player["tile"])
+    port, state = player["port"], player["state"]
+    port = 0xF if port is None else _PORTS.index(port)
+    state = 0xF if state is None else _STATES.index(state)
+    out += _U8.pack(state << 4 | port)
+
+
+def _unpack_player(data, offset):
+    color, offset = _unpack_color(data, offset)
+    tile, offset = _unpack_tile(data, offset)
+    (byte,) = _U8.unpack_from(data, offset)
+    port, state = byte & 0xF, byte >> 4
+    player = {
+        "color": color,
+        "tile": tile,
+        "port": None if port == 0xF else _PORTS[port],
+        "state": None if state == 0xF else _STATES[state],
+    }
+    return player, offset + 1
+
+
+def _pack_result(out, result):
+    player, state = result
+    _pack_player(out, player)
+    _pack_state(out, state)
+
+
+def _unpack_result(data, offset):
+    player, offset = _unpack_player(data, offset)
+    state, offset = _unpack_state(data, offset)
+    return [player, state], offset
+
+
+_pack_results_round, _unpack_results_round = _list(_pack_result, _unpack_result)
+
+
+def _pack_results(out, results):
+    """Packs the players that died in each round, by round."""
+    out += _U8.pack(len(results))
+    for round_number, deaths in results.items():
+        out += _U16.pack(int(round_number))
+        _pack_results_round(out, deaths)
+
+
+def _unpack_results(data, offset):
+    (n,) = _U8.unpack_from(data, offset)
+    offset += 1
+    results = {}
+    for _ in range(n):
+        (round_number,) = _U16.unpack_from(data, offset)
+        # keys are strings, as they are in JSON
+        results[str(round_number)], offset = _unpack_results_round(data, offset + 2)
+    return results, offset
+
+
+def _pack_rotation(out, rotation):
+    out += _U8.pack(rotation // 90)
+
+
+def _unpack_rotation(data, offset):
+    return data[offset] * 90, offset + 1
+
+
+# the tag of the members packed as JSON, see `BinaryCodec`
+_JSON_TAG = 0
+
+# the members with a packing, in tag order from 1
+_MEMBERS = (
+    ("board", _pack_board, _unpack_board),
+    ("players", *_list(_pack_player, _unpack_player)),
+    ("state", _pack_state, _unpack_state),
+    ("tile", _pack_tile, _unpack_tile),
+    ("port", _pack_port, _unpack_port),
+    ("tiles", *_list(_pack_tile, _unpack_tile)),
+    ("color", _pack_color, _unpack_color),
+    ("version", _pack_u16, _unpack_u16),
+    ("since", _pack_u16, _unpack_u16),
+    ("placements", *_list(_pack_tile, _unpack_tile)),
+    ("results", _pack_results, _unpack_results),
+    ("reason", _pack_string, _unpack_string),
+    ("name", _pack_string, _unpack_string),
+    ("strategy", _pack_string, _unpack_string),
+    ("encoding", _pack_string, _unpack_string),
+    ("placement_type", *_enum(_PLACEMENT_TYPES)),
+    ("index", _pack_u8, _unpack_u8),
+    ("rotation", _pack_rotation, _unpack_rotation),
+    ("x", _pack_u8, _unpack_u8),
+    ("y", _pack_u8, _unpack_u8),
+)
+_PACKERS = {key: (tag, pack) for tag, (key, pack, _) in enumerate(_MEMBERS, 1)}
+_UNPACKERS = {tag: (key, unpack) for tag, (key, _, unpack) in enumerate(_MEMBERS, 1)}
+
+
+class BinaryCodec:
+    name = "binary"
+
+    def members(self, contents):
+        """
+        Packs each member as its tag and value. Members without a packing, or
+        with a value that does not fit it, are packed together as JSON.
+        """
+        out = bytearray()
+        rest = {}
+        for key, value in contents.items():
+            packer = _PACKERS.get(key)
+            if packer is None:
+                rest[key] = value
+                continue
+
+            tag, pack = packer
+            start = len(out)
+            out += _U8.pack(tag)
+            try:
+                pack(out, value)
+            except (KeyError, TypeError, ValueError, IndexError, struct.error):
+                del out[start:]
+                rest[key] = value
+
+        if rest:
+            data = json.dumps(rest).encode("utf-8")
+            out += _U8.pack(_JSON_TAG) + _U32.pack(len(data)) + data
+        return bytes(out)
+
+    def message(self, msg_type, shared=b"", contents=None):
+        members = self.members(contents) if contents else b""
+        return _U8.pack(_TYPES.index(msg_type) + 1) + shared + members
+
+    def encode(self, msg):
+        return self.message(msg["type"], contents={k: v for k, v in msg.items() if k != "type"})
+
+    def decode(self, payload):
+        """
+        :raise ValueError: if the payload is not a binary message, or is cut
+            short
+        """
+        try:
+            return self._decode(memoryview(payload))
+        except (KeyError, TypeError, IndexError, struct.error) as e:
+            raise ValueError(f"Malformed binary message: {e!r}") from e
+
+    def _decode(self, data):
+        if not 1 <= data[0] <= len(_TYPES):
+            raise ValueError(f"Unknown message type {data[0]}")
+        msg = {"type": _TYPES[data[0] - 1]}
+        offset = 1
+        while offset < len(data):
+            tag = data[offset]
+            offset += 1
+            if tag == _JSON_TAG:
+                (size,) = _U32.unpack_from(data, offset)
+                offset += 4
+                msg.update(json.loads(str(data[offset : offset + size], "utf-8")))
+                offset += size
+                continue
+
+            key, unpack = _UNPACKERS[tag]
+            msg[key], offset = unpack(data, offset)
+        if offset > len(data):
+            raise ValueError("Binary message is cut short")
+        return msg
+
+
+JSON = JsonCodec()
+BINARY = BinaryCodec()
+CODECS = {codec.name: codec for codec in (JSON, BINARY)}
+
+
+def codec_of(payload):
+    """
+    :return: the codec the message was encoded with
+    """
+    return JSON if payload[:1] == b"{" else BINARY
+
+
+def decode(payload):
+    """
+    :param payload: a message encoded with either codec
+    :return: the message
+    :rtype: dict
+    """
+    return codec_of(payload).decode(payload)
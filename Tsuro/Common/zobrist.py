@@ -0,0 +1,130 @@
+import random
+import struct
+from collections import OrderedDict
+
+from Common.constants import Color
+from Common.tiles import FACES_BY_CODE
+
+
+# fixed, so that keys are stable between processes and runs
+SEED = 0x7500_2019
+
+# the largest cell and endpoint indices, see :class:`Common.board.Board`
+_MAX_CELLS = 12 * 12
+_MAX_ENDPOINTS = _MAX_CELLS * 8
+
+
+def _random_keys(rng, n):
+    # the same keys as n calls to `getrandbits(64)`, in a fraction of the time
+    data = rng.getrandbits(64 * n).to_bytes(8 * n, "little")
+    return list(struct.unpack(f"<{n}Q", data))
+
+
+_rng = random.Random(SEED)
+# TILE_KEYS[cell * len(FACES_BY_CODE) + face code]
+TILE_KEYS = _random_keys(_rng, _MAX_CELLS * len(FACES_BY_CODE))
+# PLAYER_KEYS[color][endpoint] for the endpoint at the end of a player's path
+PLAYER_KEYS = {color: _random_keys(_rng, _MAX_ENDPOINTS) for color in Color}
+# TURN_KEYS[color] for the player whose turn it is, for searches that cache
+# positions on different players' turns
+TURN_KEYS = dict(zip(Color, _random_keys(_rng, len(Color))))
+del _rng
+
+
+def tile_key(cell, code):
+    """
+    :return: the key of the tile face with the given code at the given cell
+    """
+    return TILE_KEYS[cell * len(FACES_BY_CODE) + code]
+
+
+def player_key(color, endpoint):
+    """
+    :return: the key of the player of the given color at the given endpoint
+    """
+    return PLAYER_KEYS[color][endpoint]
+
+
+class TranspositionTable:
+    """
+    A bounded cache of search results, keyed by :attr:`Common.board.Board.key`.
+
+    Two replacement policies are supported once the table is full:
+
+    - `LRU` evicts the least recently stored or retrieved entry.
+    - `DEPTH` maps each key to one of a fixed number of slots, and keeps
+      whichever of the old and new entry was searched deeper.
+    """
+
+    LRU = "lru"
+    DEPTH = "depth"
+
+    def __init__(self, capacity=1 << 16, policy=LRU):
+        if policy not in (self.LRU, self.DEPTH):
+            raise ValueError(f"Unknown replacement policy {policy}")
+
+        self.capacity = capacity
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self.clear()
+
+    def __len__(self):
+        if self.policy == self.LRU:
+            return len(self._entries)
+        return sum(1 for entry in self._slots if entry is not None)
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def clear(self):
+        # LRU: key -> (depth, value), least recently used first
+        self._entries = OrderedDict()
+        # DEPTH: (key, depth, value) or None per slot
+        self._slots = [None] * self.capacity if self.policy == self.DEPTH else []
+
+    def get(self, key, depth=0):
+        """
+        :param depth: the minimum depth the stored result must have been
+            searched to
+        :return: the stored value, or `None`
+        """
+        entry = self._find(key)
+        if entry is None or entry[0] < depth:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        if self.policy == self.LRU:
+            self._entries.move_to_end(key)
+        return entry[1]
+
+    def store(self, key, value, depth=0):
+        """
+        Stores the result of searching the position with the given key.
+
+        :param depth: how deep the position was searched
+        """
+        if self.policy == self.LRU:
+            self._entries[key] = (depth, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+            return
+
+        slot = key % self.capacity
+        current = self._slots[slot]
+        if current is None or current[0] == key or current[1] <= depth:
+            self._slots[slot] = (key, depth, value)
+
+    def _find(self, key):
+        """
+        :return: the (depth, value) stored for the key, or `None`
+        """
+        if self.policy == self.LRU:
+            return self._entries.get(key)
+
+        entry = self._slots[key % self.capacity]
+        if entry is not None and entry[0] == key:
+            return entry[1:]
+        return None
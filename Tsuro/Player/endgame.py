@@ -0,0 +1,183 @@
+"""
+Solves the end of a game exactly, when the players can reach few enough empty
+spaces that every way the game could go can be searched.
+
+Every placement fills a space the player to move can reach, so a game with a
+few such spaces left is a few turns from its end, however many spaces the
+players were cut off from. Players do not know the deck, so each player after
+the one to move is dealt two random tiles, every tile being as likely, and
+places the face best for them, taking the opponents to play against the
+player solved for. The value of a position is the chance the player solved
+for has of outlasting everyone, counting a tie as half, and is exact under
+this model. Positions are cached by their Zobrist hash and whose turn it is, see
+:mod:`Common.zobrist`.
+"""
+import time
+
+from Common import rules
+from Common.board import Board
+from Common.tiles import FACES
+from Common.zobrist import TURN_KEYS, TranspositionTable
+from Player.search import DISTINCT_FACES, Position
+
+
+class SearchLimitExceeded(Exception):
+    pass
+
+
+class EndgameSolver:
+    """
+    Finds the move with the best chance of outlasting the other players, by
+    searching every way the rest of the game could go, or gives up once it
+    searched too many positions or for too long.
+    """
+
+    def __init__(self, max_reachable=6, node_limit=5000, time_limit=0.5, table=None):
+        """
+        :param max_reachable: the most empty spaces the players can reach to
+            solve with, see :func:`reachable`
+        :param node_limit: the most positions to search per move, `None` for
+            no limit
+        :param time_limit: seconds to search each move for, `None` for no
+            limit
+        :param table: optional, the :class:`TranspositionTable` to cache
+            solved positions in, kept between moves
+        """
+        self.max_reachable = max_reachable
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.table = TranspositionTable(1 << 18) if table is None else table
+        # the positions searched for the last move
+        self.nodes = 0
+        # the color of the player the cached values are for
+        self._color = None
+
+    def applies(self, position: Position):
+        """:return: whether the position is close enough to the end to solve"""
+        return reachable(position) <= self.max_reachable
+
+    def solve(self, player, board):
+        """
+        :return: the best move of the player and its value, or `None` if the
+            position is not an endgame, or could not be solved within the
+            limits
+        """
+        if player.tile is None:
+            return None
+        position = Position.of(player, board)
+        if not self.applies(position) or player.color not in position.alive:
+            return None
+
+        moves = rules.generate_legal_moves(board, player)
+        if not moves:
+            return None
+
+        if player.color is not self._color:
+            self.table.clear()
+            self._color = player.color
+        self._deadline = (
+            None if self.time_limit is None else time.perf_counter() + self.time_limit
+        )
+        self.nodes = 0
+        try:
+            values = [
+                self._after(position, FACES[move.index][move.rotation.value // 90])
+                for move in moves
+            ]
+        except SearchLimitExceeded:
+            return None
+
+        best = max(range(len(moves)), key=values.__getitem__)
+        return moves[best].to_placement(player.color), values[best]
+
+    def _after(self, position, face):
+        """:return: the value of the position after the face is placed"""
+        out = position.play(face)
+        try:
+            if self._color in out:
+                # leaving together with the last of the others is a tie
+                return 0.5 if not position.alive else 0.0
+            if len(position.alive) == 1:
+                return 1.0
+            return self._value(position)
+        finally:
+            position.undo()
+
+    def _value(self, position):
+        """
+        :return: the value of the position for the player solved for, with
+            them and someone else still on the board
+        """
+        if position.board.cells.count(Board.EMPTY) == 1:
+            # filling the last space leaves every path on the border, and
+            # everyone leaves together
+            return 0.5
+
+        key = position.key ^ TURN_KEYS[position.to_move]
+        value = self.table.get(key)
+        if value is not None:
+            return value
+
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchLimitExceeded
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchLimitExceeded
+
+        color = position.to_move
+        maximize = color is self._color
+        choose, bound = (max, 1.0) if maximize else (min, 0.0)
+        # for every tile, whether a face of it keeps the player on the
+        # board, and the value of the best face that the rules allow
+        tiles = []
+        for faces in DISTINCT_FACES:
+            surviving = [face for face in faces if position.survives(color, face)]
+            best = None
+            for face in surviving or faces:
+                value = self._after(position, face)
+                best = value if best is None else choose(best, value)
+                if best == bound:
+                    break
+            tiles.append((bool(surviving), best))
+
+        value = _hand_value(tiles, choose)
+        self.table.store(key, value)
+        return value
+
+
+def reachable(position: Position):
+    """
+    :return: the number of empty spaces a tile can still be placed on: those
+        in front of the players on the board, and those their paths can lead
+        to. A placement only joins the paths entering its space, so the paths
+        from these spaces never reach any other.
+    """
+    board = position.board
+    ends, cells = board.paths.ends, board.cells
+    todo = [position.front(color)[0] for color in position.alive]
+    found = set(todo)
+    while todo:
+        cell = todo.pop()
+        for endpoint in range(cell * 8, cell * 8 + 8):
+            other = ends[endpoint] >> 3
+            if other not in found and cells[other] == Board.EMPTY:
+                found.add(other)
+                todo.append(other)
+    return len(found)
+
+
+def _hand_value(tiles, choose):
+    """
+    :param tiles: whether each tile can keep the player on the board, and the
+        value of its best face
+    :return: the expected value of a hand of two random tiles, the player
+        having to place a face that keeps them on the board if they can
+    """
+    total = 0.0
+    for survives_a, a in tiles:
+        for survives_b, b in tiles:
+            if survives_a == survives_b:
+                total += choose(a, b)
+            else:
+                total += a if survives_a else b
+    return total / len(tiles) ** 2
@@ -0,0 +1,158 @@
+"""
+An opening book for initial placements: how good every face of every tile is
+at every place a player can start, with nothing placed around it.
+
+    python3 -m Player.openings
+
+writes the book to `static/openings.bin`, which strategies look initial
+placements up in, see :func:`candidates`, rather than tracing the path of
+every candidate.
+
+A start is an empty border space with no neighbors, with a port of it facing
+off of the board, see :func:`Common.rules.initial_positions`. As the spaces
+around a start are empty, whether a player survives their initial placement
+depends only on the face placed, and the book has it exactly: an entry is 0
+if the player leaves the board, otherwise 1 plus the number of faces that
+would keep them on the board on their next turn, if nothing else was placed.
+
+The book is a header, then a byte per start and face, by the index of the
+start in :data:`STARTS`, then by :attr:`Common.tiles.TileFace.code`.
+"""
+import argparse
+import sys
+from typing import List, Optional
+
+from Common import rules
+from Common.board import Board
+from Common.constants import Direction
+from Common.tiles import FACES, FACES_BY_CODE, Port, Tile
+from Common.utils import get_coordinates_in_direction, get_static_path
+
+
+MAGIC = b"TSOB"
+VERSION = 1
+BOOK_FILE = get_static_path("openings.bin")
+
+# every start on an empty board, in the order of the book
+STARTS = tuple(rules.initial_positions(Board()))
+_PORTS = tuple(Port)
+
+
+def _constraints():
+    """
+    :return: for every border space, the spaces that must be empty to start
+        on it, itself and its neighbors on the board, and the indices of its
+        starts, in the order of :data:`STARTS`
+    """
+    spaces = {}
+    for i, (x, y, _) in enumerate(STARTS):
+        if (x, y) not in spaces:
+            around = [(x, y)] + [
+                get_coordinates_in_direction(x, y, direction) for direction in Direction
+            ]
+            empty = [(u, v) for u, v in around if 0 <= u < Board.SIZE and 0 <= v < Board.SIZE]
+            spaces[x, y] = (empty, [])
+        spaces[x, y][1].append(i)
+    return tuple(spaces.values())
+
+
+_CONSTRAINTS = _constraints()
+
+
+def build() -> bytes:
+    """:return: the entries of the book"""
+    board = Board()
+    trace, is_border = board.paths.trace, board.is_border_endpoint
+    entries = bytearray()
+    for x, y, port in STARTS:
+        for face in FACES_BY_CODE:
+            end = board.trace(face, x, y, port)
+            if is_border(end):
+                entries.append(0)
+                continue
+
+            board.add_tile(Tile(face), x, y)
+            cell, entry_port = end >> 3, _PORTS[end & 7]
+            safe = sum(not is_border(trace(cell, f, entry_port)) for f in FACES_BY_CODE)
+            board.undo()
+            entries.append(1 + safe)
+    return bytes(entries)
+
+
+def _header():
+    return MAGIC + bytes([VERSION, len(STARTS), len(FACES_BY_CODE)])
+
+
+def write(path=BOOK_FILE):
+    with open(path, "wb") as f:
+        f.write(_header() + build())
+
+
+def load(path=BOOK_FILE) -> bytes:
+    """
+    :return: the entries of the book at the given path
+    :raises ValueError: if the file is not a book for these tiles
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    header = _header()
+    size = len(header) + len(STARTS) * len(FACES_BY_CODE)
+    if not data.startswith(header) or len(data) != size:
+        raise ValueError(f"{path} is not an opening book for these tiles, rebuild it")
+    return data[len(header) :]
+
+
+_book = None
+
+
+def book() -> bytes:
+    """:return: the entries of the book, loaded the first time"""
+    global _book
+    if _book is None:
+        _book = load()
+    return _book
+
+
+def candidates(board, player, limit: Optional[int] = None) -> List[rules.LegalMove]:
+    """
+    Finds the initial placements the player can make, the same ones
+    :func:`Common.rules.generate_legal_moves` does, by looking them up in the
+    book.
+
+    :param limit: optional, the most placements to return
+    :return: the placements, best first, the ones tied in the order of
+        :func:`Common.rules.generate_legal_moves`
+    """
+    entries, faces_per_start = book(), len(FACES_BY_CODE)
+    faces = [face for tile in player.tile_hand for face in FACES[tile.index]]
+
+    scored = []
+    for empty, starts in _CONSTRAINTS:
+        if any(board.get_tile_at(x, y) is not None for x, y in empty):
+            continue
+        for i in starts:
+            base = i * faces_per_start
+            at_start = [(entries[base + face.code], i, face) for face in faces]
+            # placements the player survives, or all of them if none are
+            # survivable, see `WillPlayerSurvive`
+            scored.extend([entry for entry in at_start if entry[0]] or at_start)
+
+    scored.sort(key=lambda entry: -entry[0])
+    moves = []
+    for _, i, face in scored[:limit]:
+        x, y, port = STARTS[i]
+        moves.append(rules.LegalMove(face.index, face.rotation, x, y, port))
+    return moves
+
+
+def parse_args(args: List[str]):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", default=BOOK_FILE, help="where to write the book")
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    write(args.out)
+    print(f"{args.out}: {len(STARTS)} starts, {len(FACES_BY_CODE)} faces")
@@ -0,0 +1,262 @@
+"""
+Spreads the search of a move across a pool of worker processes, for
+strategies that score every candidate move independently.
+
+The pool is started once and kept for every move, see :class:`WorkerPool`.
+Positions and moves are sent to the workers in a compact encoding, see
+:func:`encode` and :func:`encode_moves`, rather than as pickled boards and
+tiles, and every worker scores its share of the candidates in turn until
+its time or number of evaluations runs out. The scores are merged by
+candidate in the process that asked.
+"""
+import os
+import random
+import time
+from typing import List, Tuple
+
+from Common import rules
+from Common.board import Board
+from Common.constants import Color
+from Common.tiles import FACES_BY_CODE, Port, Tile
+from Player import search
+
+
+# seconds of the time limit set aside for sending the tasks and merging the
+# results
+LATENCY = 0.02
+
+_COLORS = tuple(Color)
+_PORTS = tuple(Port)
+# the bit of a player's color byte set while they are in the game
+_ALIVE = 0x80
+
+
+def encode(position: search.Position) -> bytes:
+    """
+    :return: the tiles on the board, a byte per cell, see
+        :attr:`Common.board.Board.cells`, then the player to move, then the
+        end of the path of every player the board follows, by their color,
+        and whether they are still in the game
+    """
+    board = position.board
+    data = bytearray(board.cells)
+    data.append(_COLORS.index(position.to_move))
+    for color in board.starts:
+        end = board.player_end(color)
+        flags = _COLORS.index(color) | (_ALIVE if color in position.alive else 0)
+        data += bytes([flags, end >> 8, end & 0xFF])
+    return bytes(data)
+
+
+def decode(data: bytes) -> search.Position:
+    """:return: the position encoded by :func:`encode`"""
+    size = len(Board().cells)
+    board = Board()
+    for cell, code in enumerate(data[:size]):
+        if code not in (Board.EMPTY, Board.BORDER):
+            x, y = Board.cell_coordinates(cell)
+            board.add_tile(Tile(FACES_BY_CODE[code - 1]), x, y)
+
+    colors = []
+    for i in range(size + 1, len(data), 3):
+        color = _COLORS[data[i] & ~_ALIVE]
+        tile, port = board.locate(data[i + 1] << 8 | data[i + 2])
+        board.track_player(color, tile.x, tile.y, port)
+        if data[i] & _ALIVE:
+            colors.append(color)
+    return search.Position(board, colors, _COLORS[data[size]])
+
+
+def encode_moves(moves: List[rules.LegalMove]) -> bytes:
+    """
+    :return: four bytes per move, the code of its face, its coordinates and
+        its port plus one for initial placements, 0 for others
+    """
+    data = bytearray()
+    for move in moves:
+        code = Tile.Builder.build(move.index, move.rotation).face.code
+        port = _PORTS.index(move.port) + 1 if move.is_initial else 0
+        data += bytes([code, move.x, move.y, port])
+    return bytes(data)
+
+
+def decode_moves(data: bytes) -> List[rules.LegalMove]:
+    """:return: the moves encoded by :func:`encode_moves`"""
+    moves = []
+    for i in range(0, len(data), 4):
+        code, x, y, port = data[i : i + 4]
+        face = FACES_BY_CODE[code]
+        moves.append(
+            rules.LegalMove(face.index, face.rotation, x, y, _PORTS[port - 1] if port else None)
+        )
+    return moves
+
+
+def rollout(position: search.Position, move, rng) -> float:
+    """
+    Makes the move, plays the game out at random, see
+    :func:`Player.search.playout`, and takes every move back.
+
+    :return: the score of the player who made the move, see
+        :func:`Player.search.scores`
+    """
+    color = position.to_move
+    players = set(position.alive + [color])
+    out = position.play_move(move)
+    order = [out] if out else []
+    order += search.playout(position, rng)
+    position.undo()
+    return search.scores(players, order)[color]
+
+
+def _score(task):
+    """
+    Scores the candidates of a task in turn, in a worker.
+
+    :return: the total score and number of evaluations of every candidate
+    """
+    data, moves, indices, deadline, limit, seed, evaluate = task
+    position, moves, rng = decode(data), decode_moves(moves), random.Random(seed)
+
+    totals = [0.0] * len(indices)
+    done = 0
+    while limit is None or done < limit:
+        if deadline is not None and time.time() >= deadline:
+            break
+        k = done % len(indices)
+        totals[k] += evaluate(position, moves[indices[k]], rng)
+        done += 1
+
+    counts = [done // len(indices) + (k < done % len(indices)) for k in range(len(indices))]
+    return indices, totals, counts
+
+
+class WorkerPool:
+    """
+    A pool of worker processes kept between moves, that score the candidate
+    moves of a position in parallel.
+    """
+
+    def __init__(self, workers=None):
+        """
+        :param workers: the number of processes, one per CPU by default, 1
+            scores every move in this process
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+        if self.workers > 1:
+            # imported here, since strategies import this module whether or
+            # not they score moves in parallel, and multiprocessing is slow
+            # to import
+            from multiprocessing import Pool
+
+            self._pool = Pool(processes=self.workers)
+
+    def score(
+        self,
+        position: search.Position,
+        moves: List[rules.LegalMove],
+        time_limit=None,
+        evaluations=None,
+        evaluate=rollout,
+        seed=None,
+    ) -> List[Tuple[float, int]]:
+        """
+        Spreads the moves across the workers, every worker getting a share
+        of them, or a single move if there are fewer moves than workers, and
+        evaluates each in turn.
+
+        :param position: the position the player to move makes the moves in
+        :param time_limit: seconds to score the moves for, `None` for no
+            limit, including :data:`LATENCY`
+        :param evaluations: the number of evaluations across every worker,
+            `None` for no limit
+        :param evaluate: scores a move for the player making it, from the
+            position, the move and a `random.Random`, taking the move back,
+            see :func:`rollout`, and must be picklable
+        :param seed: optional, the seed for the workers' random numbers
+        :return: the total score and number of evaluations of every move,
+            from the workers that finished in time
+        """
+        if time_limit is None and evaluations is None:
+            raise ValueError("Scoring moves needs a time limit or a number of evaluations")
+        # by the wall clock, which every process shares, so that workers
+        # still busy with an earlier task do not run over
+        deadline = None if time_limit is None else time.time() + time_limit
+        stop = None if deadline is None else deadline - LATENCY
+
+        data, encoded, rng = encode(position), encode_moves(moves), random.Random(seed)
+        tasks = [
+            (data, encoded, indices, stop, limit, rng.getrandbits(64), evaluate)
+            for indices, limit in self._shares(len(moves), evaluations)
+            if limit != 0
+        ]
+        if self._pool is None:
+            results = [_score(task) for task in tasks]
+        else:
+            results = self._results(
+                [self._pool.apply_async(_score, (task,)) for task in tasks], deadline
+            )
+
+        merged = [(0.0, 0)] * len(moves)
+        for indices, totals, counts in results:
+            for i, total, count in zip(indices, totals, counts):
+                merged[i] = (merged[i][0] + total, merged[i][1] + count)
+        return merged
+
+    @staticmethod
+    def _results(pending, deadline):
+        """
+        :param pending: the `AsyncResult` of every task sent to the workers
+        :param deadline: the wall clock time to wait for them until, `None`
+            to wait for every one
+        :return: the results of the tasks that finished in time
+        """
+        import multiprocessing
+
+        results = []
+        for result in pending:
+            try:
+                timeout = None if deadline is None else max(deadline - time.time(), 0)
+                results.append(result.get(timeout))
+            except multiprocessing.TimeoutError:
+                # the worker stops at its own deadline, and is not waited for
+                continue
+        return results
+
+    def _shares(self, moves, evaluations):
+        """
+        :return: the indices of the moves of every worker, and how many
+            times it evaluates them, `None` for no limit, so that every move
+            is evaluated as many times as the others, give or take one
+        """
+        if moves >= self.workers:
+            tasks = [list(range(t, moves, self.workers)) for t in range(self.workers)]
+        else:
+            tasks = [[t % moves] for t in range(self.workers)]
+        if evaluations is None:
+            return [(indices, None) for indices in tasks]
+
+        limits = [0] * len(tasks)
+        for i in range(moves):
+            share = evaluations // moves + (i < evaluations % moves)
+            holders = [t for t, indices in enumerate(tasks) if i in indices]
+            for j, t in enumerate(holders):
+                limits[t] += share // len(holders) + (j < share % len(holders))
+        return list(zip(tasks, limits))
+
+    def close(self):
+        """Stops the workers."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __del__(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,11 +1,12 @@
-import json
 import logging
 from abc import ABC, abstractmethod
 
+from Common import wire
 from Common.constants import ClientMessage, ServerMessage
+from Common.framing import encode_frame, read_frame
 from Common.logging import XSERVER_LOGGER_NAME
 from Common.placement import PlacementFactory
-from Common.utils import receive_input
+from Player.ponder import Ponderer
 from Player.strategy import Dumb
 
 
@@ -66,11 +67,70 @@ class AbstractPlayer(ABC):
         pass
 
 
+class SharedGameState:
+    """
+    The parts of the game state messages that are the same for every player
+    in a game, encoded once per turn and spliced into each player's message.
+    """
+
+    def __init__(self):
+        self.turn = 0
+        self._values = {}
+
+    def new_turn(self):
+        """Forgets everything encoded for the last turn."""
+        self.turn += 1
+        self._values.clear()
+
+    def get(self, key, build):
+        """
+        :param build: called without arguments to build the value, the first
+            time the key is asked for this turn
+        :return: the value for the key
+        """
+        value = self._values.get(key)
+        if value is None:
+            value = self._values[key] = build()
+        return value
+
+
 class ProxyPlayer(AbstractPlayer):
-    def __init__(self, name, age, connection, buffer_size):
+    """
+    A player on the other end of a connection to the server.
+
+    Messages to the client are written to the stream without waiting, the
+    server drains them between turns. Only :meth:`next_move` waits on the
+    client, so it is a coroutine, see :meth:`Admin.referee.Referee.start_turn`.
+    """
+
+    # seconds the client has to submit a move before being ejected
+    MOVE_TIMEOUT = 30
+    # in delta mode, every this many game states is sent in full
+    SNAPSHOT_INTERVAL = 16
+
+    def __init__(self, name, age, reader, writer, delta=False, shared=None, codec=wire.JSON):
+        """
+        :param reader: the `asyncio.StreamReader` of the connection
+        :param writer: the `asyncio.StreamWriter` of the connection
+        :param delta: whether the client asked for game states as the changes
+            since the last one, see `Planning/protocol.md`
+        :param shared: optional, the :class:`SharedGameState` of the game,
+            otherwise every message is encoded on its own
+        :param codec: the codec the client asked for, from :mod:`Common.wire`
+        """
         super().__init__(name, age)
-        self.connection = connection
-        self.MAX_BUFFER_SIZE = buffer_size
+        self.reader = reader
+        self.writer = writer
+        self.delta = delta
+        self.shared = shared
+        self.codec = codec
+        # in delta mode, the board version, players and turn of the shared
+        # state the client was last sent, and the number of deltas sent since
+        # the last snapshot
+        self.version = None
+        self.sent_players = {}
+        self.sent_turn = None
+        self.deltas = 0
 
     def receive_game_end(self, results):
         self._send_msg(
@@ -86,13 +146,31 @@ class ProxyPlayer(AbstractPlayer):
     def receive_move_failure(self, msg):
         self._send_msg(ServerMessage.EJECTED, reason=msg)
 
-    def next_move(self):
-        self._send_msg(
-            ServerMessage.ASK_FOR_MOVE,
-            board=self.board,
-            tiles=[t.get_json() for t in self.tile_hand],
-        )
-        msg = self._recv_msg()
+    def eject(self, reason):
+        """Tells the client they were ejected, and closes the connection."""
+        self._send_msg(ServerMessage.EJECTED, reason=reason)
+        self.writer.close()
+
+    async def next_move(self):
+        # imported here, since the referee and the harnesses import this module
+        # for `Player`, and asyncio is slow to import
+        import asyncio
+
+        tiles = [t.get_json() for t in self.tile_hand]
+        if self.delta:
+            # the board was sent with the game state at the start of the turn
+            self._send_msg(ServerMessage.ASK_FOR_MOVE, version=self.version, tiles=tiles)
+        else:
+            self._send_msg(ServerMessage.ASK_FOR_MOVE, self._board_members(), tiles=tiles)
+
+        try:
+            msg = await asyncio.wait_for(self._recv_msg(), self.MOVE_TIMEOUT)
+        except (asyncio.TimeoutError, ConnectionError, ValueError):
+            log.error(f"{self.color} did not send a move")
+            return None
+
+        if msg is None:
+            return None
 
         try:
             msg_type = ClientMessage(msg["type"])
@@ -104,19 +182,23 @@ class ProxyPlayer(AbstractPlayer):
             log.error(f"Expected {ClientMessage.MOVE_REQUEST.value}, got {msg_type.value}")
             return None
 
+        if self.delta and msg.get("version") != self.version:
+            # the client lost track of the board, resync it with a snapshot
+            self.version = None
+
         return PlacementFactory.json_to_placement(msg)
 
     def receive_tiles(self, tiles):
         self.tile_hand = tiles
 
     def receive_gamestate(self, board, state, players):
-        self.board = board.get_json()
+        self.board = board
+        self.players = players
         self.state = state.name
-        player_jsons = [player.to_json() for player in players]
+        shared = self._game_state_delta() if self.delta else self._game_state()
         self._send_msg(
             ServerMessage.RECEIVE_GAME_STATE,
-            board=self.board,
-            players=player_jsons,
+            shared,
             state=self.state,
             # them like this, this info should prob be received by a
             # function on player
@@ -124,27 +206,109 @@ class ProxyPlayer(AbstractPlayer):
             port=self.port.name if self.port is not None else None,
         )
 
+    def _shared(self, key, build):
+        """
+        :return: the value built for the key this turn, shared with the other
+            players in the game when possible
+        """
+        if self.shared is None:
+            return build()
+        return self.shared.get(key, build)
+
+    def _encoded(self, key, build):
+        """
+        :param build: builds the dict of members to encode
+        :return: the members encoded with the client's codec, shared with the
+            other players in the game using the same codec when possible
+        """
+        return self._shared((self.codec.name, key), lambda: self.codec.members(build()))
+
+    def _board_members(self):
+        return self._encoded("board", lambda: {"board": self.board.get_json()})
+
+    def _player_jsons(self):
+        return self._shared("players", lambda: [player.to_json() for player in self.players])
+
+    def _game_state(self):
+        """
+        :return: the encoded board and players
+        """
+        players = self._encoded("players", lambda: {"players": self._player_jsons()})
+        return self._board_members() + self._separator + players
+
+    def _game_state_delta(self):
+        """
+        :return: the encoded changes to the board and players since the last
+            game state sent to the client, or all of it if a snapshot is due
+        """
+        board, player_jsons = self.board, self._player_jsons()
+        snapshot = (
+            self.version is None
+            or self.version > board.version
+            or self.deltas >= self.SNAPSHOT_INTERVAL
+        )
+        if snapshot:
+            self.deltas = 0
+            shared = self._game_state()
+            contents = {"version": board.version}
+        else:
+            self.deltas += 1
+            # every client that was sent the same state last is sent the same
+            # changes, so they are encoded once per distinct previous state
+            since, sent_players = self.version, self.sent_players
+            shared = self._encoded(
+                ("delta", self.sent_turn, since),
+                lambda: {
+                    "placements": [tile.get_json() for tile in board.placed_since(since)],
+                    "players": [p for p in player_jsons if sent_players.get(p["color"]) != p],
+                },
+            )
+            contents = {"version": board.version, "since": since}
+
+        self.version = board.version
+        self.sent_players = {p["color"]: p for p in player_jsons}
+        self.sent_turn = None if self.shared is None else self.shared.turn
+        return self.codec.members(contents) + self._separator + shared
+
+    @property
+    def _separator(self):
+        """Joins two runs of encoded members."""
+        return b", " if self.codec is wire.JSON else b""
+
     def receive_color(self, color):
         self.color = color.value
         self._send_msg(ServerMessage.RECEIVE_COLOR, color=color.value)
 
-    def _recv_msg(self):
-        msg = receive_input(self.connection, self.MAX_BUFFER_SIZE)
+    async def _recv_msg(self):
+        """
+        :return: the next message from the client, or `None` if the
+            connection was closed
+        """
+        payload = await read_frame(self.reader)
+        if payload is None:
+            return None
+
+        msg = wire.decode(payload)
         xserver_log.info(f"<< {self.color} {msg}")
         return msg
 
-    def _send_msg(self, msg_type: ServerMessage, **msg_contents):
+    def _send_msg(self, msg_type: ServerMessage, shared=b"", **msg_contents):
         """
         Sends a message to the client over the socket.
 
         :param msg_type: the message type, e.g., ASK_FOR_MOVE
+        :param shared: optional, members of the message encoded with the
+            client's codec, e.g., shared with other players
         :param msg: optional, the contents of the message (excluding `type`)
         """
-        # Add the key `type` to the message contents and serialize it to a JSON
-        # string. (Overwrites the key `type` in the contents if it exists.)
-        msg_str = json.dumps({**msg_contents, "type": msg_type.value})
-        self.connection.sendall(msg_str.encode("utf-8"))
-        xserver_log.info(f">> {self.color} {msg_str}")
+        # Add the key `type` to the message contents and encode it. (Overwrites
+        # the key `type` in the contents if it exists.)
+        data = self.codec.message(msg_type.value, shared, msg_contents)
+        if not self.writer.is_closing():
+            self.writer.write(encode_frame(data))
+        if xserver_log.isEnabledFor(logging.INFO):
+            msg_str = data.decode("utf-8") if self.codec is wire.JSON else wire.decode(data)
+            xserver_log.info(f">> {self.color} {msg_str}")
 
     def to_json(self):
         return {
@@ -156,8 +320,16 @@ class ProxyPlayer(AbstractPlayer):
 
 
 class Player(AbstractPlayer):
-    def receive_game_end(self):
-        pass
+    def __init__(self, name, age=0, strategy=None, ponder=False):
+        """
+        :param ponder: whether the strategy searches ahead during the other
+            players' turns, see :mod:`Player.ponder`
+        """
+        super().__init__(name, age, strategy)
+        self.ponderer = Ponderer(self.strategy) if ponder else None
+
+    def receive_game_end(self, results):
+        self.stop_pondering()
 
     def receive_move_success(self):
         log.info(f"{self.color.value} moved successfully")
@@ -166,6 +338,7 @@ class Player(AbstractPlayer):
         log.error(message)
 
     def next_move(self):
+        self.stop_pondering()
         self._next_move = self.strategy.next_move(self, self.board)
         return self._next_move
 
@@ -177,6 +350,14 @@ class Player(AbstractPlayer):
     def receive_gamestate(self, board, state, players):
         self.board = board
         self.state = state
+        # for strategies that search ahead, see `Player.search`
+        self.players = players
+        if self.ponderer is not None:
+            self.ponderer.start(self, board)
+
+    def stop_pondering(self):
+        if self.ponderer is not None:
+            self.ponderer.stop()
 
     def receive_color(self, color):
         self.color = color
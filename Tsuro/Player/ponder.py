@@ -0,0 +1,45 @@
+"""
+Thinking during other players' turns.
+
+A :class:`Ponderer` starts a strategy's
+:meth:`Player.strategy.Strategy.ponder` in a background thread as soon as a
+player is sent a new game state, and stops it when the next one arrives or
+the player is asked to move, so that the strategy can reuse what it found
+rather than start its search over.
+"""
+import threading
+
+from Player.search import Position
+
+
+class Ponderer:
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self._thread = None
+        self._stop = None
+
+    def start(self, player, board):
+        """
+        Starts pondering the position the player was sent, once they are on
+        the board, stopping any pondering before.
+        """
+        self.stop()
+        if player.color is None or player.tile is None:
+            return
+        # taken now, as the board and players change while the thread runs
+        position = Position.of(player, board)
+        if player.color not in position.alive or position.is_over:
+            return
+
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self.strategy.ponder, args=(position, self._stop), daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stops pondering, waiting for the strategy to finish."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,293 @@
+"""
+Searching ahead from the position a player is asked to move in, for the
+strategies in :mod:`Player.strategy` that look ahead.
+
+A :class:`Position` is a copy of the board that moves are made on and taken
+back from, see :meth:`Common.board.Board.undo`, rather than a new board or
+referee per move. Players are identified by their color, and take turns in
+:class:`Color` order, the order the referee assigns colors in. The tiles
+players will be dealt are not known, so future hands are drawn at random.
+"""
+from typing import List
+
+from Common.board import Board
+from Common.constants import Color
+from Common.tiles import FACES, Port, ReadOnlyTile, Tile
+
+
+# the number of tiles dealt after the first round
+HAND_SIZE = 2
+
+_PORTS = tuple(Port)
+_COLORS = tuple(Color)
+
+
+def _distinct(faces):
+    """:return: the faces with different connections, the first of each"""
+    distinct = {}
+    for face in faces:
+        distinct.setdefault(face.exits, face)
+    return tuple(distinct.values())
+
+
+# the rotations of every tile that differ, by tile index
+DISTINCT_FACES = tuple(_distinct(faces) for faces in FACES)
+
+
+class Position:
+    """
+    A board and the players still on it, with the color whose turn it is.
+    """
+
+    def __init__(self, board: Board, colors, to_move: Color):
+        """
+        :param board: a board of its own, following the path of every color
+            on it, see :meth:`Common.board.Board.track_player`
+        :param colors: the colors of the players on the board
+        :param to_move: the color whose turn it is
+        """
+        self.board = board
+        # the players on the board, in turn order
+        self.alive: List[Color] = [c for c in _COLORS if c in colors and not self._is_out(c)]
+        self.to_move = to_move
+        # the player to move and the players on the board before each move
+        self._history = []
+
+    @classmethod
+    def of(cls, player, board):
+        """
+        :param player: the player asked to move, with the other players they
+            were last sent, if any
+        :param board: the board they were asked to move on
+        :return: the position the player is asked to move in
+        """
+        board = board.copy()
+        colors = []
+        for color, x, y, port in _player_positions(player):
+            board.track_player(color, x, y, port)
+            colors.append(color)
+        return cls(board, colors, player.color)
+
+    @property
+    def key(self):
+        """The Zobrist hash of the tiles and players on the board."""
+        return self.board.key
+
+    def _is_out(self, color):
+        return self.board.is_border_endpoint(self.board.player_end(color))
+
+    def front(self, color):
+        """
+        :return: the cell in front of the player with the given color, and
+            the port of it they would enter a tile placed there through
+        """
+        end = self.board.player_end(color)
+        return end >> 3, _PORTS[end & 7]
+
+    def survives(self, color, face):
+        """
+        :return: whether the player stays on the board if the face is placed
+            in front of them
+        """
+        cell, port = self.front(color)
+        return not self.board.is_border_endpoint(self.board.paths.trace(cell, face, port))
+
+    def moves(self, color, hand):
+        """
+        :param hand: the tile indices in the player's hand
+        :return: the faces the rules allow the player to place: those that
+            keep them on the board, or all of them if none do
+        """
+        board = self.board
+        cell, port = self.front(color)
+        trace, is_border = board.paths.trace, board.is_border_endpoint
+        faces = [face for index in hand for face in FACES[index]]
+        return [face for face in faces if not is_border(trace(cell, face, port))] or faces
+
+    def play(self, face, color=None):
+        """
+        Places the face in front of the player whose turn it is, or of the
+        player with the given color, and passes the turn on from them.
+
+        :return: the colors of the players knocked off of the board
+        """
+        color = self.to_move if color is None else color
+        cell, _ = self.front(color)
+        x, y = Board.cell_coordinates(cell)
+        self.board.add_tile(Tile(face), x, y)
+        return self._moved(color)
+
+    def play_move(self, move, color=None):
+        """
+        Makes a legal move of the player whose turn it is, see
+        :func:`Common.rules.generate_legal_moves`, including their initial
+        placement.
+
+        :return: the colors of the players knocked off of the board
+        """
+        color = self.to_move if color is None else color
+        if not move.is_initial:
+            return self.play(FACES[move.index][move.rotation.value // 90])
+
+        self.board.apply(move.to_placement(color))
+        alive = self.alive
+        self.alive = [c for c in _COLORS if c in alive or c is color]
+        out = self._moved(color)
+        # the turn passes on from the player that entered the board
+        self._history[-1] = (self._history[-1][0], alive)
+        return out
+
+    def _moved(self, color):
+        board = self.board
+        self._history.append((self.to_move, self.alive))
+        out = [c for c in self.alive if board.is_border_endpoint(board.player_end(c))]
+        if out:
+            self.alive = [c for c in self.alive if c not in out]
+        self.to_move = self.next_color(color)
+        return out
+
+    def undo(self):
+        """Takes back the last move."""
+        self.board.undo()
+        self.to_move, self.alive = self._history.pop()
+
+    def next_color(self, color):
+        """
+        :return: the color of the player on the board whose turn is after the
+            given color's, or the color itself if no one else is left
+        """
+        start = _COLORS.index(color)
+        for i in range(1, len(_COLORS) + 1):
+            after = _COLORS[(start + i) % len(_COLORS)]
+            if after in self.alive:
+                return after
+        return color
+
+    def previous_color(self, color):
+        """
+        :return: the color of the player on the board whose turn is before
+            the given color's, or the color itself if no one else is left
+        """
+        start = _COLORS.index(color)
+        for i in range(1, len(_COLORS) + 1):
+            before = _COLORS[(start - i) % len(_COLORS)]
+            if before in self.alive:
+                return before
+        return color
+
+    def legal_faces(self, color, index):
+        """
+        :return: the different faces of the tile the rules allow the player
+            to place, if it is the only tile in their hand
+        """
+        board = self.board
+        cell, port = self.front(color)
+        trace, is_border = board.paths.trace, board.is_border_endpoint
+        faces = DISTINCT_FACES[index]
+        return [face for face in faces if not is_border(trace(cell, face, port))] or faces
+
+    @property
+    def is_over(self):
+        """Whether the game is over, with at most one player on the board."""
+        return len(self.alive) <= 1
+
+
+def _player_positions(player):
+    """
+    Yields the color, and the coordinates and port of the tile, of the
+    player and every other player they were sent that has placed a tile.
+
+    The other players are :class:`Player.player.Player` objects in a local
+    game, or their JSON from a game state message in a remote one.
+    """
+    if player.tile is not None:
+        yield player.color, player.tile.x, player.tile.y, player.port
+
+    for other in player.players or ():
+        if isinstance(other, dict):
+            if other["tile"] is None or other["port"] is None:
+                continue
+            color = Color(other["color"])
+            tile = ReadOnlyTile.json_to_tile(other["tile"])
+            port = Port[other["port"]]
+        else:
+            if other.tile is None or other.port is None:
+                continue
+            color, tile, port = other.color, other.tile, other.port
+
+        if color is not player.color:
+            yield color, tile.x, tile.y, port
+
+
+def random_hand(rng, size=HAND_SIZE):
+    """:return: the indices of a hand of random tiles"""
+    return [rng.randrange(Tile.NUMBER_OF_TILES) for _ in range(size)]
+
+
+def playout(position: Position, rng):
+    """
+    Plays the game out from the position, every player placing a random tile
+    from a random hand that keeps them on the board, if any, and takes every
+    move back again.
+
+    :return: the colors of the players that left the board, in lists of the
+        players that left together, first to last, see :func:`scores`
+    """
+    order = []
+    plies = 0
+    while not position.is_over:
+        moves = position.moves(position.to_move, random_hand(rng))
+        out = position.play(moves[rng.randrange(len(moves))])
+        if out:
+            order.append(out)
+        plies += 1
+
+    for _ in range(plies):
+        position.undo()
+    return order
+
+
+def scores(players, order):
+    """
+    Scores the players of a game from the order they left the board in: the
+    players left on the board score 1, and a player who left scores the
+    fraction of players that left before them.
+
+    :param players: the colors of the players
+    :param order: the colors of the players that left, in lists of the
+        players that left together, first to last
+    """
+    result = dict.fromkeys(players, 1.0)
+    left = 0
+    for out in order:
+        for color in out:
+            result[color] = left / len(players)
+        left += len(out)
+    return result
+
+
+def evaluate(position: Position, color) -> float:
+    """
+    Estimates how well the game is going for a player, from 0 when they are
+    off the board, to 1 when they are the only one left on it.
+
+    Weighs how safe the space in front of them is, by the fraction of tiles
+    with a rotation that keeps them on the board if placed there, how far
+    that space is from the border, and how many players are left.
+    """
+    if color not in position.alive:
+        return 0.0
+    if len(position.alive) == 1:
+        return 1.0
+
+    board = position.board
+    cell, port = position.front(color)
+    trace, is_border = board.paths.trace, board.is_border_endpoint
+    safe = sum(
+        any(not is_border(trace(cell, face, port)) for face in faces)
+        for faces in DISTINCT_FACES
+    )
+
+    x, y = Board.cell_coordinates(cell)
+    border = min(x, y, Board.SIZE - 1 - x, Board.SIZE - 1 - y) / ((Board.SIZE - 1) // 2)
+    return 0.6 * safe / Tile.NUMBER_OF_TILES + 0.2 * border + 0.15 / len(position.alive)
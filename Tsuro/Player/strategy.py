@@ -1,10 +1,15 @@
+import math
+import random
+import time
 from abc import ABC, abstractmethod
 
 from Common import rules
 from Common.constants import OutOfBounds, Rotation
 from Common.placement import InitialPlacement, IntermediatePlacement
-from Common.tiles import Port
+from Common.tiles import FACES, Port, Tile
 from Common.utils import get_coordinates_in_direction, revolve
+from Player import openings, parallel, search
+from Player.endgame import EndgameSolver
 
 
 class Strategy(ABC):
@@ -12,70 +17,76 @@ class Strategy(ABC):
     def next_move(self, player, board):
         pass
 
+    def ponder(self, position, stop):  # noqa: B027
+        """
+        Searches ahead during other players' turns, see
+        :class:`Player.ponder.Ponderer`, for :meth:`next_move` to reuse.
+        A no-op by default, for strategies that do not search ahead.
+
+        :param position: the :class:`Player.search.Position` the player was
+            last sent, with them to move
+        :param stop: a `threading.Event` set when the search has to stop
+        """
+        return None
+
 
 class Dumb(Strategy):
     def next_move(self, player, board):
         if player.tile is None:
-            for x, y in revolve(10, True):
-                port = None
-                for p in Port:
-                    coords = get_coordinates_in_direction(x, y, p.direction)
-                    if board.get_tile_at(*coords) is OutOfBounds:
-                        port = p
-                        break
-
-                tile = player.tile_hand[2]
-                placement = InitialPlacement(
-                    tile.index, tile.rotation.value, player.color.value, x, y, port.name
-                )
-
-                if all(r.is_valid(placement, board, player) for r in rules.ALL):
-                    return placement
-
-        else:
-            x, y = get_coordinates_in_direction(
-                player.tile.x, player.tile.y, player.port.direction
-            )
-            tile = player.tile_hand[0]
-            return IntermediatePlacement(tile.index, tile.rotation.value, player.color.value, x, y)
+            return _first_initial_move(player, board, clockwise=True)
+
+        x, y = get_coordinates_in_direction(player.tile.x, player.tile.y, player.port.direction)
+        tile = player.tile_hand[0]
+        return IntermediatePlacement(tile.index, tile.rotation.value, player.color.value, x, y)
 
 
 class Second(Strategy):
     def next_move(self, player, board):
         if player.tile is None:
-            for x, y in revolve(10, False):
-                port = None
-                for p in Port:
-                    coords = get_coordinates_in_direction(x, y, p.direction)
-                    if board.get_tile_at(*coords) is OutOfBounds:
-                        port = p
-                        break
-
-                tile = player.tile_hand[2]
-                placement = InitialPlacement(
-                    tile.index, tile.rotation.value, player.color.value, x, y, port.name
-                )
-
-                if all(r.is_valid(placement, board, player) for r in rules.ALL):
-                    return placement
+            return _first_initial_move(player, board, clockwise=False)
 
-            else:
-                x, y = get_coordinates_in_direction(
-                    player.tile.x, player.tile.y, player.port.direction
-                )
-                for i in range(1, -1, -1):
-                    tile = player.tile_hand[i]
-                    for j in range(4):
-                        placement = IntermediatePlacement(
-                            tile.index, tile.rotation.value, player.color.value, x, y
-                        )
-                        if all(r.is_valid(placement, board, player) for r in rules.ALL):
-                            return placement
-                        tile.rotate_by(Rotation.ONE)
-                tile = player.tile_hand[1]
-                return IntermediatePlacement(
-                    tile.index, tile.rotation.value, player.color.value, x, y
-                )
+        legal = {(m.index, m.rotation): m for m in rules.generate_legal_moves(board, player)}
+
+        # try the second tile, then the first, at each rotation
+        for tile in reversed(player.tile_hand[:2]):
+            for rotation in Rotation:
+                move = legal.get((tile.index, rotation))
+                if move is not None:
+                    return move.to_placement(player.color)
+
+        x, y = get_coordinates_in_direction(player.tile.x, player.tile.y, player.port.direction)
+        tile = player.tile_hand[1]
+        return IntermediatePlacement(tile.index, tile.rotation.value, player.color.value, x, y)
+
+
+def _first_initial_move(player, board, clockwise):
+    """
+    Scans the border of the board, and places the third tile in the
+    player's hand at the first legal space, on its first port facing off of
+    the board.
+    """
+    tile = player.tile_hand[2]
+    legal = {
+        (move.x, move.y, move.port)
+        for move in rules.generate_legal_moves(board, player)
+        if move.index == tile.index and move.rotation is tile.rotation
+    }
+
+    for x, y in revolve(board.SIZE, clockwise):
+        port = next(
+            (
+                p
+                for p in Port
+                if board.get_tile_at(*get_coordinates_in_direction(x, y, p.direction))
+                is OutOfBounds
+            ),
+            None,
+        )
+
+        if (x, y, port) in legal:
+            return InitialPlacement(
+                tile.index, tile.rotation.value, player.color.value, x, y, port.name
+            )
 
 
 class Predetermined(Strategy):
@@ -84,3 +95,510 @@ class Predetermined(Strategy):
 
     def next_move(self, player, board):
         return self.placement
+
+
+class MonteCarlo(Strategy):
+    """
+    Picks the move that does best in random playouts of the rest of the game,
+    with Monte Carlo tree search.
+
+    The tree is searched open loop: a node stands for the moves made to reach
+    it, whatever tiles were dealt on the way. At each node, the player whose
+    turn it is is dealt a random hand, see :mod:`Player.search`, and picks,
+    among the children their hand allows, the one best for them by UCB1. The
+    more playouts in the time allowed, the stronger the strategy.
+    """
+
+    # the most initial placements searched, the best in the opening book,
+    # out of the hundreds allowed
+    ROOT_WIDTH = 32
+
+    def __init__(self, time_limit=1.0, playouts=None, exploration=1.0, seed=None):
+        """
+        :param time_limit: seconds to search each move for, `None` for no limit
+        :param playouts: the number of playouts to search each move with,
+            `None` for no limit
+        :param exploration: the UCB1 exploration constant
+        :param seed: optional, the seed for the random hands and moves
+        """
+        if time_limit is None and playouts is None:
+            raise ValueError("MonteCarlo needs a time limit or a number of playouts")
+        self.time_limit = time_limit
+        self.playouts = playouts
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        # the number of playouts of the last search
+        self.searched = 0
+
+    def next_move(self, player, board):
+        moves = _candidates(board, player, self.ROOT_WIDTH)
+        if not moves:
+            return Second().next_move(player, board)
+
+        position = search.Position.of(player, board)
+        children = [_Node(player.color) for _ in moves]
+        deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+
+        self.searched = 0
+        while len(moves) > 1:
+            if self.playouts is not None and self.searched >= self.playouts:
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            self._search(position, moves, children)
+            self.searched += 1
+
+        best = max(range(len(moves)), key=lambda i: children[i].visits)
+        return moves[best].to_placement(player.color)
+
+    def _search(self, position, moves, children):
+        """
+        Plays a move from the root down the tree, expands it by a node, plays
+        the game out, and scores the nodes on the way.
+        """
+        rng, players = self.rng, position.alive + [position.to_move]
+
+        i = self._select_root(children)
+        order = []
+        out = position.play_move(moves[i])
+        if out:
+            order.append(out)
+        path, node, plies = [children[i]], children[i], 1
+
+        while not position.is_over:
+            color = position.to_move
+            faces = {face.code: face for face in position.moves(color, search.random_hand(rng))}
+            untried = [face for code, face in faces.items() if code not in node.children]
+            if untried:
+                face = untried[rng.randrange(len(untried))]
+                node.children[face.code] = _Node(color)
+            else:
+                face = faces[self._select(node, faces)]
+
+            for code in faces:
+                if code in node.children:
+                    node.children[code].available += 1
+            node = node.children[face.code]
+            path.append(node)
+
+            out = position.play(face)
+            plies += 1
+            if out:
+                order.append(out)
+            if untried:
+                break
+
+        order += search.playout(position, rng)
+        for _ in range(plies):
+            position.undo()
+
+        scores = search.scores(set(players), order)
+        for node in path:
+            node.visits += 1
+            node.score += scores[node.color]
+
+    def _select_root(self, children):
+        total = sum(child.visits for child in children)
+        for i, child in enumerate(children):
+            if child.visits == 0:
+                return i
+        log_total = math.log(total)
+        return max(
+            range(len(children)), key=lambda i: children[i].ucb(log_total, self.exploration)
+        )
+
+    def _select(self, node, faces):
+        """:return: the code of the available child best for the player to move"""
+        children = node.children
+        return max(
+            faces,
+            key=lambda code: children[code].ucb(
+                math.log(children[code].available), self.exploration
+            ),
+        )
+
+
+class _Node:
+    """A node of the :class:`MonteCarlo` search tree."""
+
+    __slots__ = ("color", "children", "visits", "score", "available")
+
+    def __init__(self, color):
+        # the color of the player that made the move to reach this node
+        self.color = color
+        # by the code of the face placed next
+        self.children = {}
+        self.visits = 0
+        # the sum of the scores of the playouts, for the player that moved
+        self.score = 0.0
+        # the number of times the node could have been chosen
+        self.available = 0
+
+    def ucb(self, log_total, exploration):
+        return self.score / self.visits + exploration * math.sqrt(log_total / self.visits)
+
+
+class Expectimax(Strategy):
+    """
+    Picks the move with the best expected value a few turns ahead, searching
+    deeper and deeper until time runs out.
+
+    After the player's move, each player in turn is modelled as placing one
+    random tile: the value of their turn is the average over every tile, see
+    Star1 pruning, of the best rotation of it for them, taking the opponents
+    to play against the player. Positions at the depth searched are valued by
+    a pluggable evaluation, see :func:`Player.search.evaluate`, which has to
+    be between 0 and 1.
+    """
+
+    # the most initial placements searched, the best in the opening book
+    ROOT_WIDTH = 16
+
+    def __init__(self, time_limit=1.0, max_depth=None, evaluate=search.evaluate):
+        """
+        :param time_limit: seconds to search each move for, `None` for no limit
+        :param max_depth: the most turns to search ahead, `None` for no limit
+        :param evaluate: values positions for a player, from the position and
+            their color
+        """
+        if time_limit is None and max_depth is None:
+            raise ValueError("Expectimax needs a time limit or a maximum depth")
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.evaluate = evaluate
+        # the depth of the last complete search, and the positions searched
+        self.depth = 0
+        self.nodes = 0
+        # the depth the last search of its own got to in the time allowed,
+        # `None` until one is cut short by the time
+        self._reached = None
+        # the color pondered for, and the value of every face they could
+        # place, the depth searched, and whether it was cut short, by the
+        # key of each position pondered
+        self._pondered_color = None
+        self._pondered = {}
+        # set to stop pondering
+        self._stop = None
+        # whether the last move was the one found by pondering
+        self.reused = False
+
+    def next_move(self, player, board):
+        moves = _candidates(board, player, self.ROOT_WIDTH)
+        if not moves:
+            return Second().next_move(player, board)
+
+        position = search.Position.of(player, board)
+        self._color = player.color
+        self._deadline = (
+            None if self.time_limit is None else time.perf_counter() + self.time_limit
+        )
+        self.depth = self.nodes = 0
+
+        order = list(range(len(moves)))
+        depth = 1
+        pondered = self._take_pondered(position, player.color)
+        self.reused = False
+        if pondered is not None and not moves[0].is_initial:
+            values, self.depth, cut = pondered
+            scores = [values[FACES[m.index][m.rotation.value // 90].exits] for m in moves]
+            order.sort(key=lambda i: -scores[i])
+            # good enough if as deep as a search of its own would get
+            deep_enough = self._reached is not None and self.depth >= self._reached
+            if not cut or deep_enough or self.depth == self.max_depth:
+                self.reused = True
+                return moves[order[0]].to_placement(player.color)
+            depth = self.depth + 1
+
+        self._cut = False
+        while len(moves) > 1 and (self.max_depth is None or depth <= self.max_depth):
+            # whether any position was valued by the evaluation, not the end
+            # of the game, so searching deeper could change the result
+            self._cut = False
+            try:
+                values = self._search_root(position, moves, order, depth)
+            except _OutOfTime:
+                break
+            order.sort(key=lambda i: -values[i])
+            self.depth = depth
+            if not self._cut:
+                break
+            depth += 1
+
+        if self._cut:
+            self._reached = max(self.depth, 1)
+        return moves[order[0]].to_placement(player.color)
+
+    def ponder(self, position, stop):
+        """
+        Searches every face the player could place, whatever their hand, in
+        the position, and in every position a move of the player before them
+        could leave them to move in, deeper and deeper, until stopped.
+        """
+        color = position.to_move
+        self._color, self._deadline, self._stop = color, None, stop
+        # what was found since the last move is kept, the position may have
+        # been anticipated by the last game state
+        if color is not self._pondered_color:
+            self._pondered_color, self._pondered = color, {}
+        # None for the position itself, then the moves the rules allow the
+        # player before them, the only player whose move leaves them to move
+        before = position.previous_color(color)
+        anticipated = [None] + [
+            (before, face)
+            for index in range(Tile.NUMBER_OF_TILES)
+            for face in position.legal_faces(before, index)
+        ]
+
+        depth = 1
+        try:
+            while self.max_depth is None or depth <= self.max_depth:
+                cut = False
+                for move in anticipated:
+                    if move is not None:
+                        position.play(move[1], move[0])
+                    try:
+                        cut = self._ponder_position(position, color, depth) or cut
+                    finally:
+                        if move is not None:
+                            position.undo()
+                if not cut:
+                    break
+                depth += 1
+        except _OutOfTime:
+            pass
+        finally:
+            self._stop = None
+
+    def _ponder_position(self, position, color, depth):
+        """
+        Searches every face the player could place in the position, unless it
+        was searched as deep already.
+
+        :return: whether the values were cut short by the depth
+        """
+        if color not in position.alive or position.is_over:
+            return False
+        known = self._pondered.get(position.key)
+        if known is not None and (known[1] >= depth or not known[2]):
+            return known[2]
+        # whoever's turn would be next, the player is asked to move here if
+        # the others before them are gone
+        position.to_move = color
+        self._cut = False
+        values = self._search_faces(position, depth)
+        self._pondered[position.key] = (values, depth, self._cut)
+        return self._cut
+
+    def _search_faces(self, position, depth):
+        """
+        :return: the value of every different face the player to move could
+            place, by its exits
+        """
+        values = {}
+        for faces in search.DISTINCT_FACES:
+            for face in faces:
+                position.play(face)
+                try:
+                    values[face.exits] = self._value(position, depth - 1, 0.0, 1.0)
+                finally:
+                    position.undo()
+        return values
+
+    def _take_pondered(self, position, color):
+        """
+        :return: what pondering found about the position, if it was
+            anticipated, and forgets the rest
+        """
+        pondered, self._pondered = self._pondered, {}
+        if color is not self._pondered_color:
+            return None
+        return pondered.get(position.key)
+
+    def _search_root(self, position, moves, order, depth):
+        """:return: the value of each move, by its index"""
+        values = {}
+        alpha = 0.0
+        for i in order:
+            position.play_move(moves[i])
+            try:
+                values[i] = self._value(position, depth - 1, alpha, 1.0)
+            finally:
+                position.undo()
+            alpha = max(alpha, values[i])
+        return values
+
+    def _value(self, position, depth, alpha, beta):
+        self.nodes += 1
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise _OutOfTime
+        if self._stop is not None and self._stop.is_set():
+            raise _OutOfTime
+
+        if self._color not in position.alive or position.is_over:
+            return self.evaluate(position, self._color)
+        if depth == 0:
+            self._cut = True
+            return self.evaluate(position, self._color)
+
+        # Star1: every tile is as likely, and values are between 0 and 1, so
+        # the turn's value falls outside the window once the tiles so far are
+        # far enough outside it
+        color, n, total = position.to_move, Tile.NUMBER_OF_TILES, 0.0
+        for index in range(n):
+            remaining = n - index - 1
+            low = n * alpha - total - remaining
+            high = n * beta - total
+            value = self._choose(position, color, index, depth, max(low, 0.0), min(high, 1.0))
+            total += value
+            if value <= low:
+                return (total + remaining) / n
+            if value >= high:
+                return total / n
+        return total / n
+
+    def _choose(self, position, color, index, depth, alpha, beta):
+        """
+        :return: the value of the best rotation of the tile for the player
+            placing it, searched with alpha-beta
+        """
+        maximize = color is self._color
+        best = 0.0 if maximize else 1.0
+        for face in position.legal_faces(color, index):
+            position.play(face)
+            try:
+                value = self._value(position, depth - 1, alpha, beta)
+            finally:
+                position.undo()
+
+            if maximize:
+                best = max(best, value)
+                alpha = max(alpha, value)
+            else:
+                best = min(best, value)
+                beta = min(beta, value)
+            if alpha >= beta:
+                break
+        return best
+
+
+class Rollouts(Strategy):
+    """
+    Picks the move with the best mean score in random playouts of the rest
+    of the game, spreading the moves across a pool of worker processes, see
+    :mod:`Player.parallel`, to use every CPU. The pool is started on the
+    first move and kept until :meth:`close`. In a worker process of its own,
+    e.g. in a tournament, the moves are scored in that process.
+    """
+
+    # the most initial placements scored, the best in the opening book
+    ROOT_WIDTH = 32
+
+    def __init__(self, time_limit=1.0, playouts=None, workers=None, seed=None):
+        """
+        :param time_limit: seconds to search each move for, `None` for no limit
+        :param playouts: the number of playouts to search each move with,
+            across every worker, `None` for no limit
+        :param workers: the number of worker processes, one per CPU by default
+        :param seed: optional, the seed for the random hands and moves
+        """
+        if time_limit is None and playouts is None:
+            raise ValueError("Rollouts needs a time limit or a number of playouts")
+        self.time_limit = time_limit
+        self.playouts = playouts
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self.pool = None
+        # the number of playouts of the last search
+        self.searched = 0
+
+    def next_move(self, player, board):
+        moves = _candidates(board, player, self.ROOT_WIDTH)
+        if not moves:
+            return Second().next_move(player, board)
+        if len(moves) == 1:
+            return moves[0].to_placement(player.color)
+
+        if self.pool is None:
+            # imported here, since the referee and the harnesses import this
+            # module for `STRATEGIES`, and multiprocessing is slow to import
+            import multiprocessing
+
+            # worker processes cannot start processes of their own
+            daemon = multiprocessing.current_process().daemon
+            self.pool = parallel.WorkerPool(1 if daemon else self.workers)
+        scores = self.pool.score(
+            search.Position.of(player, board),
+            moves,
+            self.time_limit,
+            self.playouts,
+            seed=self.rng.getrandbits(64),
+        )
+        self.searched = sum(count for _, count in scores)
+
+        best = max(range(len(moves)), key=lambda i: scores[i][0] / max(scores[i][1], 1))
+        return moves[best].to_placement(player.color)
+
+    def close(self):
+        """Stops the worker processes, if they were started."""
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+
+
+class Endgame(Strategy):
+    """
+    Plays the provably best move once few enough spaces are left to solve
+    the rest of the game exactly, see :mod:`Player.endgame`, and plays as
+    another strategy before then, or if the solver runs into its limits.
+    """
+
+    def __init__(self, fallback=None, max_reachable=6, node_limit=5000, time_limit=0.5):
+        """
+        :param fallback: the strategy to play as when the position is not
+            solved, :class:`Expectimax` by default
+        :param max_reachable: the most empty spaces the players can reach to
+            solve with, see :func:`Player.endgame.reachable`
+        :param node_limit: the most positions to solve each move with, `None`
+            for no limit
+        :param time_limit: seconds to solve each move for, `None` for no
+            limit, on top of the time the fallback takes
+        """
+        self.fallback = Expectimax() if fallback is None else fallback
+        self.solver = EndgameSolver(max_reachable, node_limit, time_limit)
+        # whether the last move was solved exactly
+        self.solved = False
+
+    def ponder(self, position, stop):
+        self.fallback.ponder(position, stop)
+
+    def next_move(self, player, board):
+        solution = self.solver.solve(player, board)
+        self.solved = solution is not None
+        if solution is None:
+            return self.fallback.next_move(player, board)
+        return solution[0]
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+def _candidates(board, player, width):
+    """
+    :return: the legal moves of the player, only the best initial placements
+        in the opening book, see :mod:`Player.openings`
+    """
+    if player.tile is None:
+        return openings.candidates(board, player, width)
+    return rules.generate_legal_moves(board, player)
+
+
+# strategies that can be chosen by name, e.g. by remote clients
+STRATEGIES = {
+    "dumb": Dumb,
+    "second": Second,
+    "mcts": MonteCarlo,
+    "expectimax": Expectimax,
+    "rollouts": Rollouts,
+    "endgame": Endgame,
+}
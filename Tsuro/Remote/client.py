@@ -1,29 +1,62 @@
-import json
 import logging
 import socket
 import sys
 
-from Common.board import ReadOnlyBoard
+from Common import wire
+from Common.board import Board
 from Common.constants import ClientMessage, Color, PlayerState, ServerMessage
+from Common.framing import FrameReader, encode_frame
+from Common.logging import configure_logging
 from Common.tiles import Port, ReadOnlyTile
+from Common.utils import encode_message
 from Player.player import Player
-from Player.strategy import Dumb, Second
+from Player.strategy import STRATEGIES
 
 
 log = logging.getLogger(__name__)
 
 
-def start_client(host, port, name, strategy):
-    client = Client(host, port, name, strategy)
+def start_client(host, port, name, strategy, delta=True, encoding=wire.JSON.name, ponder=False):
+    # only the server logs to xserver.log
+    configure_logging(xserver=False)
+    client = Client(host, port, name, strategy, delta, encoding, ponder)
     client.run_game()
 
 
 class Client:
-    def __init__(self, host, port, player_name, strategy_name):
+    def __init__(
+        self,
+        host,
+        port,
+        player_name,
+        strategy_name,
+        delta=True,
+        encoding=wire.JSON.name,
+        ponder=False,
+    ):
+        """
+        :param delta: whether to ask the server for game states as the
+            changes since the last one, see `Planning/protocol.md`
+        :param encoding: the name of the codec to ask the server for, see
+            :mod:`Common.wire`
+        :param ponder: whether the strategy searches ahead while waiting for
+            the other players, see :mod:`Player.ponder`
+        """
         self.host = host
         self.port = port
         self.player_name = player_name
         self.strategy_name = strategy_name
+        self.delta = delta
+        self.encoding = encoding
+        self.ponder = ponder
+        # replies are encoded like the last message from the server, which
+        # only switches codecs if it knows the one asked for
+        self.codec = wire.JSON
+        # the board and players as of the last game state, by color
+        self.board = Board()
+        self.players = {}
+        # the version of the board in delta mode, None when out of sync
+        self.version = None
 
     def run_game(self):
         log.info("started run game")
@@ -36,17 +69,19 @@ class Client:
             log.error("Connection error")
             sys.exit()
         is_active = True
-        strategy = None
-        if self.strategy_name.lower() == "dumb":
-            strategy = Dumb()
-        elif self.strategy_name.lower() == "second":
-            strategy = Second()
-        player = Player(self.player_name, strategy)
+        strategy = STRATEGIES.get(self.strategy_name.lower())
+        player = Player(
+            self.player_name,
+            strategy=None if strategy is None else strategy(),
+            ponder=self.ponder,
+        )
+        frames = FrameReader(soc)
         while is_active:
-            data = soc.recv(5120).decode("utf8")
-            if not data:
-                exit(code=0)
-            server_message = json.loads(data)
+            payload = frames.next_frame()
+            if payload is None:
+                break
+            self.codec = wire.codec_of(payload)
+            server_message = self.codec.decode(payload)
 
             try:
                 msg_type = ServerMessage(server_message["type"])
@@ -58,22 +93,20 @@ class Client:
                 # server should ask for join then send join request
                 # fmt: off
                 soc.sendall(
-                    json.dumps(
+                    encode_message(
                         {
                             "type": ClientMessage.JOIN.value,
                             "name": self.player_name,
                             "strategy": self.strategy_name,
+                            "state": "delta" if self.delta else "full",
+                            "encoding": self.encoding,
                         }
-                    ).encode("utf8")
+                    )
                 )
                 # fmt: on
             if msg_type is ServerMessage.ASK_FOR_MOVE:
-                # convert the json board into a Board
-                # convert the json tiles into Tiles
-                board = server_message["board"]
-                real_board = ReadOnlyBoard.json_to_board(board)
-                # player.receive_gamestate(real_board)
-
+                # the board was sent with the game state at the start of the
+                # turn, so only the hand is needed
                 # a list of tiles, call json to tile on each
                 real_tiles = [ReadOnlyTile.json_to_tile(tile) for tile in server_message["tiles"]]
 
@@ -82,12 +115,15 @@ class Client:
 
                 # fmt: off
                 soc.sendall(
-                    json.dumps(
-                        {
-                            "type": ClientMessage.MOVE_REQUEST.value,
-                            **move.to_json()
-                        }
-                    ).encode("utf8")
+                    encode_frame(
+                        self.codec.encode(
+                            {
+                                "type": ClientMessage.MOVE_REQUEST.value,
+                                **move.to_json(),
+                                "version": self.version,
+                            }
+                        )
+                    )
                 )
                 # fmt: on
 
@@ -101,6 +137,7 @@ class Client:
                 player.receive_move_failure(server_message["reason"])
 
             if msg_type is ServerMessage.RECEIVE_GAME_STATE:
+                self.update_game_state(server_message)
                 # their own message type and the interface for player should
                 # support receiving them
                 player.tile = (
@@ -112,9 +149,32 @@ class Client:
                     Port[server_message["port"]] if server_message["port"] is not None else None
                 )
                 player.receive_gamestate(
-                    ReadOnlyBoard.json_to_board(server_message["board"]),
+                    self.board.readonly(),
                     PlayerState[server_message["state"]],
-                    server_message["players"],
+                    list(self.players.values()),
                 )
 
-        # soc.send(b"--quit--")
+        player.stop_pondering()
+        soc.close()
+
+    def update_game_state(self, msg):
+        """
+        Brings the board and players up to date with a game state message,
+        which holds either all of the board or the changes since the last
+        game state.
+        """
+        if "board" in msg:
+            self.board = Board.from_json(msg["board"])
+            self.players = {}
+            self.version = msg.get("version")
+        elif msg["since"] == self.version:
+            for tile in msg["placements"]:
+                self.board.add_tile(ReadOnlyTile.json_to_tile(tile), tile["x"], tile["y"])
+            self.version = msg["version"]
+        else:
+            # a delta from a different version than ours can't be applied,
+            # the server sends a snapshot once our next move tells it so
+            log.error(f"Game state from version {msg['since']}, at {self.version}")
+            self.version = None
+
+        self.players.update((p["color"], p) for p in msg["players"])
@@ -1,113 +1,342 @@
+import asyncio
 import json
 import logging
-import socket
-import sys
-from threading import Thread
+import time
 
 from Admin.referee import Referee
+from Common import wire
 from Common.constants import ClientMessage, ServerMessage
-from Common.logging import XSERVER_LOGGER_NAME
-from Common.utils import receive_input
-from Player.player import ProxyPlayer
+from Common.framing import read_frame
+from Common.logging import XSERVER_LOGGER_NAME, configure_logging
+from Common.utils import encode_message
+from Player.player import ProxyPlayer, SharedGameState
 
 
 log = logging.getLogger(__name__)
 xserver_log = logging.getLogger(XSERVER_LOGGER_NAME)
 
 
-def start_server(host, port):
-    server = Server(host, port)
-    server.start_server()
+def start_server(host, port, games=None, metrics_port=None):
+    configure_logging()
+    metrics = None
+    if metrics_port is not None:
+        from Admin.metrics import RefereeMetrics
+
+        metrics = RefereeMetrics()
+    server = Server(host, port, games=games, metrics=metrics, metrics_port=metrics_port)
+    asyncio.run(server.serve())
 
 
 class Server:
-    def __init__(self, host="127.0.0.1", port=8000):
+    """
+    Hosts games of Tsuro between remote players.
+
+    Keeps accepting connections, and groups the players that join into games
+    of `Referee.MIN_PLAYERS` to `Referee.MAX_PLAYERS`. A game starts as soon
+    as enough players are waiting for a full game, or when the minimum has
+    been waiting for `lobby_timeout` seconds. Each game runs as its own task,
+    so one process hosts many games at once. Once no client has connected
+    for `accept_timeout` seconds while there are too few players for a game,
+    the players waiting are ejected, and no more games are started.
+
+    With metrics, every game is timed, see :mod:`Admin.metrics`, and with a
+    metrics port, they are served over HTTP at `/metrics` in the Prometheus
+    text format, and at `/metrics.json` as JSON summaries.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=8000,
+        games=None,
+        join_timeout=30,
+        lobby_timeout=3,
+        accept_timeout=30,
+        metrics=None,
+        metrics_port=None,
+    ):
+        """
+        :param games: optional, the number of games to host before stopping
+        :param join_timeout: seconds a client has to join after connecting
+        :param lobby_timeout: seconds to wait for more players once there
+            are enough for a game
+        :param accept_timeout: seconds to wait for a client to connect while
+            there are too few players for a game, `None` for no limit
+        :param metrics: optional, the :class:`Admin.metrics.RefereeMetrics`
+            to time every game with
+        :param metrics_port: optional, the port to serve the metrics on
+        """
         self.host = host
         self.port = port
-        self.clients = []
-        self.accepting_connections = True
-        self.players = []
-        self.MAX_BUFFER_SIZE = 5120
+        self.games = games
+        self.join_timeout = join_timeout
+        self.lobby_timeout = lobby_timeout
+        self.accept_timeout = accept_timeout
+        self.metrics = metrics
+        self.metrics_port = metrics_port
+        # players that joined and are waiting for a game
+        self.lobby = []
+        # the time there were first enough players in the lobby for a game
+        self.lobby_ready_at = None
+        # the time the last client connected
+        self.connected_at = time.monotonic()
+        # the number of players that have joined, used as the next one's age
+        self.joined = 0
+        self.games_started = 0
+        self.games_finished = 0
+        # the referee of every game that has ended
+        self.results = []
+        self.tasks = set()
 
-    def start_server(self):
+    async def serve(self):
+        """
+        Accepts connections until the given number of games have been played,
+        or forever.
+        """
+        self._lobby_changed = asyncio.Event()
+        self._done = asyncio.Event()
+        self.connected_at = time.monotonic()
 
-        soc = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        soc.setsockopt(
-            socket.SOL_SOCKET, socket.SO_REUSEADDR, 1
-        )  # SO_REUSEADDR flag tells the kernel to reuse a local socket in TIME_WAIT state, without waiting for its natural timeout to expire
-        soc.settimeout(30)
-        soc.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        log.info("Socket created")
+        server = await asyncio.start_server(
+            self.handle_client, self.host, self.port, reuse_address=True, backlog=1024
+        )
+        # the port that was bound, in case it was 0
+        self.port = server.sockets[0].getsockname()[1]
+        log.info(f"Socket now listening on {self.host}:{self.port}")
 
+        metrics_server = None
+        if self.metrics is not None and self.metrics_port is not None:
+            metrics_server = await asyncio.start_server(
+                self.serve_metrics, self.host, self.metrics_port, reuse_address=True
+            )
+            self.metrics_port = metrics_server.sockets[0].getsockname()[1]
+            log.info(f"Serving metrics on {self.host}:{self.metrics_port}")
+
+        self._lobby = lobby = asyncio.ensure_future(self.run_lobby())
         try:
-            soc.bind((self.host, self.port))
-        except:
-            log.error("Bind failed. Error : " + str(sys.exc_info()))
-            sys.exit()
+            await self._done.wait()
+        finally:
+            if metrics_server is not None:
+                metrics_server.close()
+            server.close()
+            lobby.cancel()
+            await server.wait_closed()
+            for task in list(self.tasks):
+                task.cancel()
 
-        soc.listen(5)  # queue up to 5 requests
-        log.info(f"Socket now listening on {self.host}:{self.port}")
+    async def handle_client(self, reader, writer):
+        """
+        Asks a newly connected client to join, and puts them in the lobby.
+        """
+        address = writer.get_extra_info("peername")
+        log.info(f"Connected with {address}")
+        self.connected_at = time.monotonic()
 
-        # infinite loop- do not reset for every requests
-        while self.accepting_connections and len(self.clients) <= 5:
-            try:
-                connection, address = soc.accept()
-                ip, port = str(address[0]), str(address[1])
-                # connection message
-                log.info("Connected with " + ip + ":" + port)
-                try:
-                    Thread(target=self.client_thread, args=(connection, ip, port)).start()
-                    self.clients.append((ip, port))
-
-                except:
-                    log.exception("Thread did not start.")
-            except socket.timeout as e:
-                self.accepting_connections = False
-
-        self.run_game()
-        soc.close()
+        msg = {"type": ServerMessage.ASK_FOR_PLAYER_INFO.value}
+        writer.write(encode_message(msg))
+        xserver_log.info(f">> {json.dumps(msg)}")
 
-    """
-        This can be where we prompt the client to give us data?
-        This can also be where we process that data and then pass it on to the game
-    """
+        try:
+            payload = await asyncio.wait_for(read_frame(reader), self.join_timeout)
+        except (asyncio.TimeoutError, ConnectionError, ValueError):
+            log.error(f"{address} did not join")
+            writer.close()
+            return
+        try:
+            client_input = wire.decode(payload) if payload else {}
+        except ValueError:
+            client_input = payload
+        xserver_log.info(f"<< {client_input}")
 
-    def run_game(self):
+        if not _is_join(client_input):
+            writer.write(encode_message({"type": ServerMessage.EJECTED.value}))
+            writer.close()
+            log.error(f"Expected {ClientMessage.JOIN.value} with a name, got {client_input}")
+            return
 
-        """
-        prompt players for moves in order of their position in the players array
-        -their move is determined by their strategies
-        -run the game on each player's move until the game ends
+        log.info("Client is sending player data to join game")
+        delta = client_input.get("state") == "delta"
+        # clients that don't ask for an encoding, or ask for an unknown one,
+        # are sent JSON
+        codec = wire.CODECS.get(client_input.get("encoding"), wire.JSON)
+        player = ProxyPlayer(client_input["name"], self.joined, reader, writer, delta, codec=codec)
+        if self._lobby.done():
+            player.eject("no more games are hosted")
+            return
+        self.lobby.append(player)
+        self.joined += 1
+        self._lobby_changed.set()
 
-        need to have a ref set up
+    async def serve_metrics(self, reader, writer):
         """
-        log.info("running game")
-        referee = Referee(self.players)
-        while referee.run_turn():
+        Answers an HTTP request for the metrics, e.g. from Prometheus.
+        """
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.join_timeout)
+            path = request.split(b" ", 2)[1].decode()
+        except (
+            asyncio.TimeoutError,
+            asyncio.IncompleteReadError,
+            ConnectionError,
+            IndexError,
+            UnicodeDecodeError,
+        ):
+            writer.close()
+            return
+
+        if path == "/metrics":
+            status, content_type = "200 OK", "text/plain; version=0.0.4"
+            body = self.metrics.to_prometheus().encode()
+        elif path == "/metrics.json":
+            status, content_type = "200 OK", "application/json"
+            body = self.metrics.dumps().encode()
+        else:
+            status, content_type, body = "404 Not Found", "text/plain", b"Not Found\n"
+
+        head = (
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n"
+        )
+        writer.write(head.encode() + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
             pass
+        writer.close()
 
-    def client_thread(self, connection, ip, port):
-        msg_str = json.dumps({"type": ServerMessage.ASK_FOR_PLAYER_INFO.value})
-        connection.sendall(msg_str.encode("utf8"))
-        xserver_log.info(">> {msg_str}")
-        # check timeout - they have to respond within a certain amt of time - use select
-        # soc.settimeout(30)
+    async def run_lobby(self):
+        """
+        Starts games from the players in the lobby as they fill up, until
+        enough games have started, or no client connected in time.
+        """
+        while True:
+            # players that disconnected while waiting can't play
+            self.lobby = [p for p in self.lobby if not p.writer.is_closing()]
+
+            if len(self.lobby) < Referee.MIN_PLAYERS:
+                self.lobby_ready_at = None
+            elif self.lobby_ready_at is None:
+                self.lobby_ready_at = time.monotonic()
+
+            waited = time.monotonic() - (self.lobby_ready_at or 0)
+            if len(self.lobby) >= Referee.MAX_PLAYERS or (
+                self.lobby_ready_at is not None and waited >= self.lobby_timeout
+            ):
+                self._start_game(self.lobby[: Referee.MAX_PLAYERS])
+                self.lobby = self.lobby[Referee.MAX_PLAYERS :]
+                self.lobby_ready_at = None
+                if self.games is not None and self.games_started >= self.games:
+                    return
+                continue
+
+            self._lobby_changed.clear()
+            timeout = self._lobby_wait(waited)
+            if timeout is not None and timeout <= 0:
+                self._close_lobby()
+                return
+            try:
+                await asyncio.wait_for(self._lobby_changed.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _lobby_wait(self, waited):
+        """
+        :param waited: seconds there have been enough players for a game
+        :return: seconds to wait for the lobby to change, `None` for no
+            limit, and 0 or less if no client connected in time
+        """
+        if self.lobby_ready_at is not None:
+            return self.lobby_timeout - waited
+        if self.accept_timeout is None:
+            return None
+        return self.connected_at + self.accept_timeout - time.monotonic()
 
-        # this will be the decoded json
-        client_input = receive_input(connection, self.MAX_BUFFER_SIZE)
-        xserver_log.info(f"<< {json.dumps(client_input)}")
+    def _close_lobby(self):
+        """
+        Ejects the players waiting for a game, and stops once the games
+        started have finished.
+        """
+        log.error(f"No client connected for {self.accept_timeout} seconds")
+        for player in self.lobby:
+            player.eject("not enough players joined")
+        self.lobby = []
+        self.games = self.games_started
+        if self.games_finished >= self.games:
+            self._done.set()
+
+    def _start_game(self, players):
+        self.games_started += 1
+        task = asyncio.ensure_future(self.run_game(players))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def run_game(self, players):
+        """
+        Plays a game between the players, then closes their connections.
+        """
+        log.info(f"running game between {', '.join(p.name for p in players)}")
+        shared = SharedGameState()
+        for player in players:
+            player.shared = shared
 
         try:
-            msg_type = ClientMessage(client_input["type"])
-        except ValueError:
-            msg_str = json.dumps({"type": ServerMessage.EJECTED.value})
-            connection.sendall(msg_str.encode("utf8"))
-            log.error(f"{client_input['type']} is not a valid message type")
-
-        if msg_type is ClientMessage.JOIN:
-            log.info("Client is sending player data to join game")
-            self.players.append(
-                ProxyPlayer(
-                    client_input["name"], len(self.players), connection, self.MAX_BUFFER_SIZE
-                )
-            )
+            referee = Referee(players, metrics=self.metrics)
+            metrics = self.metrics
+            while True:
+                # the players in every game state message sent this turn are
+                # encoded once, so bring all of their states up to date first
+                shared.new_turn()
+                for player in players:
+                    player.state = referee.player_states[player].name
+
+                player = referee.start_turn()
+                if metrics is None:
+                    await self._drain(players)
+                else:
+                    start = time.perf_counter()
+                    await self._drain(players)
+                    metrics.lap("drain", start)
+                if player is None:
+                    break
+
+                if metrics is None:
+                    referee.finish_turn(await player.next_move())
+                    continue
+
+                start = time.perf_counter()
+                next_move = await player.next_move()
+                metrics.lap("next_move", start)
+                referee.finish_turn(next_move)
+
+            self.results.append(referee)
+        except Exception:
+            log.exception("game ended with an error")
+        finally:
+            for player in players:
+                player.writer.close()
+
+            self.games_finished += 1
+            if self.games is not None and self.games_finished >= self.games:
+                self._done.set()
+
+    @staticmethod
+    async def _drain(players):
+        """
+        Waits for the messages to every player to be flushed, so a slow client
+        only holds up its own game.
+        """
+        for player in players:
+            try:
+                await player.writer.drain()
+            except ConnectionError:
+                # the player is ejected when they are next asked for a move
+                pass
+
+
+def _is_join(msg):
+    """:return: whether the message asks to join under a name"""
+    return (
+        isinstance(msg, dict)
+        and msg.get("type") == ClientMessage.JOIN.value
+        and isinstance(msg.get("name"), str)
+    )
@@ -0,0 +1,182 @@
+"""
+Runs many test harness cases in one process, rather than starting an
+interpreter per case with the `x*` scripts.
+
+    ./xbatch 3/board-tests 4/rules-tests 5/ref-tests
+    ./xbatch --harness ref --workers 4 cases/*.json
+
+Every case is an input file for one of the harnesses, which is picked by the
+directory it is in, e.g. `4/rules-tests`, or with `--harness`. The inputs of
+a directory are its `.json` files, except for the expected outputs: the
+expected output of `N-in.json` is `N-out.json`, when there is one. An expected
+output that is not JSON is the error the harness should print instead.
+
+Prints a JSON object per case as it finishes, with its result or error, how
+long it took, and whether it matched the expected output, then a summary.
+Exits with a status code of 1 if any case failed or raised an error.
+"""
+import argparse
+import glob
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+from multiprocessing import Pool
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from Admin.tournament import quiet_logging
+from Common.errors import TsuroError
+
+
+class Harness(NamedTuple):
+    # the module of the harness, and its function from the parsed input to
+    # the result printed as JSON
+    module: str
+    function: str
+    # the directory of its cases
+    tests: str
+    # whether the order of a list result matters
+    ordered: bool = True
+
+
+HARNESSES = {
+    "board": Harness("3.board_harness", "get_results", "3/board-tests", ordered=False),
+    "rules": Harness("4.rules_harness", "run", "4/rules-tests"),
+    "ref": Harness("5.ref_harness", "run_game", "5/ref-tests"),
+}
+
+
+class Case(NamedTuple):
+    harness: str
+    path: str
+    # the path of the expected output, if any
+    expected: Optional[str] = None
+
+
+def find_cases(paths: List[str], harness: Optional[str] = None) -> List[Case]:
+    """
+    :param paths: directories of cases, or input files
+    :param harness: optional, the harness to run every case with, instead of
+        picking it by directory
+    :return: the cases, in order
+    """
+    cases = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(
+                f for f in glob.glob(os.path.join(path, "*.json")) if not f.endswith("-out.json")
+            )
+        else:
+            files = [path]
+
+        for file in files:
+            name = harness or _harness_of(file)
+            expected = None
+            if file.endswith("-in.json"):
+                expected = file[: -len("-in.json")] + "-out.json"
+                if not os.path.exists(expected):
+                    expected = None
+            cases.append(Case(name, file, expected))
+    return cases
+
+
+def _harness_of(path: str):
+    directory = os.path.normpath(os.path.dirname(os.path.abspath(path)))
+    for name, harness in HARNESSES.items():
+        if directory.endswith(os.path.normpath(harness.tests)):
+            return name
+    raise ValueError(f"No harness runs the cases in {directory}, pick one with --harness")
+
+
+def run_case(case: Case) -> Dict:
+    """
+    Runs a case with its harness, as its `x*` script would.
+
+    :return: a JSON-serializable report of the case
+    """
+    harness = HARNESSES[case.harness]
+    report = {"case": case.path, "harness": case.harness}
+
+    start = time.perf_counter()
+    try:
+        run = getattr(importlib.import_module(harness.module), harness.function)
+        with open(case.path) as f:
+            result = run(json.load(f))
+        # as the result is printed by the harness
+        report["result"] = json.loads(json.dumps(result))
+    except (json.JSONDecodeError, TsuroError) as e:
+        # as the harness prints errors in its input
+        report["error"] = f"Error: {e}"
+    except Exception as e:
+        report["error"] = f"{type(e).__name__}: {e}"
+    report["ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    if case.expected is None:
+        report["status"] = "error" if "error" in report else "ok"
+        return report
+
+    with open(case.expected) as f:
+        expected = f.read().strip()
+    try:
+        expected = json.loads(expected)
+        same = "result" in report and _same(report["result"], expected, harness.ordered)
+    except json.JSONDecodeError:
+        same = report.get("error") == expected
+
+    report["status"] = "pass" if same else "fail"
+    if not same:
+        report["expected"] = expected
+    return report
+
+
+def _same(result, expected, ordered):
+    if ordered or not (isinstance(result, list) and isinstance(expected, list)):
+        return result == expected
+    return sorted(map(json.dumps, result)) == sorted(map(json.dumps, expected))
+
+
+def run_cases(cases: List[Case], workers: int = 1) -> Iterator[Dict]:
+    """
+    Runs the cases, yielding their reports in order.
+
+    :param workers: the number of worker processes, 1 runs every case in this
+        process
+    """
+    if workers == 1:
+        for case in cases:
+            with quiet_logging():
+                report = run_case(case)
+            yield report
+        return
+
+    with Pool(processes=workers, initializer=logging.disable, initargs=(logging.ERROR,)) as pool:
+        yield from pool.imap(run_case, cases)
+
+
+def parse_args(args: List[str]):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="+", help="directories of test cases, or input files")
+    parser.add_argument("--harness", choices=sorted(HARNESSES), help="the harness to run")
+    parser.add_argument("--workers", type=int, default=1, help="the number of worker processes")
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    try:
+        cases = find_cases(args.paths, args.harness)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        exit(code=1)
+
+    start = time.perf_counter()
+    statuses = {"pass": 0, "fail": 0, "error": 0, "ok": 0}
+    for report in run_cases(cases, args.workers):
+        statuses[report["status"]] += 1
+        print(json.dumps(report), flush=True)
+
+    summary = {"cases": len(cases), **statuses, "seconds": time.perf_counter() - start}
+    print(json.dumps(summary))
+    exit(code=1 if statuses["fail"] or statuses["error"] else 0)
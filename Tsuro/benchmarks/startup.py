@@ -0,0 +1,94 @@
+"""
+Measures how long short-lived processes, like the test harnesses, take to
+import the modules they need.
+
+    python3 -m benchmarks.startup --repeat 20
+
+Every import is timed in a fresh interpreter, in an empty working directory,
+and reported as the median time over the startup of a bare interpreter. Also
+reports which slow optional modules each import pulled in, and whether it
+created files, e.g. `xserver.log`.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+
+# the imports to time, by name
+TARGETS = {
+    "Common": "import Common.board, Common.placement, Common.rules, Common.tiles",
+    "Admin.referee": "import Admin.referee",
+    "Admin.observer": "import Admin.observer",
+    "Remote.server": "import Remote.server",
+}
+
+# modules that are slow to import, and only needed by some processes
+HEAVY_MODULES = ("asyncio", "logging.config", "multiprocessing", "PIL", "aggdraw")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# run in the child, after the import
+_REPORT = f"import sys; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+
+
+def _run(code, cwd):
+    """
+    :return: the seconds the interpreter took to run the code, and its output
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=cwd, env=env, stdout=subprocess.PIPE, check=True
+    )
+    return time.perf_counter() - start, result.stdout.decode().strip()
+
+
+def measure(repeat=10):
+    """
+    :return: a JSON-serializable report, by target
+    """
+    report = {}
+    with tempfile.TemporaryDirectory() as cwd:
+        bare = statistics.median(_run("pass", cwd)[0] for _ in range(repeat))
+        report["python"] = {"ms": bare * 1000}
+
+        for name, code in TARGETS.items():
+            times = []
+            for _ in range(repeat):
+                seconds, loaded = _run(f"{code}\n{_REPORT}", cwd)
+                times.append(seconds)
+
+            report[name] = {
+                "ms": (statistics.median(times) - bare) * 1000,
+                "loaded": [m for m in loaded.split(",") if m],
+                "files": sorted(os.listdir(cwd)),
+            }
+            for file in os.listdir(cwd):
+                os.remove(os.path.join(cwd, file))
+    return report
+
+
+def parse_args(args: List[str]):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10, help="the number of runs per import")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    report = measure(args.repeat)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'python':<16}{report.pop('python')['ms']:8.1f} ms")
+        for name, result in report.items():
+            extra = ", ".join(result["loaded"] + result["files"])
+            print(f"{name:<16}{result['ms']:+8.1f} ms  {extra}")
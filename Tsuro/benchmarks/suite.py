@@ -0,0 +1,380 @@
+"""
+Benchmarks of the hot paths of the game: tiles, the board, the rules, whole
+games, and the protocol.
+
+    python3 -m benchmarks.suite --out before.json
+    python3 -m benchmarks.suite --compare before.json --out after.json
+    python3 -m benchmarks.suite rules referee
+
+Every workload is built from a fixed seed, so runs are comparable between
+commits. Each benchmark is timed with `timeit`, repeating a number of calls
+long enough to measure, and reports the median time of an operation, and the
+operations per second. The report is JSON, and `--compare` prints the change
+in throughput from an earlier report, exiting with a status code of 1 if any
+benchmark got slower by more than `--threshold`.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import timeit
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Tuple
+
+from Admin.referee import Referee
+from Common import rules, wire
+from Common.board import Board
+from Common.constants import Rotation, ServerMessage
+from Common.placement import IntermediatePlacement
+from Common.tiles import Port, Tile
+from Common.utils import get_coordinates_in_direction
+from Remote.client import Client
+from Remote.server import Server
+from tests.games import play_game
+
+
+SEED = 4500
+
+# builds a workload from a seeded random number generator, returning a
+# function that runs it and the number of operations it runs
+Workload = Callable[[random.Random], Tuple[Callable[[], object], int]]
+
+BENCHMARKS: Dict[str, Workload] = {}
+
+
+def benchmark(name):
+    """Registers a workload under the given name."""
+
+    def register(workload: Workload):
+        BENCHMARKS[name] = workload
+        return workload
+
+    return register
+
+
+# the number of players of every game played
+_PLAYERS = 5
+
+
+def _played_board(rng):
+    """:return: the board at the end of a game"""
+    return play_game(["second"] * _PLAYERS, rng).board
+
+
+@benchmark("tiles.build")
+def tiles_build(rng):
+    faces = [(index, rotation) for index in range(Tile.NUMBER_OF_TILES) for rotation in Rotation]
+    rng.shuffle(faces)
+
+    def run():
+        for index, rotation in faces:
+            Tile.Builder.build(index, rotation)
+
+    return run, len(faces)
+
+
+@benchmark("tiles.rotate")
+def tiles_rotate(rng):
+    tiles = [Tile.Builder.build(i) for i in range(Tile.NUMBER_OF_TILES)]
+    rotations = [rng.choice(list(Rotation)) for _ in tiles]
+
+    def run():
+        for tile, rotation in zip(tiles, rotations):
+            tile.rotate_by(rotation)
+
+    return run, len(tiles)
+
+
+@benchmark("tiles.get_exit_port")
+def tiles_get_exit_port(rng):
+    probes = [
+        (Tile.Builder.build(i, rng.choice(list(Rotation))), port)
+        for i in range(Tile.NUMBER_OF_TILES)
+        for port in Port
+    ]
+    rng.shuffle(probes)
+
+    def run():
+        for tile, port in probes:
+            tile.get_exit_port(port)
+
+    return run, len(probes)
+
+
+@benchmark("board.get_tile_at")
+def board_get_tile_at(rng):
+    board = _played_board(rng)
+    # including the border around the board
+    probes = [(rng.randint(-1, Board.SIZE), rng.randint(-1, Board.SIZE)) for _ in range(1000)]
+
+    def run():
+        for x, y in probes:
+            board.get_tile_at(x, y)
+
+    return run, len(probes)
+
+
+def _rule_positions(rng, candidates=12):
+    """
+    :return: (placement, board, player) triples from the turns of a game: the
+        moves the player could be asked about, legal or not
+    """
+    positions = []
+
+    def step(referee, player):
+        board = referee.board.copy()
+        snapshot = SimpleNamespace(
+            color=player.color, tile=player.tile, port=player.port, tile_hand=player.tile_hand
+        )
+
+        if player.tile is None:
+            moves = rules.generate_legal_moves(board, snapshot)
+            placements = [m.to_placement(player.color) for m in moves]
+        else:
+            x, y = get_coordinates_in_direction(
+                player.tile.x, player.tile.y, player.port.direction
+            )
+            if not (0 <= x < Board.SIZE and 0 <= y < Board.SIZE):
+                return
+            placements = [
+                IntermediatePlacement(tile.index, rotation.value, player.color.value, x, y)
+                for tile in player.tile_hand
+                for rotation in Rotation
+            ]
+
+        for placement in rng.sample(placements, min(candidates, len(placements))):
+            positions.append((placement, board, snapshot))
+
+    play_game(["second"] * _PLAYERS, rng, step=step)
+    return positions
+
+
+def _rule_benchmark(rule):
+    def workload(rng):
+        positions = _rule_positions(rng)
+
+        def run():
+            for placement, board, player in positions:
+                rule.is_valid(placement, board, player)
+
+        return run, len(positions)
+
+    return workload
+
+
+for _rule in rules.ALL:
+    benchmark(f"rules.{type(_rule).__name__}.is_valid")(_rule_benchmark(_rule))
+
+
+@benchmark("rules.CompiledRules.validate")
+def rules_validate(rng):
+    validator = rules.CompiledRules(rules.ALL)
+    positions = _rule_positions(rng)
+
+    def run():
+        for placement, board, player in positions:
+            validator.validate(placement, board, player)
+
+    return run, len(positions)
+
+
+def _game_benchmark(strategy):
+    def workload(rng):
+        seed = rng.getrandbits(32)
+        return lambda: play_game([strategy] * _PLAYERS, seed), 1
+
+    return workload
+
+
+for _strategy in ("dumb", "second"):
+    benchmark(f"referee.game.{_strategy}")(_game_benchmark(_strategy))
+
+
+@benchmark("protocol.board_json.encode")
+def board_json_encode(rng):
+    board = _played_board(rng).readonly()
+    return lambda: json.dumps(board.get_json()), 1
+
+
+@benchmark("protocol.board_json.decode")
+def board_json_decode(rng):
+    data = json.dumps(_played_board(rng).readonly().get_json())
+    return lambda: Board.from_json(json.loads(data)), 1
+
+
+def _game_state_message(rng):
+    """:return: the game state sent to a player at the end of a game"""
+    referee = play_game(["second"] * _PLAYERS, rng)
+    players = [
+        {
+            "color": player.color.value,
+            "tile": player.tile.readonly().get_json() if player.tile is not None else None,
+            "port": player.port.name if player.port is not None else None,
+            "state": referee.player_states[player].name,
+        }
+        for player in referee.players
+    ]
+    return {
+        "type": ServerMessage.RECEIVE_GAME_STATE.value,
+        "board": referee.board.readonly().get_json(),
+        "players": players,
+    }
+
+
+def _codec_benchmark(codec):
+    def workload(rng):
+        msg = _game_state_message(rng)
+
+        def run():
+            codec.decode(codec.encode(msg))
+
+        return run, 1
+
+    return workload
+
+
+for _codec in wire.CODECS.values():
+    benchmark(f"protocol.{_codec.name}.game_state")(_codec_benchmark(_codec))
+
+
+@benchmark("server.loopback_game")
+def server_loopback_game(rng):
+    """A game between clients in threads, over loopback, hosted by a server."""
+
+    def run():
+        server = Server(port=0, games=1, lobby_timeout=60)
+        ready = threading.Event()
+
+        async def serve():
+            serving = asyncio.ensure_future(server.serve())
+            while server.port == 0:
+                await asyncio.sleep(0.001)
+            ready.set()
+            await serving
+
+        hosting = threading.Thread(target=asyncio.run, args=(serve(),))
+        hosting.start()
+        ready.wait()
+
+        clients = [
+            threading.Thread(target=Client(server.host, server.port, f"p{i}", "second").run_game)
+            for i in range(Referee.MAX_PLAYERS)
+        ]
+        for client in clients:
+            client.start()
+        for thread in clients + [hosting]:
+            thread.join()
+
+    return run, 1
+
+
+def measure(name, repeat=5, seed=SEED):
+    """
+    :return: the timings of the named benchmark
+    """
+    run, ops = BENCHMARKS[name](random.Random(seed))
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    seconds = [t / number / ops for t in timer.repeat(repeat=repeat, number=number)]
+    median = statistics.median(seconds)
+    return {
+        "ops": ops,
+        "calls": number,
+        "median": median,
+        "best": min(seconds),
+        "ops_per_sec": 1 / median,
+    }
+
+
+def run_suite(names: List[str], repeat=5, seed=SEED):
+    """
+    :return: a JSON-serializable report of the benchmarks
+    """
+    return {
+        "commit": _commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "benchmarks": {name: measure(name, repeat, seed) for name in names},
+    }
+
+
+def compare(old, new, threshold=0.1):
+    """
+    :param threshold: the fraction of throughput a benchmark may lose before
+        it is a regression
+    :return: the relative change in throughput of every benchmark in both
+        reports, and the names of the regressions
+    """
+    changes = {}
+    for name, result in new["benchmarks"].items():
+        if name in old["benchmarks"]:
+            before = old["benchmarks"][name]["ops_per_sec"]
+            changes[name] = result["ops_per_sec"] / before - 1
+    regressions = [name for name, change in changes.items() if change < -threshold]
+    return changes, regressions
+
+
+def _commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        return result.stdout.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(args: List[str]):
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "prefixes", nargs="*", help="run only the benchmarks with names starting with these"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="the number of timings to take")
+    parser.add_argument("--seed", type=int, default=SEED, help="the seed for the workloads")
+    parser.add_argument("--out", help="write the report to this file, rather than stdout")
+    parser.add_argument("--compare", metavar="REPORT", help="an earlier report to compare to")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="the fraction of throughput a benchmark may lose, default: 0.1",
+    )
+    parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+    return parser.parse_args(args)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    names = [n for n in BENCHMARKS if not args.prefixes or n.startswith(tuple(args.prefixes))]
+    if args.list:
+        print("\n".join(names))
+        exit()
+
+    # players log every move
+    logging.disable(logging.ERROR)
+    report = run_suite(names, args.repeat, args.seed)
+
+    if args.out is not None:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    elif args.compare is None:
+        print(json.dumps(report, indent=2))
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            old = json.load(f)
+        changes, regressions = compare(old, report, args.threshold)
+        for name, change in changes.items():
+            flag = "  REGRESSION" if name in regressions else ""
+            print(f"{name:<48}{change:+8.1%}{flag}")
+        exit(code=1 if regressions else 0)
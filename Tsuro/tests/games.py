@@ -0,0 +1,55 @@
+import random
+from unittest import TestCase
+
+from Admin.referee import Referee
+from Admin.tournament import quiet_logging
+from Common.tiles import Tile
+from Player.player import Player
+from Player.strategy import STRATEGIES
+
+
+def play_game(strategies, seed=7, step=None, metrics=None):
+    """
+    Plays a game between in-process players to its end.
+
+    :param strategies: the strategy of every player, or its name, see
+        `STRATEGIES`
+    :param seed: the seed to shuffle the tiles with, or a `random.Random`
+    :param step: optional, called with the referee and the player whose turn
+        it is, before they move
+    :param metrics: optional, the `RefereeMetrics` to time the game with
+    :return: the referee of the finished game
+    """
+    players = [
+        Player(f"p{i}", i, STRATEGIES[s]() if isinstance(s, str) else s)
+        for i, s in enumerate(strategies)
+    ]
+    rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+    deck = list(range(Tile.NUMBER_OF_TILES))
+    rng.shuffle(deck)
+    referee = Referee(players, deck=deck, metrics=metrics)
+    if step is None:
+        while referee.run_turn():
+            pass
+        return referee
+
+    while True:
+        player = referee.start_turn()
+        if player is None:
+            return referee
+        step(referee, player)
+        referee.finish_turn(player.next_move())
+
+
+class QuietTestCase(TestCase):
+    """
+    A test case that keeps the players from logging, see `quiet_logging`,
+    from `setUpClass` until every test of the class has run.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        quiet = quiet_logging()
+        quiet.__enter__()
+        cls.addClassCleanup(quiet.__exit__, None, None, None)
@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from batch_harness import Case, find_cases, run_case, run_cases
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestBatchHarness(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, value):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as f:
+            json.dump(value, f)
+        return path
+
+    def test_find_cases_by_directory(self):
+        cases = find_cases([os.path.join(ROOT, "3", "board-tests")])
+        self.assertEqual(len(cases), 6)
+        self.assertTrue(all(c.harness == "board" for c in cases))
+        self.assertTrue(cases[0].path.endswith("1-in.json"))
+        self.assertTrue(cases[0].expected.endswith("1-out.json"))
+
+    def test_find_cases_needs_a_harness(self):
+        path = self.write("1.json", [])
+        with self.assertRaises(ValueError):
+            find_cases([path])
+        self.assertEqual(find_cases([path], harness="ref"), [Case("ref", path)])
+
+    def test_compares_expected_output(self):
+        names = ["aardvark", "buffalo", "capybara"]
+        path = self.write("1-in.json", names)
+        self.write("1-out.json", {"losers": [], "winners": []})
+
+        report = run_case(find_cases([self.directory.name], harness="ref")[0])
+        self.assertEqual(report["status"], "fail")
+        self.assertEqual(report["expected"], {"losers": [], "winners": []})
+
+        self.write("1-out.json", report["result"])
+        report = run_case(Case("ref", path, os.path.join(self.directory.name, "1-out.json")))
+        self.assertEqual(report["status"], "pass")
+
+    def test_expected_error(self):
+        path = self.write("1-in.json", ["too", "few"])
+        with open(os.path.join(self.directory.name, "1-out.json"), "w") as f:
+            f.write("Error: Invalid number of players 2\n")
+
+        report = run_case(find_cases([path], harness="ref")[0])
+        self.assertEqual(report["status"], "pass")
+
+    def test_errors_are_reported(self):
+        path = self.write("1.json", ["too", "few"])
+        report = run_case(Case("ref", path))
+        self.assertEqual(report["status"], "error")
+        self.assertEqual(report["error"], "Error: Invalid number of players 2")
+
+    def test_workers_keep_case_order(self):
+        names = ["a", "b", "c", "d"]
+        cases = [Case("ref", self.write(f"{i}.json", names[: i + 3])) for i in range(2)]
+        reports = list(run_cases(cases * 2, workers=2))
+        self.assertEqual([r["case"] for r in reports], [c.path for c in cases * 2])
+        self.assertTrue(all(r["status"] == "ok" for r in reports))
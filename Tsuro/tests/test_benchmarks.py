@@ -0,0 +1,25 @@
+import random
+
+from benchmarks.suite import BENCHMARKS, compare
+from tests.games import QuietTestCase
+
+
+class TestBenchmarks(QuietTestCase):
+    def test_every_workload_runs(self):
+        for name, workload in BENCHMARKS.items():
+            with self.subTest(name=name):
+                run, ops = workload(random.Random(0))
+                self.assertGreater(ops, 0)
+                run()
+
+    def test_workloads_are_seeded(self):
+        workload = BENCHMARKS["rules.CompiledRules.validate"]
+        self.assertEqual(workload(random.Random(1))[1], workload(random.Random(1))[1])
+
+    def test_compare(self):
+        old = {"benchmarks": {"a": {"ops_per_sec": 100}, "b": {"ops_per_sec": 100}}}
+        new = {"benchmarks": {"a": {"ops_per_sec": 80}, "b": {"ops_per_sec": 95}, "c": {}}}
+        changes, regressions = compare(old, new, threshold=0.1)
+        self.assertAlmostEqual(changes["a"], -0.2)
+        self.assertAlmostEqual(changes["b"], -0.05)
+        self.assertEqual(regressions, ["a"])
@@ -0,0 +1,98 @@
+import random
+from unittest import TestCase
+
+from Common.board import Board, ReadOnlyBoard
+from Common.constants import Color, Direction, OutOfBounds, Rotation
+from Common.errors import InvalidPlacementError
+from Common.placement import InitialPlacement, IntermediatePlacement
+from Common.tiles import Port, Tile
+
+
+class TestBoardCells(TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.tile = Tile.Builder.build(5, Rotation.TWO)
+        self.board.add_tile(self.tile, 9, 0)
+
+    def test_get_tile_at(self):
+        self.assertIs(self.board.get_tile_at(9, 0), self.tile)
+        self.assertIsNone(self.board.get_tile_at(0, 0))
+
+    def test_get_tile_at_out_of_bounds(self):
+        for x, y in ((10, 0), (9, -1), (-1, 5), (5, 10), (-5, 100)):
+            with self.subTest(x=x, y=y):
+                self.assertIs(self.board.get_tile_at(x, y), OutOfBounds)
+
+    def test_cells(self):
+        cell = Board.cell_index(9, 0)
+        self.assertEqual(self.board.cells[cell], self.tile.face.code + 1)
+        self.assertEqual(self.board.cells[Board.cell_index(0, 0)], Board.EMPTY)
+        east = cell + Board.OFFSETS[Direction.EAST]
+        self.assertEqual(self.board.cells[east], Board.BORDER)
+        self.assertEqual(Board.cell_coordinates(cell), (9, 0))
+
+    def test_add_tile_sets_coordinates(self):
+        self.assertEqual((self.tile.x, self.tile.y), (9, 0))
+        self.assertEqual(self.board.tiles, {self.tile})
+
+    def test_add_tile_on_a_tile(self):
+        key, cells = self.board.key, bytes(self.board.cells)
+        with self.assertRaises(InvalidPlacementError):
+            self.board.add_tile(Tile.Builder.build(7), 9, 0)
+        self.assertIs(self.board.get_tile_at(9, 0), self.tile)
+        self.assertEqual((self.board.key, bytes(self.board.cells)), (key, cells))
+
+    def test_json_round_trip(self):
+        json = self.board.readonly().get_json()
+        self.assertEqual(json[0][9], {"index": 5, "rotation": 180, "x": 9, "y": 0})
+        self.assertEqual(ReadOnlyBoard.json_to_board(json).get_json(), json)
+
+
+class TestBoardUndo(TestCase):
+    def setUp(self):
+        self.board = Board()
+
+    def snapshot(self):
+        board = self.board
+        return bytes(board.cells), board.paths.ends.tobytes(), dict(board.starts)
+
+    def test_apply_moves_player(self):
+        self.board.apply(InitialPlacement(0, 0, "red", 0, 0, "A"))
+        self.board.apply(IntermediatePlacement(0, 0, "red", 0, 1))
+        self.assertEqual(self.board.player_end(Color.RED), Board.endpoint(0, 2, Port.A))
+
+    def test_undo_restores_board(self):
+        before = self.snapshot()
+        self.board.apply(InitialPlacement(0, 0, "red", 0, 0, "A"))
+        self.board.undo()
+        self.assertEqual(self.snapshot(), before)
+        self.assertIsNone(self.board.get_tile_at(0, 0))
+
+    def test_undo_random_placements(self):
+        rng = random.Random(4500)
+        cells = [(x, y) for x in range(Board.SIZE) for y in range(Board.SIZE)]
+        rng.shuffle(cells)
+
+        snapshots = []
+        for x, y in cells:
+            snapshots.append(self.snapshot())
+            rotation = rng.choice(list(Rotation))
+            self.board.add_tile(Tile.Builder.build(rng.randrange(35), rotation), x, y)
+
+        while snapshots:
+            self.board.undo()
+            self.assertEqual(self.snapshot(), snapshots.pop())
+
+    def test_copy_is_independent(self):
+        self.board.apply(InitialPlacement(0, 0, "red", 0, 0, "A"))
+        copy = self.board.copy()
+        copy.apply(IntermediatePlacement(0, 0, "red", 0, 1))
+        self.assertIsNone(self.board.get_tile_at(0, 1))
+        self.assertEqual(self.board.player_end(Color.RED), Board.endpoint(0, 1, Port.B))
+
+    def test_track_player(self):
+        self.board.apply(InitialPlacement(0, 0, "red", 0, 0, "A"))
+        copy = Board()
+        copy.add_tile(Tile.Builder.build(0), 0, 0)
+        copy.track_player(Color.RED, 0, 0, Port.E)
+        self.assertEqual(copy.starts, self.board.starts)
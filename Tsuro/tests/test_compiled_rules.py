@@ -0,0 +1,114 @@
+from unittest import TestCase
+
+from Admin.referee import Referee
+from Common import rules
+from Common.board import Board
+from Common.constants import Color
+from Common.placement import InitialPlacement, IntermediatePlacement
+from Common.rules import CompiledRules
+from Common.tiles import Tile
+from Player.player import Player
+
+
+class TestCompiledRules(TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.board.add_tile(Tile.Builder.build(0), 5, 0)
+        self.player = Player("player")
+        self.player.color = Color.RED
+        self.player.tile_hand = [Tile.Builder.build(i).readonly() for i in (0, 1, 2)]
+        self.validator = CompiledRules(rules.ALL)
+
+    def test_valid(self):
+        placement = InitialPlacement(0, 0, "red", 0, 0, "A")
+        self.assertEqual(self.validator.validate(placement, self.board, self.player), (True, None))
+        self.assertEqual(self.validator.violations(placement, self.board, self.player), [])
+
+    def test_validate_reports_first_violation(self):
+        # occupied, and next to a tile
+        placement = InitialPlacement(0, 0, "red", 5, 0, "A")
+        self.assertEqual(
+            self.validator.validate(placement, self.board, self.player),
+            (False, rules.UnoccupiedSpace.ERROR_MSG),
+        )
+
+    def test_violations_reports_every_violation(self):
+        placement = InitialPlacement(0, 0, "red", 5, 1, "A")
+        self.assertEqual(
+            self.validator.violations(placement, self.board, self.player),
+            [
+                rules.FirstMoveOnBorder.ERROR_MSG,
+                rules.FirstMoveCheckNeighbors.ERROR_MSG,
+                rules.FirstMoveOutsidePort.ERROR_MSG,
+            ],
+        )
+
+    def test_expected_violations(self):
+        cases = [
+            (InitialPlacement(0, 0, "red", 0, 0, "A"), []),
+            (InitialPlacement(0, 0, "red", 0, 0, "C"), [rules.FirstMoveOutsidePort]),
+            (InitialPlacement(0, 0, "red", 4, 0, "A"), [rules.FirstMoveCheckNeighbors]),
+            (InitialPlacement(0, 0, "red", 5, 0, "A"), [rules.UnoccupiedSpace]),
+            (
+                InitialPlacement(0, 0, "red", 3, 3, "A"),
+                [rules.FirstMoveOnBorder, rules.FirstMoveOutsidePort],
+            ),
+            # tile 4 leads from H to A, off of the board, where tile 0 in the
+            # hand leads from H to C
+            (InitialPlacement(4, 0, "red", 0, 0, "H"), [rules.WillPlayerSurvive]),
+            (
+                IntermediatePlacement(1, 90, "red", 3, 3),
+                [rules.InitialPlacementFirstOnly, rules.IntermediateCheckPlacement],
+            ),
+        ]
+        for placement, violated in cases:
+            with self.subTest(placement=placement.to_json()):
+                expected = [rule.ERROR_MSG for rule in violated]
+                self.assertEqual(
+                    self.validator.violations(placement, self.board, self.player), expected
+                )
+                found = [
+                    message
+                    for is_valid, message in (
+                        rule.is_valid(placement, self.board.readonly(), self.player)
+                        for rule in rules.ALL
+                    )
+                    if not is_valid
+                ]
+                self.assertEqual(found, expected)
+
+    def test_rules_implementing_is_valid(self):
+        class NotOnTheDiagonal(rules.Rule):
+            def is_valid(self, next_move, board, player):
+                if next_move.x == next_move.y:
+                    return False, "on the diagonal"
+                return True, None
+
+        validator = CompiledRules([rules.UnoccupiedSpace(), NotOnTheDiagonal()])
+        placement = InitialPlacement(0, 0, "red", 0, 0, "A")
+        self.assertEqual(
+            validator.validate(placement, self.board, self.player), (False, "on the diagonal")
+        )
+        placement = InitialPlacement(0, 0, "red", 0, 1, "H")
+        self.assertEqual(validator.validate(placement, self.board, self.player), (True, None))
+
+        with self.assertRaises(TypeError):
+
+            class Empty(rules.Rule):
+                pass
+
+    def test_referee_checks_its_rules(self):
+        referee = Referee([Player(f"p{i}", i) for i in range(3)])
+        player, board = referee.turn, referee.board
+        placement = InitialPlacement(0, 0, player.color.value, 0, 1, "H")
+        self.assertEqual(referee.validator.validate(placement, board, player), (True, None))
+
+        referee.rules = referee.rules + (_Never(),)
+        self.assertEqual(referee.validator.validate(placement, board, player), (False, "never"))
+        with self.assertRaises(AttributeError):
+            referee.rules.append(_Never())
+
+
+class _Never(rules.Rule):
+    def is_valid(self, next_move, board, player):
+        return False, "never"
@@ -0,0 +1,163 @@
+import random
+from types import SimpleNamespace
+
+from Common import rules
+from Common.board import Board
+from Common.constants import Color
+from Common.tiles import FACES, Port, Tile
+from Common.utils import get_coordinates_in_direction
+from Player.endgame import EndgameSolver, reachable
+from Player.search import Position
+from Player.strategy import STRATEGIES, Endgame, Second
+from tests.games import QuietTestCase, play_game
+
+
+def endgame(seed, empty, players=3):
+    """
+    :return: a board with random tiles on all but the given number of
+        spaces, and players at the end of paths from the border, the first
+        one to move
+    """
+    rng = random.Random(seed)
+    spaces = [(x, y) for x in range(Board.SIZE) for y in range(Board.SIZE)]
+    rng.shuffle(spaces)
+    holes, board = spaces[:empty], Board()
+    for x, y in spaces[empty:]:
+        board.add_tile(Tile.Builder.build(rng.randrange(Tile.NUMBER_OF_TILES)), x, y)
+
+    fronts = []
+    for x, y in holes:
+        for port in Port:
+            u, v = get_coordinates_in_direction(x, y, port.direction)
+            end = board.path_end(Board.endpoint(x, y, port))
+            on_board = 0 <= u < Board.SIZE and 0 <= v < Board.SIZE
+            if on_board and (u, v) not in holes and board.is_border_endpoint(end):
+                fronts.append((board.get_tile_at(u, v), port.neighbor))
+
+    hand = [Tile.Builder.build(rng.randrange(Tile.NUMBER_OF_TILES)) for _ in range(2)]
+    chosen = rng.sample(fronts, min(players, len(fronts)))
+    others = [
+        SimpleNamespace(color=color, tile=tile, port=port, players=None)
+        for color, (tile, port) in zip(Color, chosen)
+    ]
+    player = SimpleNamespace(**vars(others[0]))
+    player.tile_hand, player.players = hand, others
+    return board, player
+
+
+def solve(position, color, solved):
+    """
+    The value of the position for the player, from every hand of two tiles
+    the player to move could be dealt.
+    """
+    key = (position.key, position.to_move)
+    if key not in solved:
+        to_move, after = position.to_move, {}
+        for face in (face for faces in FACES for face in faces):
+            position.play(face)
+            after[face] = outcome(position, color, solved)
+            position.undo()
+
+        total = 0.0
+        for a in range(Tile.NUMBER_OF_TILES):
+            for b in range(Tile.NUMBER_OF_TILES):
+                values = [after[face] for face in position.moves(to_move, [a, b])]
+                total += max(values) if to_move is color else min(values)
+        solved[key] = total / Tile.NUMBER_OF_TILES ** 2
+    return solved[key]
+
+
+def outcome(position, color, solved):
+    if color not in position.alive:
+        return 0.0 if position.alive else 0.5
+    if position.is_over:
+        return 1.0
+    return solve(position, color, solved)
+
+
+class TestEndgameSolver(QuietTestCase):
+    def test_matches_brute_force(self):
+        searched = 0
+        for seed, empty in [(9, 3), (2, 4), (11, 4), (6, 5), (7, 5)]:
+            board, player = endgame(seed, empty)
+            solver = EndgameSolver(node_limit=None, time_limit=None, max_reachable=empty)
+            placement, value = solver.solve(player, board)
+            searched += solver.nodes
+
+            position, solved, exact = Position.of(player, board), {}, []
+            for move in rules.generate_legal_moves(board, player):
+                position.play_move(move)
+                exact.append(outcome(position, player.color, solved))
+                position.undo()
+            self.assertAlmostEqual(value, max(exact))
+
+            legal = rules.generate_legal_moves(board, player)
+            self.assertIn(
+                placement.to_json(), [m.to_placement(player.color).to_json() for m in legal]
+            )
+        self.assertGreater(searched, 0)
+
+    def test_limits(self):
+        board, player = endgame(1, 5)
+        solver = EndgameSolver(max_reachable=5, node_limit=50, time_limit=None)
+        self.assertIsNone(solver.solve(player, board))
+        self.assertEqual(solver.nodes, 51)
+
+        solver = EndgameSolver(max_reachable=5, node_limit=None, time_limit=0.01)
+        self.assertIsNone(solver.solve(player, board))
+
+    def test_only_solves_endgames(self):
+        board, player = endgame(11, 4)
+        # the players are cut off from two of the empty spaces
+        self.assertEqual(reachable(Position.of(player, board)), 2)
+        self.assertIsNone(EndgameSolver(max_reachable=1).solve(player, board))
+        self.assertIsNotNone(EndgameSolver(max_reachable=2).solve(player, board))
+
+    def test_reachable_bounds_the_placements_left(self):
+        for seed in range(5):
+            bounds = []
+
+            def step(referee, player):
+                if player.tile is not None:
+                    bounds.append(reachable(Position.of(player, player.board)))
+
+            play_game([Second() for _ in range(3)], seed=seed, step=step)
+            for placed, bound in enumerate(bounds):
+                self.assertLessEqual(len(bounds) - placed, bound)
+
+    def test_positions_are_cached(self):
+        board, player = endgame(7, 5)
+        solver = EndgameSolver(max_reachable=5, node_limit=None, time_limit=None)
+        placement, value = solver.solve(player, board)
+        self.assertGreater(solver.nodes, 0)
+        again, cached = solver.solve(player, board)
+        self.assertEqual((again.to_json(), cached), (placement.to_json(), value))
+        self.assertEqual(solver.nodes, 0)
+
+        # the values are for the player solved for
+        other = SimpleNamespace(**vars(player.players[1]))
+        other.tile_hand, other.players = player.tile_hand, player.players
+        self.assertIsNotNone(solver.solve(other, board))
+        solver.solve(player, board)
+        self.assertGreater(solver.nodes, 0)
+
+
+class TestEndgame(QuietTestCase):
+    def test_falls_back(self):
+        board, player = endgame(1, 5)
+        strategy = Endgame(fallback=Second(), max_reachable=5, node_limit=50)
+        move = strategy.next_move(player, board)
+        self.assertFalse(strategy.solved)
+        self.assertEqual(move.to_json(), Second().next_move(player, board).to_json())
+
+        board, player = endgame(11, 4)
+        move = strategy.next_move(player, board)
+        self.assertTrue(strategy.solved)
+        self.assertEqual(move.to_json(), strategy.solver.solve(player, board)[0].to_json())
+
+    def test_plays_games(self):
+        strategy = STRATEGIES["endgame"](fallback=Second())
+        referee = play_game([strategy, Second(), Second()])
+
+        deaths = {p.name: state.name for d in referee.dead.values() for p, state in d}
+        self.assertNotEqual(deaths["p0"], "EJECTED")
@@ -0,0 +1,63 @@
+import asyncio
+import json
+import socket
+from unittest import TestCase
+
+from Common.framing import FrameReader, encode_frame, read_frame
+from Common.utils import encode_message, receive_input
+
+
+class TestFrameReader(TestCase):
+    def setUp(self):
+        self.sender, receiver = socket.socketpair()
+        self.frames = FrameReader(receiver, buffer_size=16)
+
+    def tearDown(self):
+        self.sender.close()
+        self.frames.connection.close()
+
+    def test_several_frames_in_one_read(self):
+        self.sender.sendall(b"".join(encode_frame(bytes([i]) * i) for i in range(5)))
+        for i in range(5):
+            self.assertEqual(bytes(self.frames.next_frame()), bytes([i]) * i)
+
+    def test_partial_frames(self):
+        data = encode_frame(b"abcdefghij") + encode_frame(b"klmno")
+        for i in range(len(data)):
+            self.sender.send(data[i : i + 1])
+            if i == 13:
+                self.assertEqual(bytes(self.frames.next_frame()), b"abcdefghij")
+        self.assertEqual(bytes(self.frames.next_frame()), b"klmno")
+
+    def test_buffer_grows(self):
+        payload = bytes(range(256)) * 40
+        self.sender.sendall(encode_frame(b"small") + encode_frame(payload))
+        first = self.frames.next_frame()
+        self.assertEqual(bytes(first), b"small")
+        self.assertEqual(bytes(self.frames.next_frame()), payload)
+        self.assertGreaterEqual(len(self.frames.buffer), len(payload))
+
+    def test_closed(self):
+        self.sender.sendall(encode_frame(b"last"))
+        self.sender.close()
+        self.assertEqual(bytes(self.frames.next_frame()), b"last")
+        self.assertIsNone(self.frames.next_frame())
+
+    def test_messages(self):
+        board = [
+            [{"index": i, "rotation": 0, "x": i, "y": j} for i in range(10)] for j in range(10)
+        ]
+        self.sender.sendall(encode_message({"type": "A", "board": board}) * 3)
+        for _ in range(3):
+            self.assertEqual(receive_input(self.frames), {"type": "A", "board": board})
+
+
+class TestReadFrame(TestCase):
+    def test_read_frame(self):
+        async def run():
+            reader = asyncio.StreamReader()
+            reader.feed_data(encode_frame(json.dumps([1, 2]).encode()) + encode_frame(b"x")[:3])
+            reader.feed_eof()
+            return await read_frame(reader), await read_frame(reader)
+
+        self.assertEqual(asyncio.run(run()), (b"[1, 2]", None))
@@ -0,0 +1,141 @@
+import asyncio
+import itertools
+from unittest import TestCase
+
+from Common import wire
+from Common.board import Board
+from Common.constants import Color, PlayerState
+from Common.framing import HEADER
+from Common.placement import InitialPlacement, IntermediatePlacement
+from Common.utils import encode_message
+from Player.player import ProxyPlayer, SharedGameState
+from Remote.client import Client
+
+
+class Writer:
+    """Collects the messages written to a stream."""
+
+    def __init__(self):
+        self.messages = []
+
+    def is_closing(self):
+        return False
+
+    def write(self, data):
+        self.messages.append(wire.decode(data[HEADER.size :]))
+
+
+class TestDeltaGameState(TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.writer = Writer()
+        self.proxy = ProxyPlayer("proxy", 0, None, self.writer, delta=True)
+        self.proxy.color = Color.RED.value
+        self.client = Client("127.0.0.1", 0, "client", "dumb")
+
+    def send_state(self):
+        self.proxy.receive_gamestate(self.board.readonly(), PlayerState.ALIVE, [self.proxy])
+        msg = self.writer.messages[-1]
+        self.client.update_game_state(msg)
+        self.assertEqual(self.client.board.readonly().get_json(), self.board.readonly().get_json())
+        self.assertEqual(self.client.version, self.board.version)
+        return msg
+
+    def test_deltas_follow_snapshot(self):
+        self.assertIn("board", self.send_state())
+
+        self.board.apply(InitialPlacement(4, 0, "red", 0, 0, "A"))
+        self.board.apply(IntermediatePlacement(7, 90, "white", 5, 5))
+        msg = self.send_state()
+        self.assertNotIn("board", msg)
+        self.assertEqual((msg["since"], msg["version"]), (0, 2))
+        self.assertEqual([(t["x"], t["y"]) for t in msg["placements"]], [(0, 0), (5, 5)])
+
+        # the proxy's own position did not change
+        self.assertEqual(self.send_state()["players"], [])
+
+    def test_snapshot_interval(self):
+        self.send_state()
+        for i in range(ProxyPlayer.SNAPSHOT_INTERVAL):
+            self.board.apply(IntermediatePlacement(i, 0, "red", i % Board.SIZE, i // Board.SIZE))
+            self.assertNotIn("board", self.send_state())
+
+        self.assertIn("board", self.send_state())
+
+    def test_resync(self):
+        self.send_state()
+        self.board.apply(IntermediatePlacement(3, 0, "red", 2, 2))
+        self.client.version = 5
+        self.proxy.receive_gamestate(self.board.readonly(), PlayerState.ALIVE, [self.proxy])
+        self.client.update_game_state(self.writer.messages[-1])
+        self.assertIsNone(self.client.version)
+
+        # the next move from the client reports it, and a snapshot follows
+        async def next_move():
+            self.proxy.reader = asyncio.StreamReader()
+            move = IntermediatePlacement(3, 0, "red", 2, 3).to_json()
+            self.proxy.reader.feed_data(
+                encode_message({"type": "MOVE_REQUEST", **move, "version": None})
+            )
+            return await self.proxy.next_move()
+
+        self.assertEqual(asyncio.run(next_move()).y, 3)
+        self.assertIn("board", self.send_state())
+
+
+class CountingBoard:
+    """A read-only board that counts how often it is encoded."""
+
+    def __init__(self, board):
+        self.board = board.readonly()
+        self.encoded = 0
+
+    def __getattr__(self, name):
+        return getattr(self.board, name)
+
+    def get_json(self):
+        self.encoded += 1
+        return self.board.get_json()
+
+
+class TestSharedGameState(TestCase):
+    def setUp(self):
+        self.board = Board()
+        self.board.apply(InitialPlacement(4, 0, "red", 0, 0, "A"))
+
+    def proxies(self, shared, delta, codec=wire.JSON):
+        proxies = [ProxyPlayer(c.value, 0, None, Writer(), delta, shared, codec) for c in Color]
+        for proxy in proxies:
+            proxy.color = proxy.name
+        return proxies
+
+    def broadcast(self, proxies, shared=None):
+        if shared is not None:
+            shared.new_turn()
+        board = CountingBoard(self.board)
+        # as the server does, see `Remote.server.Server.run_game`
+        for proxy in proxies:
+            proxy.state = PlayerState.ALIVE.name
+        for proxy in proxies:
+            proxy.receive_gamestate(board, PlayerState.ALIVE, proxies)
+        return board.encoded, [proxy.writer.messages[-1] for proxy in proxies]
+
+    def test_board_encoded_once_per_turn(self):
+        for delta in (False, True):
+            with self.subTest(delta=delta):
+                shared = SharedGameState()
+                encoded, _ = self.broadcast(self.proxies(shared, delta), shared)
+                self.assertEqual(encoded, 1)
+
+    def test_same_messages_as_unshared(self):
+        options = itertools.product((False, True), (wire.JSON, wire.BINARY))
+        for x, (delta, codec) in enumerate(options, 2):
+            with self.subTest(delta=delta, codec=codec.name):
+                shared = SharedGameState()
+                with_shared = self.proxies(shared, delta, codec)
+                without = self.proxies(None, delta, wire.JSON)
+                for i in range(3):
+                    self.board.apply(IntermediatePlacement(i, 0, "red", x, i))
+                    self.assertEqual(
+                        self.broadcast(with_shared, shared)[1], self.broadcast(without)[1]
+                    )
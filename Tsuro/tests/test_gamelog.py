@@ -0,0 +1,121 @@
+import io
+import os
+import random
+import tempfile
+from multiprocessing import Pool
+
+from PIL import Image, ImageChops, ImageSequence
+
+from Admin import replay
+from Admin.gamelog import END, OUT, GameRecorder, count_placements, read_log, replay as replay_log
+from Admin.referee import Referee
+from Admin.tournament import GameSpec, play_game
+from Common.tiles import Tile
+from Player.player import Player
+from Player.strategy import Second
+from tests.games import QuietTestCase
+
+
+def play_logged_game(stream, seed=7):
+    players = [Player(f"p{i}", i, Second()) for i in range(4)]
+    deck = list(range(Tile.NUMBER_OF_TILES))
+    random.Random(seed).shuffle(deck)
+    referee = Referee(players, deck=deck, recorder=GameRecorder(stream, seed=seed))
+    while referee.run_turn():
+        pass
+    return referee
+
+
+class TestGameLog(QuietTestCase):
+    def test_replay_reaches_the_final_board(self):
+        stream = io.StringIO()
+        referee = play_logged_game(stream)
+
+        stream.seek(0)
+        info, events = read_log(stream)
+        self.assertEqual(info["seed"], 7)
+        self.assertEqual([name for _, name in info["players"]], ["p0", "p1", "p2", "p3"])
+
+        *_, last = replay_log(events)
+        self.assertEqual(last.number, referee.board.version)
+        self.assertEqual(last.board.key, referee.board.key)
+        for token in last.tokens:
+            player = referee.players_by_color[token.color]
+            self.assertEqual((token.tile.x, token.tile.y), (player.tile.x, player.tile.y))
+            self.assertIs(token.port, player.port)
+
+    def test_logs_every_player_out(self):
+        stream = io.StringIO()
+        referee = play_logged_game(stream)
+
+        stream.seek(0)
+        _, events = read_log(stream)
+        events = list(events)
+        self.assertEqual(events[-1], [END])
+        out = [e for e in events if e[0] == OUT]
+        self.assertEqual(len(out), sum(len(deaths) for deaths in referee.dead.values()))
+
+    def test_replay_stops_early(self):
+        stream = io.StringIO()
+        play_logged_game(stream)
+
+        stream.seek(0)
+        frames = [frame.number for frame in replay_log(read_log(stream)[1], stop=3)]
+        self.assertEqual(frames, [0, 1, 2, 3])
+
+    def test_tournament_logs_games(self):
+        with tempfile.TemporaryDirectory() as log_dir:
+            result = play_game(GameSpec(3, 4500, ["second"] * 3), log_dir=log_dir)
+            with open(os.path.join(log_dir, "game-3.log")) as stream:
+                info, events = read_log(stream)
+                self.assertEqual((info["game"], info["seed"]), (3, 4500))
+                # ejections take a turn without a placement
+                ejected = sum(p["state"] == "EJECTED" for p in result["players"])
+                self.assertEqual(count_placements(events), result["turns"] - ejected)
+
+
+class TestReplayExport(QuietTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.log = os.path.join(cls.directory.name, "game.log")
+        with open(cls.log, "w") as stream:
+            play_logged_game(stream)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def frames(self):
+        return [replay.quantize(im) for im in replay.render_frames(self.log, scale=0.2)]
+
+    def test_gif_holds_every_frame(self):
+        out = os.path.join(self.directory.name, "game.gif")
+        count = replay.export(self.log, out, scale=0.2)
+
+        expected = self.frames()
+        self.assertEqual(count, len(expected))
+        with Image.open(out) as gif:
+            frames = [frame.convert("RGB") for frame in ImageSequence.Iterator(gif)]
+        self.assertEqual(len(frames), count)
+        for im, frame in zip(expected, frames):
+            self.assertIsNone(ImageChops.difference(im.convert("RGB"), frame).getbbox())
+
+    def test_parallel_export_matches(self):
+        sequential = os.path.join(self.directory.name, "sequential.gif")
+        parallel = os.path.join(self.directory.name, "parallel.gif")
+        replay.export(self.log, sequential, scale=0.2)
+        with Pool(2) as pool:
+            replay.export(self.log, parallel, pool, workers=2, scale=0.2)
+
+        with open(sequential, "rb") as f1, open(parallel, "rb") as f2:
+            self.assertEqual(f1.read(), f2.read())
+
+    def test_frame_directory(self):
+        out = os.path.join(self.directory.name, "frames")
+        with Pool(2) as pool:
+            count = replay.export(self.log, out, pool, workers=2, scale=0.2)
+
+        self.assertEqual(sorted(os.listdir(out))[-1], f"frame-{count - 1:03d}.png")
+        self.assertEqual(len(os.listdir(out)), count)
@@ -0,0 +1,99 @@
+import random
+from unittest import TestCase
+
+from Common import rules
+from Common.board import Board
+from Common.constants import Color, Rotation
+from Common.placement import InitialPlacement, IntermediatePlacement
+from Common.tiles import Port, Tile
+from Player.player import Player
+
+
+def random_board(rng, n_tiles):
+    board = Board()
+    cells = [(x, y) for x in range(Board.SIZE) for y in range(Board.SIZE)]
+    rng.shuffle(cells)
+    for x, y in cells[:n_tiles]:
+        tile = Tile.Builder.build(rng.randrange(Tile.NUMBER_OF_TILES), rng.choice(list(Rotation)))
+        board.add_tile(tile, x, y)
+    return board
+
+
+def random_player(rng, hand_size):
+    player = Player("player")
+    player.color = Color.RED
+    player.tile_hand = [
+        Tile.Builder.build(rng.randrange(Tile.NUMBER_OF_TILES)).readonly()
+        for _ in range(hand_size)
+    ]
+    return player
+
+
+def brute_force(board, player, placements):
+    """Checks every candidate placement against every rule."""
+    return {
+        (p.index, p.rotation, p.x, p.y, getattr(p, "port", None))
+        for p in placements
+        if all(rule.is_valid(p, board, player)[0] for rule in rules.ALL)
+    }
+
+
+class TestGenerateLegalMoves(TestCase):
+    def setUp(self):
+        self.rng = random.Random(4500)
+
+    def generated(self, board, player):
+        return {
+            (m.index, m.rotation, m.x, m.y, m.port)
+            for m in rules.generate_legal_moves(board, player)
+        }
+
+    def test_initial_moves_match_rules(self):
+        board = random_board(self.rng, 12).readonly()
+        player = random_player(self.rng, 3)
+        candidates = [
+            InitialPlacement(tile.index, rotation.value, "red", x, y, port.name)
+            for tile in player.tile_hand
+            for rotation in Rotation
+            for x in range(Board.SIZE)
+            for y in range(Board.SIZE)
+            for port in Port
+        ]
+        self.assertEqual(self.generated(board, player), brute_force(board, player, candidates))
+
+    def test_intermediate_moves_match_rules(self):
+        for _ in range(20):
+            board = random_board(self.rng, self.rng.randrange(1, 80))
+            player = random_player(self.rng, 2)
+            player.tile = self.rng.choice(sorted(board.tiles, key=lambda t: (t.x, t.y)))
+            player.port = self.rng.choice(list(Port))
+            candidates = [
+                IntermediatePlacement(tile.index, rotation.value, "red", x, y)
+                for tile in player.tile_hand
+                for rotation in Rotation
+                for x in range(Board.SIZE)
+                for y in range(Board.SIZE)
+            ]
+            readonly = board.readonly()
+            self.assertEqual(
+                self.generated(readonly, player), brute_force(readonly, player, candidates)
+            )
+
+    def test_same_tile_twice(self):
+        board = random_board(self.rng, 30)
+        player = random_player(self.rng, 1)
+        once = rules.generate_legal_moves(board, player)
+        player.tile_hand *= 2
+        self.assertEqual(rules.generate_legal_moves(board, player), once)
+
+        player.tile = self.rng.choice(sorted(board.tiles, key=lambda t: (t.x, t.y)))
+        player.port = self.rng.choice(list(Port))
+        moves = rules.generate_legal_moves(board, player)
+        self.assertEqual(len(moves), len(set(moves)))
+
+    def test_to_placement(self):
+        move = rules.LegalMove(3, Rotation.ONE, 0, 4, Port.G)
+        placement = move.to_placement(Color.RED)
+        self.assertTrue(placement.is_initial)
+        self.assertEqual(placement.to_json()["port"], "G")
+        self.assertFalse(move._replace(port=None).to_placement(Color.RED).is_initial)
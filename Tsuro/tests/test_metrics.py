@@ -0,0 +1,129 @@
+import asyncio
+import json
+from unittest import TestCase
+from unittest.mock import Mock
+
+from Admin.metrics import Histogram, RefereeMetrics
+from Common import rules
+from Remote.server import Server
+from tests.games import QuietTestCase, play_game
+
+
+class TestHistogram(TestCase):
+    def test_prometheus_buckets_are_cumulative(self):
+        histogram = Histogram("t_seconds", "Time.", "phase", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 2.0):
+            histogram.observe("a", value)
+
+        self.assertEqual(
+            histogram.to_prometheus()[2:],
+            [
+                't_seconds_bucket{phase="a",le="0.1"} 2',
+                't_seconds_bucket{phase="a",le="1.0"} 3',
+                't_seconds_bucket{phase="a",le="+Inf"} 4',
+                't_seconds_sum{phase="a"} 2.65',
+                't_seconds_count{phase="a"} 4',
+            ],
+        )
+
+    def test_quantiles_fall_in_their_bucket(self):
+        histogram = Histogram("t_seconds", "Time.", buckets=(0.1, 1.0, 10.0))
+        for value in [0.05] * 50 + [0.5] * 40 + [5.0] * 10:
+            histogram.observe(None, value)
+
+        summary = histogram.to_json()[""]
+        self.assertEqual((summary["count"], summary["max"]), (100, 5.0))
+        self.assertLessEqual(summary["p50"], 0.1)
+        self.assertTrue(0.1 < summary["p90"] <= 1.0)
+        self.assertTrue(1.0 < summary["p99"] <= 5.0)
+
+
+class TestRefereeMetrics(QuietTestCase):
+    def test_times_every_turn(self):
+        metrics = RefereeMetrics()
+        referee = play_game(["second"] * 4, metrics=metrics)
+
+        turns = metrics.turns.values[None]
+        phases = metrics.phase_seconds.to_json()
+        self.assertEqual(metrics.games.values[None], 1)
+        for phase in ("broadcast", "deal", "next_move", "validate"):
+            self.assertEqual(phases[phase]["count"], turns)
+        self.assertEqual(phases["submit"]["count"], phases["update_states"]["count"])
+
+        # every rule checks every move that reaches the rules
+        timed = metrics.rule_seconds.to_json()
+        self.assertEqual(set(timed), {type(rule).__name__ for rule in rules.ALL})
+        self.assertEqual({summary["count"] for summary in timed.values()}, {turns})
+
+        out = sum(len(deaths) for deaths in referee.dead.values())
+        self.assertEqual(sum(metrics.players_out.values.values()), out)
+
+    def test_counts_violations(self):
+        metrics = RefereeMetrics()
+        referee = play_game(["dumb"] * 3, metrics=metrics)
+
+        ejected = sum(state.name == "EJECTED" for d in referee.dead.values() for _, state in d)
+        self.assertEqual(metrics.players_out.values.get("EJECTED", 0), ejected)
+        self.assertLessEqual(sum(metrics.rule_violations.values.values()), ejected)
+
+    def test_game_is_the_same_with_metrics(self):
+        plain = play_game(["second", "dumb", "second"])
+        timed = play_game(["second", "dumb", "second"], metrics=RefereeMetrics())
+        self.assertEqual(plain.board.key, timed.board.key)
+        self.assertEqual(
+            [[(p.name, s) for p, s in d] for d in plain.dead.values()],
+            [[(p.name, s) for p, s in d] for d in timed.dead.values()],
+        )
+
+    def test_exports(self):
+        metrics = RefereeMetrics()
+        play_game(["second"] * 3, metrics=metrics)
+
+        text = metrics.to_prometheus()
+        self.assertIn("# TYPE tsuro_turn_phase_seconds histogram\n", text)
+        self.assertIn('tsuro_rule_seconds_count{rule="WillPlayerSurvive"}', text)
+        summary = json.loads(metrics.dumps())
+        self.assertEqual(summary["tsuro_turns_total"][""], metrics.turns.values[None])
+
+
+class TestServerMetrics(QuietTestCase):
+    def test_serves_metrics(self):
+        metrics = RefereeMetrics()
+        metrics.turns.inc()
+        server = Server(port=0, metrics=metrics)
+
+        async def get(path):
+            http = await asyncio.start_server(server.serve_metrics, "127.0.0.1", 0)
+            port = http.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"GET " + path + b" HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            response = await reader.read()
+            writer.close()
+            http.close()
+            await http.wait_closed()
+            return response.decode()
+
+        response = asyncio.run(get(b"/metrics"))
+        self.assertTrue(response.startswith("HTTP/1.1 200 OK\r\n"))
+        self.assertIn("\r\n\r\n# HELP tsuro_turns_total", response)
+        self.assertIn("tsuro_turns_total 1\n", response)
+
+        body = asyncio.run(get(b"/metrics.json")).split("\r\n\r\n", 1)[1]
+        self.assertEqual(json.loads(body)["tsuro_turns_total"], {"": 1})
+        self.assertTrue(asyncio.run(get(b"/")).startswith("HTTP/1.1 404"))
+
+    def test_closes_malformed_requests(self):
+        server = Server(port=0, metrics=RefereeMetrics())
+
+        async def serve(request, writer):
+            reader = asyncio.StreamReader()
+            reader.feed_data(request)
+            await server.serve_metrics(reader, writer)
+
+        # no path, and a path that is not UTF-8
+        for request in [b"GET\r\n\r\n", b"GET /\xff HTTP/1.1\r\n\r\n"]:
+            with self.subTest(request=request):
+                writer = Mock()
+                asyncio.run(serve(request, writer))
+                writer.write.assert_not_called()
+                writer.close.assert_called_once_with()
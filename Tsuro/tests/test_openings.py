@@ -0,0 +1,81 @@
+import os
+import random
+import tempfile
+from types import SimpleNamespace
+
+from Admin.referee import Referee
+from Common import rules
+from Common.board import Board
+from Common.tiles import FACES_BY_CODE, Tile
+from Player import openings
+from Player.player import Player
+from Player.strategy import Expectimax, Second
+from tests.games import QuietTestCase
+
+
+def first_round_positions(seed=7):
+    """:return: the board and player of every initial placement of a game"""
+    positions = []
+    players = [Player(f"p{i}", i, Second()) for i in range(5)]
+    deck = list(range(Tile.NUMBER_OF_TILES))
+    random.Random(seed).shuffle(deck)
+    referee = Referee(players, deck=deck)
+    while True:
+        player = referee.start_turn()
+        if player is None or player.tile is not None:
+            return positions
+        snapshot = SimpleNamespace(
+            color=player.color, tile=None, port=None, tile_hand=player.tile_hand
+        )
+        positions.append((player.board.copy(), snapshot))
+        referee.finish_turn(player.next_move())
+
+
+class TestOpenings(QuietTestCase):
+    def test_book_is_up_to_date(self):
+        self.assertEqual(openings.book(), openings.build())
+
+    def test_same_moves_as_the_rules(self):
+        for seed in (7, 8):
+            for board, player in first_round_positions(seed):
+                moves = openings.candidates(board, player)
+                self.assertEqual(len(moves), len(set(moves)))
+                self.assertEqual(set(moves), set(rules.generate_legal_moves(board, player)))
+
+    def test_best_first(self):
+        board, player = first_round_positions()[2]
+        entries = openings.book()
+        scores = []
+        for move in openings.candidates(board, player):
+            start = openings.STARTS.index((move.x, move.y, move.port))
+            code = Tile.Builder.build(move.index, move.rotation).face.code
+            scores.append(entries[start * len(FACES_BY_CODE) + code])
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(
+            openings.candidates(board, player, 3), openings.candidates(board, player)[:3]
+        )
+
+    def test_entries_are_exact_about_leaving_the_board(self):
+        board, entries = Board(), openings.book()
+        for i, (x, y, port) in enumerate(openings.STARTS):
+            for face in FACES_BY_CODE:
+                leaves = board.is_border_endpoint(board.trace(face, x, y, port))
+                self.assertEqual(entries[i * len(FACES_BY_CODE) + face.code] == 0, leaves)
+
+    def test_rejects_other_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "openings.bin")
+            openings.write(path)
+            self.assertEqual(openings.load(path), openings.book())
+
+            with open(path, "r+b") as f:
+                f.truncate(100)
+            with self.assertRaises(ValueError):
+                openings.load(path)
+
+    def test_strategies_open_from_the_book(self):
+        board, player = first_round_positions()[0]
+        player.players = None
+        move = Expectimax(time_limit=None, max_depth=1).next_move(player, board)
+        best = openings.candidates(board, player, Expectimax.ROOT_WIDTH)
+        self.assertIn(move.to_json(), [m.to_placement(player.color).to_json() for m in best])
@@ -0,0 +1,97 @@
+import pickle
+import time
+
+from Common import rules
+from Player import parallel, search
+from Player.strategy import Rollouts, Second
+from tests.games import QuietTestCase, play_game
+
+
+def positions(players=4, seed=7):
+    """:return: the position and legal moves of every turn of a game"""
+    found = []
+
+    def step(referee, player):
+        moves = rules.generate_legal_moves(player.board, player)
+        found.append((search.Position.of(player, player.board), moves))
+
+    play_game([Second() for _ in range(players)], seed=seed, step=step)
+    return found
+
+
+class TestEncoding(QuietTestCase):
+    def test_positions(self):
+        for position, _ in positions():
+            data = parallel.encode(position)
+            decoded = parallel.decode(data)
+            self.assertEqual(
+                (decoded.key, decoded.alive, decoded.to_move),
+                (position.key, position.alive, position.to_move),
+            )
+            self.assertLess(len(data), len(pickle.dumps(position.board)) // 10)
+
+    def test_moves(self):
+        for _, moves in positions(seed=3):
+            self.assertEqual(parallel.decode_moves(parallel.encode_moves(moves)), moves)
+            self.assertEqual(len(parallel.encode_moves(moves)), 4 * len(moves))
+
+
+class TestWorkerPool(QuietTestCase):
+    def test_spreads_moves_across_workers(self):
+        position, moves = positions()[12]
+        with parallel.WorkerPool(3) as pool:
+            scores = pool.score(position, moves, evaluations=10 * len(moves), seed=1)
+            self.assertEqual([count for _, count in scores], [10] * len(moves))
+            self.assertTrue(all(0 <= total <= count for total, count in scores))
+
+            # more workers than moves
+            scores = pool.score(position, moves[:2], evaluations=12, seed=1)
+            self.assertEqual([count for _, count in scores], [6, 6])
+
+    def test_same_seed_same_scores(self):
+        position, moves = positions()[20]
+        with parallel.WorkerPool(2) as pool:
+            first = pool.score(position, moves, evaluations=40, seed=5)
+            self.assertEqual(pool.score(position, moves, evaluations=40, seed=5), first)
+        with parallel.WorkerPool(1) as pool:
+            self.assertEqual(sum(c for _, c in pool.score(position, moves, evaluations=40)), 40)
+
+    def test_time_limit(self):
+        position, moves = positions()[8]
+        with parallel.WorkerPool(2) as pool:
+            start = time.perf_counter()
+            scores = pool.score(position, moves, time_limit=0.2)
+            self.assertLess(time.perf_counter() - start, 0.5)
+            self.assertGreater(sum(count for _, count in scores), 0)
+
+    def test_leaving_the_board_scores_nothing(self):
+        checked = 0
+        with parallel.WorkerPool(2) as pool:
+            for position, moves in positions():
+                leaving = []
+                for i, move in enumerate(moves):
+                    if position.to_move in position.play_move(move):
+                        leaving.append(i)
+                    position.undo()
+                if leaving:
+                    scores = pool.score(position, moves, evaluations=2 * len(moves))
+                    self.assertEqual([scores[i] for i in leaving], [(0.0, 2)] * len(leaving))
+                    checked += 1
+        self.assertGreater(checked, 0)
+
+
+class TestRollouts(QuietTestCase):
+    def test_plays_legal_moves(self):
+        strategy = Rollouts(time_limit=None, playouts=16, workers=2, seed=1)
+        try:
+            referee = play_game([strategy, Second(), Second()])
+        finally:
+            strategy.close()
+
+        deaths = {p.name: state.name for d in referee.dead.values() for p, state in d}
+        self.assertNotEqual(deaths["p0"], "EJECTED")
+        self.assertLessEqual(strategy.searched, 16)
+
+    def test_needs_a_limit(self):
+        with self.assertRaises(ValueError):
+            Rollouts(time_limit=None)
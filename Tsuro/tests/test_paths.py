@@ -0,0 +1,92 @@
+from unittest import TestCase
+
+from Admin.referee import Referee
+from Common import rules
+from Common.board import Board
+from Common.constants import Color, PlayerState, Rotation
+from Common.placement import InitialPlacement, IntermediatePlacement
+from Common.tiles import FACES, Port, Tile
+from Player.player import Player
+
+
+class TestPathEngine(TestCase):
+    def setUp(self):
+        self.board = Board()
+
+    def test_empty_board_paths_lead_across_edges(self):
+        self.assertEqual(
+            self.board.path_end(Board.endpoint(3, 3, Port.C)), Board.endpoint(4, 3, Port.H)
+        )
+        end = self.board.path_end(Board.endpoint(0, 0, Port.A))
+        self.assertTrue(self.board.is_border_endpoint(end))
+
+    def test_add_tile_joins_paths(self):
+        # tile 0 connects the ports straight across, A to E and B to F
+        self.board.add_tile(Tile.Builder.build(0), 0, 0)
+        self.board.add_tile(Tile.Builder.build(0), 0, 1)
+        start = self.board.paths.across(Board.endpoint(0, 0, Port.A))
+        self.assertEqual(self.board.path_end(start), Board.endpoint(0, 2, Port.A))
+        self.assertEqual(self.board.path_end(Board.endpoint(0, 2, Port.A)), start)
+
+    def test_locate(self):
+        tile = Tile.Builder.build(0)
+        self.board.add_tile(tile, 0, 0)
+        end = self.board.path_end(self.board.paths.across(Board.endpoint(0, 0, Port.A)))
+        self.assertEqual(self.board.locate(end), (tile, Port.E))
+
+    def test_trace_does_not_place(self):
+        # tile 4 connects F to G, entering through F leads off of the board
+        end = self.board.trace(FACES[4][0], 0, 9, Port.F)
+        self.assertTrue(self.board.is_border_endpoint(end))
+        self.assertIsNone(self.board.get_tile_at(0, 9))
+        self.assertEqual(
+            self.board.path_end(Board.endpoint(0, 9, Port.F)), Board.endpoint(0, 10, Port.A)
+        )
+
+
+class TestWillPlayerSurvive(TestCase):
+    def test_traces_the_placed_tile(self):
+        # the player is on port C of tile 4 in the corner, facing 1, 0
+        board, player = Board(), Player("player")
+        player.color, player.port = Color.RED, Port.C
+        player.tile = Tile.Builder.build(4)
+        board.add_tile(player.tile, 0, 0)
+        player.tile_hand = [Tile.Builder.build(0), Tile.Builder.build(4)]
+        rule = rules.WillPlayerSurvive()
+
+        # tile 0 leads from H across to C, and on to the empty 2, 0. Tracing the
+        # tile the player is on instead, from H to A, would leave the board
+        move = IntermediatePlacement(0, Rotation.NONE.value, "red", 1, 0)
+        self.assertEqual(rule.is_valid(move, board, player), (True, None))
+        # tile 4 does lead from H to A, off of the board, and tile 0 does not
+        move = IntermediatePlacement(4, Rotation.NONE.value, "red", 1, 0)
+        self.assertEqual(rule.is_valid(move, board, player), (False, rule.ERROR_MSG))
+
+
+class TestRefereePlayerPaths(TestCase):
+    def setUp(self):
+        self.players = [Player(name=str(i), age=i) for i in range(3)]
+        self.referee = Referee(self.players)
+        self.white = self.players[0]
+
+    def test_player_follows_path(self):
+        self.referee.add_placements(
+            [
+                InitialPlacement(0, Rotation.NONE.value, "white", 0, 0, "A"),
+                IntermediatePlacement(0, Rotation.NONE.value, "white", 0, 1),
+            ]
+        )
+        self.assertEqual((self.white.tile.x, self.white.tile.y), (0, 1))
+        self.assertIs(self.white.port, Port.F)
+        self.assertIs(self.referee._get_player_state(self.white), PlayerState.ALIVE)
+
+    def test_player_leaves_board(self):
+        self.referee.add_placements(
+            [
+                InitialPlacement(0, Rotation.NONE.value, "white", 0, 9, "E"),
+                IntermediatePlacement(4, Rotation.NONE.value, "white", 0, 8),
+            ]
+        )
+        self.assertIs(self.referee._get_player_state(self.white), PlayerState.DEAD)
+        self.assertEqual((self.white.tile.x, self.white.tile.y), (0, 8))
+        self.assertIs(self.white.port, Port.G)
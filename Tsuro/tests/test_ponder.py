@@ -0,0 +1,134 @@
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+from Admin.referee import Referee
+from Common.tiles import Tile
+from Player import search
+from Player.player import Player
+from Player.ponder import Ponderer
+from Player.strategy import Expectimax, Second
+from tests.games import QuietTestCase, play_game
+
+
+def turns(seed=7):
+    """
+    :return: the color of the player to move, the board, and how every
+        player stood at the start of every turn of a game of three
+    """
+    found = []
+
+    def step(referee, player):
+        standing = [
+            SimpleNamespace(color=p.color, tile=p.tile, port=p.port, tile_hand=list(p.tile_hand))
+            for p in referee.players
+        ]
+        found.append((player.color, player.board.copy(), standing))
+
+    play_game([Second() for _ in range(3)], seed=seed, step=step)
+    return found
+
+
+def view(turn, color):
+    """:return: the player with the given color as they were sent the turn"""
+    _, board, standing = turn
+    player = next(p for p in standing if p.color is color)
+    return SimpleNamespace(**vars(player), players=standing), board
+
+
+def asked(seed=7, earlier=1):
+    """
+    :return: a player asked to move after their first move, as they were
+        asked and as they were sent the game state the given number of turns
+        before
+    """
+    found = turns(seed)
+    for i, (color, _, standing) in enumerate(found):
+        player = next(p for p in standing if p.color is color)
+        if i >= 6 and player.tile is not None:
+            return view(found[i], color), view(found[i - earlier], color)
+
+
+class TestExpectimaxPondering(QuietTestCase):
+    def test_reuses_anticipated_positions(self):
+        (player, board), (sent, sent_board) = asked()
+        strategy = Expectimax(time_limit=None, max_depth=1)
+        strategy.ponder(search.Position.of(sent, sent_board), threading.Event())
+
+        move = strategy.next_move(player, board)
+        self.assertTrue(strategy.reused)
+        fresh = Expectimax(time_limit=None, max_depth=1).next_move(player, board)
+        self.assertEqual(move.to_json(), fresh.to_json())
+
+    def test_searches_positions_not_anticipated(self):
+        (player, board), (sent, sent_board) = asked(earlier=2)
+        strategy = Expectimax(time_limit=None, max_depth=1)
+        strategy.ponder(search.Position.of(sent, sent_board), threading.Event())
+
+        move = strategy.next_move(player, board)
+        self.assertFalse(strategy.reused)
+        fresh = Expectimax(time_limit=None, max_depth=1).next_move(player, board)
+        self.assertEqual(move.to_json(), fresh.to_json())
+
+    def test_deeper_searches_are_not_replaced(self):
+        (player, board), (sent, sent_board) = asked()
+        strategy = Expectimax(time_limit=None, max_depth=1)
+        strategy.ponder(search.Position.of(sent, sent_board), threading.Event())
+        # a search of its own got deeper on the last move
+        strategy.max_depth = strategy._reached = 2
+        strategy.next_move(player, board)
+        self.assertFalse(strategy.reused)
+        self.assertEqual(strategy.depth, 2)
+
+    def test_not_reused_before_a_search_of_its_own(self):
+        (player, board), (sent, sent_board) = asked()
+        strategy = Expectimax(time_limit=None, max_depth=1)
+        strategy.ponder(search.Position.of(sent, sent_board), threading.Event())
+        # how deep a search of its own gets is not known yet
+        strategy.max_depth = 2
+        strategy.next_move(player, board)
+        self.assertFalse(strategy.reused)
+        self.assertEqual(strategy.depth, 2)
+
+
+class TestPonderer(QuietTestCase):
+    def test_stops_when_asked(self):
+        (_, _), (sent, sent_board) = asked()
+        ponderer = Ponderer(Expectimax())
+        ponderer.start(sent, sent_board)
+        self.assertTrue(ponderer._thread.is_alive())
+
+        start = time.perf_counter()
+        ponderer.stop()
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertIsNone(ponderer._thread)
+
+    def test_only_ponders_on_the_board(self):
+        found = turns()
+        ponderer = Ponderer(Expectimax())
+        ponderer.start(*view(found[0], found[0][0]))
+        self.assertIsNone(ponderer._thread)
+
+    def test_players_ponder_during_games(self):
+        strategy = Expectimax(time_limit=0.01)
+        pondered, ponder = [], strategy.ponder
+
+        def recorded(position, stop):
+            pondered.append(position.to_move)
+            ponder(position, stop)
+
+        strategy.ponder = recorded
+        player = Player("p0", 0, strategy, ponder=True)
+        deck = list(range(Tile.NUMBER_OF_TILES))
+        random.Random(7).shuffle(deck)
+        others = [Player("p1", 1, Second()), Player("p2", 2, Second())]
+        referee = Referee([player] + others, deck=deck)
+        while referee.run_turn():
+            pass
+
+        self.assertTrue(pondered)
+        self.assertEqual(set(pondered), {player.color})
+        self.assertIsNone(player.ponderer._thread)
+        deaths = {p.name: state.name for d in referee.dead.values() for p, state in d}
+        self.assertNotEqual(deaths["p0"], "EJECTED")
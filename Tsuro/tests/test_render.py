@@ -0,0 +1,64 @@
+from unittest import TestCase
+
+from PIL import ImageChops
+
+from Admin.observer import BoardRenderer
+from Admin.referee import Referee
+from Common.constants import Rotation
+from Common.render import draw_face, draw_tile, get_sprites
+from Common.tiles import FACES, Connection, Port, Tile
+from Player.player import Player
+from Player.strategy import Second
+from tests.games import QuietTestCase
+
+
+def same_image(im1, im2):
+    diff = ImageChops.difference(im1.convert("RGB"), im2.convert("RGB"))
+    return im1.size == im2.size and diff.getbbox() is None
+
+
+class TestSprites(TestCase):
+    def test_faces_match_rasterized(self):
+        for face in (FACES[0][0], FACES[3][1], FACES[34][3]):
+            with self.subTest(code=face.code):
+                self.assertTrue(same_image(get_sprites().face(face), draw_face(face)))
+
+    def test_draw_tile_returns_copy(self):
+        tile = Tile.Builder.build(5, Rotation.TWO)
+        im = draw_tile(tile, None)
+        self.assertIsNot(im, get_sprites().face(tile.face))
+        self.assertTrue(same_image(im, get_sprites().face(tile.face)))
+
+    def test_token_sprites_are_cached(self):
+        face = FACES[7][2]
+        tokens = (("red", Port.C),)
+        im = get_sprites().face(face, tokens)
+        self.assertIs(get_sprites().face(face, tokens), im)
+        self.assertFalse(same_image(im, get_sprites().face(face)))
+
+
+class TestConnections(TestCase):
+    def test_connections_are_shared_with_the_face(self):
+        tile = Tile.Builder.build(3, Rotation.ONE)
+        self.assertIs(tile.connections, tile.face.connections)
+
+    def test_rotated_by_returns_new_connection(self):
+        connection = Connection(Port.B, Port.D)
+        rotated = connection.rotated_by(Rotation.ONE)
+        self.assertEqual(connection, Connection(Port.B, Port.D))
+        self.assertEqual(set(rotated), {Port.D, Port.F})
+
+    def test_ports(self):
+        self.assertEqual(Connection(Port.B, Port.D)._ports, (Port.B, Port.D))
+
+
+class TestBoardRenderer(QuietTestCase):
+    def test_incremental_matches_full_render(self):
+        players = [Player(f"p{i}", i, Second()) for i in range(3)]
+        referee = Referee(players)
+        renderer = BoardRenderer()
+
+        while referee.run_turn():
+            incremental = renderer.render(referee.board, referee.players)
+            full = BoardRenderer(incremental=False).render(referee.board, referee.players)
+            self.assertTrue(same_image(incremental, full))
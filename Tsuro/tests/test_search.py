@@ -0,0 +1,147 @@
+import random
+
+from Common import rules
+from Common.tiles import FACES, Tile
+from Player import search
+from Player.strategy import Expectimax, MonteCarlo, Second
+from tests.games import QuietTestCase, play_game
+
+
+class TestPosition(QuietTestCase):
+    def test_matches_the_referee(self):
+        checked = []
+
+        def step(referee, player):
+            position = search.Position.of(player, player.board)
+            on_board = [
+                referee.colors[p]
+                for p in referee.active
+                if p.tile is not None and referee.colors[p] in referee.board.starts
+            ]
+            self.assertEqual(sorted(position.alive, key=str), sorted(on_board, key=str))
+            for move in rules.generate_legal_moves(player.board, player):
+                if not move.is_initial:
+                    face = FACES[move.index][move.rotation.value // 90]
+                    self.assertIn(face, position.moves(player.color, [move.index]))
+            checked.append(player)
+
+        play_game([Second() for _ in range(4)], step=step)
+        self.assertGreater(len(checked), 20)
+
+    def test_moves_are_taken_back(self):
+        def step(referee, player):
+            if player.tile is None:
+                return
+            position = search.Position.of(player, player.board)
+            key, alive = position.key, list(position.alive)
+            for face in position.moves(player.color, [t.index for t in player.tile_hand]):
+                position.play(face)
+                position.undo()
+            search.playout(position, random.Random(0))
+            self.assertEqual((position.key, position.alive), (key, alive))
+            self.assertIs(position.to_move, player.color)
+
+        play_game([Second() for _ in range(3)], step=step)
+
+    def test_scores(self):
+        a, b, c, d = "abcd"
+        self.assertEqual(
+            search.scores([a, b, c, d], [[b], [c, d]]), {a: 1.0, b: 0.0, c: 0.25, d: 0.25}
+        )
+
+
+class TestMonteCarlo(QuietTestCase):
+    def test_plays_legal_moves(self):
+        strategy = MonteCarlo(time_limit=None, playouts=30, seed=1)
+        referee = play_game([strategy, Second(), Second()])
+
+        deaths = {p.name: state.name for d in referee.dead.values() for p, state in d}
+        self.assertNotEqual(deaths["p0"], "EJECTED")
+        self.assertLessEqual(strategy.searched, 30)
+
+    def test_same_seed_same_moves(self):
+        moves = []
+        for _ in range(2):
+            strategy = MonteCarlo(time_limit=None, playouts=20, seed=3)
+            referee = play_game([strategy, Second(), Second()], seed=11)
+            moves.append(referee.board.key)
+        self.assertEqual(moves[0], moves[1])
+
+    def test_time_limit(self):
+        strategy = MonteCarlo(time_limit=0.05, seed=1)
+        play_game([strategy, Second(), Second()])
+        self.assertGreater(strategy.searched, 0)
+
+    def test_needs_a_limit(self):
+        with self.assertRaises(ValueError):
+            MonteCarlo(time_limit=None)
+
+
+def expectimax(position, color, depth):
+    """The value of the position for the player, searched without pruning."""
+    if color not in position.alive or position.is_over or depth == 0:
+        return search.evaluate(position, color)
+
+    to_move, values = position.to_move, []
+    for index in range(Tile.NUMBER_OF_TILES):
+        tile_values = []
+        for face in position.legal_faces(to_move, index):
+            position.play(face)
+            tile_values.append(expectimax(position, color, depth - 1))
+            position.undo()
+        values.append(max(tile_values) if to_move is color else min(tile_values))
+    return sum(values) / len(values)
+
+
+class TestExpectimax(QuietTestCase):
+    def test_plays_legal_moves(self):
+        strategy = Expectimax(time_limit=None, max_depth=2)
+        referee = play_game([strategy, Second(), Second()])
+
+        deaths = {p.name: state.name for d in referee.dead.values() for p, state in d}
+        self.assertNotEqual(deaths["p0"], "EJECTED")
+        self.assertLessEqual(strategy.depth, 2)
+
+    def test_pruning_keeps_the_best_value(self):
+        strategy = Expectimax(time_limit=None, max_depth=2)
+        checked = []
+
+        def step(referee, player):
+            if player.tile is None or len(checked) >= 3:
+                return
+            position = search.Position.of(player, player.board)
+            moves = rules.generate_legal_moves(player.board, player)
+            strategy._color, strategy._deadline = player.color, None
+            values = strategy._search_root(position, moves, list(range(len(moves))), 2)
+
+            exact = []
+            for move in moves:
+                position.play_move(move)
+                exact.append(expectimax(position, player.color, 1))
+                position.undo()
+            self.assertAlmostEqual(max(values.values()), max(exact))
+            checked.append(player)
+
+        play_game([Second() for _ in range(3)], step=step)
+        self.assertEqual(len(checked), 3)
+
+    def test_evaluation_is_pluggable(self):
+        calls = []
+
+        def evaluate(position, color):
+            calls.append(color)
+            return search.evaluate(position, color)
+
+        strategy = Expectimax(time_limit=None, max_depth=1, evaluate=evaluate)
+        play_game([Second(), strategy, Second()])
+        self.assertTrue(calls)
+        self.assertEqual(set(calls), {strategy._color})
+
+    def test_time_limit(self):
+        strategy = Expectimax(time_limit=0.02)
+        depths = []
+        play_game(
+            [strategy, Second(), Second()],
+            step=lambda referee, player: depths.append(strategy.depth),
+        )
+        self.assertGreaterEqual(max(depths), 1)
@@ -0,0 +1,113 @@
+import asyncio
+
+from Common import wire
+from Common.constants import PlayerState, ServerMessage
+from Common.framing import encode_frame, read_frame
+from Remote.client import Client
+from Remote.server import Server
+from tests.games import QuietTestCase
+
+
+class TestServer(QuietTestCase):
+    def play(self, server, strategies, options=None):
+        async def run():
+            serving = asyncio.ensure_future(server.serve())
+            while not hasattr(server, "_done") or server.port == 0:
+                await asyncio.sleep(0.01)
+
+            loop = asyncio.get_event_loop()
+            clients = [
+                loop.run_in_executor(
+                    None,
+                    Client(
+                        server.host, server.port, f"p{i}", strategy, *(options or {}).get(i, ())
+                    ).run_game,
+                )
+                for i, strategy in enumerate(strategies)
+            ]
+            await asyncio.wait_for(serving, 60)
+            await asyncio.gather(*clients)
+
+        asyncio.run(run())
+
+    def test_gives_up_on_too_few_players(self):
+        server = Server(port=0, games=2, accept_timeout=0.2)
+        self.play(server, ["second"])
+        self.assertEqual(server.results, [])
+        self.assertEqual(server.games_started, 0)
+
+    def test_ejects_malformed_joins(self):
+        server = Server(port=0, games=1, accept_timeout=None)
+
+        async def join(payload):
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            await read_frame(reader)
+            writer.write(encode_frame(payload))
+            replies = []
+            while True:
+                frame = await asyncio.wait_for(read_frame(reader), 5)
+                if frame is None:
+                    writer.close()
+                    return replies
+                replies.append(wire.decode(frame)["type"])
+
+        async def run():
+            serving = asyncio.ensure_future(server.serve())
+            while not hasattr(server, "_done") or server.port == 0:
+                await asyncio.sleep(0.01)
+            try:
+                return [
+                    await join(payload)
+                    for payload in (b"[]", b'{"type": "JOIN"}', b'{"type": "JOIN", "name": 1}')
+                ]
+            finally:
+                serving.cancel()
+
+        ejected = [ServerMessage.EJECTED.value]
+        self.assertEqual(asyncio.run(run()), [ejected] * 3)
+        self.assertEqual(server.lobby, [])
+
+    def test_full_games_start_without_waiting(self):
+        server = Server(port=0, games=2, lobby_timeout=60)
+        self.play(server, ["dumb", "second"] * 5)
+
+        self.assertEqual(len(server.results), 2)
+        for referee in server.results:
+            self.assertEqual(len(referee.players), 5)
+            self.assertFalse(referee.active)
+
+    def test_small_game_starts_after_lobby_timeout(self):
+        server = Server(port=0, games=1, lobby_timeout=0.1)
+        self.play(server, ["second"] * 3)
+
+        (referee,) = server.results
+        self.assertEqual(len(referee.players), 3)
+        states = [state for deaths in referee.dead.values() for _, state in deaths]
+        self.assertEqual(len(states), 3)
+        self.assertNotIn(PlayerState.EJECTED, states)
+
+    def test_clients_choose_their_protocol(self):
+        server = Server(port=0, games=1, lobby_timeout=60)
+        options = {0: (False, "json"), 1: (True, "binary"), 2: (False, "binary"), 3: (True, "?")}
+        self.play(server, ["second"] * 5, options)
+
+        (referee,) = server.results
+        codecs = {player.name: player.codec.name for player in referee.players}
+        self.assertEqual(
+            codecs, {"p0": "json", "p1": "binary", "p2": "binary", "p3": "json", "p4": "json"}
+        )
+        states = [state for deaths in referee.dead.values() for _, state in deaths]
+        self.assertNotIn(PlayerState.EJECTED, states)
+
+    def test_times_every_game(self):
+        from Admin.metrics import RefereeMetrics
+
+        server = Server(port=0, games=1, lobby_timeout=60, metrics=RefereeMetrics())
+        self.play(server, ["second"] * 5)
+
+        turns = server.metrics.turns.values[None]
+        phases = server.metrics.phase_seconds.to_json()
+        self.assertEqual(server.metrics.games.values[None], 1)
+        self.assertEqual(phases["next_move"]["count"], turns)
+        # the game states are drained once more at the end of the game
+        self.assertEqual(phases["drain"]["count"], turns + 1)
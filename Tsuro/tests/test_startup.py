@@ -0,0 +1,45 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestStartup(TestCase):
+    def loaded(self, module, heavy, then="pass"):
+        """
+        :param then: optional, code to run after the import
+        :return: which of the heavy modules importing the module, and running
+            the code, loads, and the files it creates
+        """
+        code = (
+            f"import sys, {module}; {then}; "
+            f"print(sorted(m for m in {heavy!r} if m in sys.modules))"
+        )
+        with tempfile.TemporaryDirectory() as cwd:
+            result = subprocess.run(
+                [sys.executable, "-c", code],
+                cwd=cwd,
+                env=dict(os.environ, PYTHONPATH=ROOT),
+                stdout=subprocess.PIPE,
+                check=True,
+            )
+            return result.stdout.decode().strip(), os.listdir(cwd)
+
+    def test_referee_imports_no_optional_modules(self):
+        loaded, files = self.loaded(
+            "Admin.referee", ("asyncio", "logging.config", "multiprocessing", "PIL")
+        )
+        self.assertEqual(loaded, "[]")
+        self.assertEqual(files, [])
+
+    def test_observer_imports_pil_on_render(self):
+        loaded, _ = self.loaded("Admin.observer", ("PIL", "aggdraw"))
+        self.assertEqual(loaded, "[]")
+
+        render = "from Common.board import Board; Admin.observer.render_board(Board(), [])"
+        loaded, _ = self.loaded("Admin.observer", ("PIL", "aggdraw"), then=render)
+        self.assertEqual(loaded, "['PIL', 'aggdraw']")
@@ -0,0 +1,47 @@
+from unittest import TestCase
+
+from Common.constants import Rotation
+from Common.errors import InvalidTileError
+from Common.tiles import FACES, Port, Tile
+
+
+class TestTileFaces(TestCase):
+    def test_every_tile_has_four_faces(self):
+        self.assertEqual(len(FACES), Tile.NUMBER_OF_TILES)
+        for index, faces in enumerate(FACES):
+            with self.subTest(index=index):
+                self.assertEqual([f.rotation for f in faces], list(Rotation))
+                self.assertTrue(all(f.index == index for f in faces))
+
+    def test_exits_are_symmetric(self):
+        for faces in FACES:
+            for face in faces:
+                for port in Port:
+                    exit_port = face.exits[port.value]
+                    self.assertIsNot(exit_port, port)
+                    self.assertIs(face.exits[exit_port.value], port)
+
+    def test_build_shares_faces(self):
+        t1 = Tile.Builder.build(4, Rotation.TWO)
+        t2 = Tile.Builder.build(4, Rotation.TWO)
+        self.assertIsNot(t1, t2)
+        self.assertIs(t1.face, t2.face)
+
+    def test_rotate_by_swaps_face(self):
+        tile = Tile.Builder.build(3)
+        tile.rotate_by(Rotation.THREE)
+        tile.rotate_by(Rotation.TWO)
+        self.assertIs(tile.face, FACES[3][1])
+        self.assertIs(tile.rotation, Rotation.ONE)
+        # the tile it was built from is unaffected
+        self.assertIs(Tile.Builder.build(3).rotation, Rotation.NONE)
+
+    def test_get_exit_port_after_rotation(self):
+        # tile 3 connects B and D, rotating by 90 degrees connects D and F
+        tile = Tile.Builder.build(3, Rotation.ONE)
+        self.assertIs(tile.get_exit_port(Port.D), Port.F)
+        self.assertIs(tile.get_exit_port(Port.F), Port.D)
+
+    def test_build_invalid_index_raises_error(self):
+        with self.assertRaises(InvalidTileError):
+            Tile.Builder.build(Tile.NUMBER_OF_TILES)
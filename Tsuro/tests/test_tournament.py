@@ -0,0 +1,42 @@
+import logging
+from unittest import TestCase
+
+from Admin.tournament import (
+    GameSpec,
+    TournamentStats,
+    play_game,
+    run_tournament,
+    schedule_games,
+    schedule_pairings,
+)
+
+
+class TestTournament(TestCase):
+    def test_play_game_is_repeatable(self):
+        spec = GameSpec(0, 4500, ["second", "second", "dumb"])
+        first, second = play_game(spec), play_game(spec)
+        del first["seconds"], second["seconds"]
+        self.assertEqual(first, second)
+        self.assertEqual(len(first["players"]), 3)
+        self.assertTrue(any(p["winner"] for p in first["players"]))
+
+    def test_schedule_pairings(self):
+        specs = schedule_pairings(["dumb", "second"], players=3, repeat=2)
+        self.assertEqual(len(specs), 8)
+        self.assertEqual(len({s.seed for s in specs}), 8)
+        self.assertEqual(specs[0].strategies, ["dumb", "dumb", "dumb"])
+
+    def test_stats(self):
+        stats = TournamentStats()
+        for result in run_tournament(schedule_games(["dumb", "second"], 5, 3), workers=1):
+            stats.add(result)
+
+        summary = stats.to_json()
+        self.assertEqual(summary["games"], 5)
+        seats = sum(s["seats"] for s in summary["strategies"].values())
+        self.assertEqual(seats, 15)
+
+    def test_logging_is_restored(self):
+        for _ in run_tournament(schedule_games(["dumb"], 1, 3), workers=1):
+            self.assertEqual(logging.root.manager.disable, logging.NOTSET)
+        self.assertEqual(logging.root.manager.disable, logging.NOTSET)
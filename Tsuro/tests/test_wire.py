@@ -0,0 +1,104 @@
+import json
+from unittest import TestCase
+
+from Common import wire
+from Common.board import Board
+from Common.constants import PlayerState, ServerMessage
+from Common.placement import InitialPlacement, IntermediatePlacement
+from Common.tiles import Port, Tile
+
+
+def tile_json(index, rotation, x, y):
+    return {"index": index, "rotation": rotation, "x": x, "y": y}
+
+
+PLAYER = {"color": "red", "tile": tile_json(3, 90, 0, 4), "port": "G", "state": "ALIVE"}
+NEW_PLAYER = {"color": "white", "tile": None, "port": None, "state": None}
+
+
+def board_json():
+    board = Board()
+    board.apply(InitialPlacement(4, 0, "red", 0, 0, "A"))
+    board.apply(IntermediatePlacement(34, 270, "red", 9, 9))
+    return board.readonly().get_json()
+
+
+MESSAGES = [
+    {"type": "ASK_FOR_PLAYER_INFO"},
+    {"type": "RECEIVE_COLOR", "color": "white"},
+    {
+        "type": "RECEIVE_GAME_STATE",
+        "board": board_json(),
+        "players": [PLAYER, NEW_PLAYER],
+        "state": "ALIVE",
+        "tile": tile_json(3, 90, 0, 4),
+        "port": "G",
+    },
+    {
+        "type": "RECEIVE_GAME_STATE",
+        "version": 12,
+        "since": 9,
+        "placements": [tile_json(1, 180, 5, 6), tile_json(0, 0, 9, 0)],
+        "players": [],
+        "state": "COLLIDED",
+        "tile": None,
+        "port": None,
+    },
+    {
+        "type": "ASK_FOR_MOVE",
+        "version": None,
+        "tiles": [tile_json(i, 0, None, None) for i in range(3)],
+    },
+    {"type": "ASK_FOR_MOVE", "board": board_json(), "tiles": [tile_json(2, 0, None, None)]},
+    {"type": "EJECTED", "reason": "Played a tile not found in hand"},
+    {"type": "GAME_END", "results": {"3": [[PLAYER, "DEAD"], [NEW_PLAYER, "EJECTED"]]}},
+    {"type": "JOIN", "name": "p1", "strategy": "second", "state": "delta", "encoding": "binary"},
+    {"type": "MOVE_REQUEST", **InitialPlacement(4, 270, "red", 0, 3, "H").to_json(), "version": 0},
+    {"type": "MOVE_REQUEST", **IntermediatePlacement(7, 90, "blue", 5, 5).to_json()},
+]
+
+
+class TestWire(TestCase):
+    def test_round_trip(self):
+        for msg in MESSAGES:
+            for codec in (wire.JSON, wire.BINARY):
+                with self.subTest(type=msg["type"], codec=codec.name):
+                    payload = codec.encode(msg)
+                    self.assertIs(wire.codec_of(payload), codec)
+                    # decodes to what JSON would decode to
+                    self.assertEqual(wire.decode(payload), json.loads(json.dumps(msg)))
+
+    def test_binary_is_compact(self):
+        msg = MESSAGES[2]
+        self.assertLess(len(wire.BINARY.encode(msg)), len(wire.JSON.encode(msg)) // 5)
+        # a byte per cell of the board
+        self.assertLess(len(wire.BINARY.members({"board": msg["board"]})), Board.SIZE ** 2 + 2)
+
+    def test_shared_members(self):
+        for codec in (wire.JSON, wire.BINARY):
+            with self.subTest(codec=codec.name):
+                shared = codec.members({"board": board_json()})
+                payload = codec.message("ASK_FOR_MOVE", shared, {"tiles": []})
+                self.assertEqual(
+                    wire.decode(payload),
+                    {"type": "ASK_FOR_MOVE", "board": board_json(), "tiles": []},
+                )
+
+    def test_unpacked_members_fall_back_to_json(self):
+        msg = {"type": "EJECTED", "reason": "bad", "extra": [1, {"a": None}], "version": -1}
+        self.assertEqual(wire.decode(wire.BINARY.encode(msg)), msg)
+
+    def test_malformed_binary_messages(self):
+        payload = wire.BINARY.encode(MESSAGES[2])
+        # unknown message types and tags, and cut short messages
+        for malformed in [b"", b"\x00", b"\xfe", b"\x01\x63", payload[:-1], payload[:3]]:
+            with self.subTest(payload=malformed):
+                with self.assertRaises(ValueError):
+                    wire.decode(malformed)
+
+    def test_enumerations_match(self):
+        self.assertEqual(wire._PORTS, tuple(port.name for port in Port))
+        self.assertTrue(set(PlayerState.__members__) <= set(wire._STATES))
+        self.assertLess(len(wire._TYPES), ord("{"))
+        self.assertLess(Tile.NUMBER_OF_TILES * 4, 0xFF)
+        self.assertIn(ServerMessage.GAME_END.value, wire._TYPES)
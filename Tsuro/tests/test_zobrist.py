@@ -0,0 +1,75 @@
+from unittest import TestCase
+
+from Common.board import Board
+from Common.constants import Color
+from Common.placement import InitialPlacement, IntermediatePlacement
+from Common.tiles import Port, Tile
+from Common.zobrist import TranspositionTable
+
+
+class TestBoardKey(TestCase):
+    def test_empty_boards_have_the_same_key(self):
+        self.assertEqual(Board().key, Board().key)
+
+    def test_key_does_not_depend_on_move_order(self):
+        b1, b2 = Board(), Board()
+        b1.add_tile(Tile.Builder.build(3), 4, 4)
+        b1.add_tile(Tile.Builder.build(7), 5, 5)
+        b2.add_tile(Tile.Builder.build(7), 5, 5)
+        b2.add_tile(Tile.Builder.build(3), 4, 4)
+        self.assertEqual(b1.key, b2.key)
+        self.assertNotEqual(b1.key, Board().key)
+
+    def test_key_includes_players(self):
+        b1, b2 = Board(), Board()
+        b1.apply(InitialPlacement(0, 0, "red", 0, 0, "A"))
+        b2.add_tile(Tile.Builder.build(0), 0, 0)
+        self.assertNotEqual(b1.key, b2.key)
+
+        # following the player from their position gives the same key
+        b2.track_player(Color.RED, 0, 0, Port.E)
+        self.assertEqual(b1.key, b2.key)
+
+        # moving the player changes the key
+        b1.apply(IntermediatePlacement(0, 0, "red", 0, 1))
+        b2.add_tile(Tile.Builder.build(0), 0, 1)
+        self.assertEqual(b1.key, b2.key)
+        b2.track_player(Color.RED, 0, 1, Port.F)
+        self.assertEqual(b1.key, b2.key)
+
+    def test_undo_restores_key(self):
+        board = Board()
+        board.apply(InitialPlacement(0, 0, "red", 0, 0, "A"))
+        key = board.key
+        board.apply(IntermediatePlacement(0, 0, "red", 0, 1))
+        board.undo()
+        self.assertEqual(board.key, key)
+        board.undo()
+        self.assertEqual(board.key, Board().key)
+
+
+class TestTranspositionTable(TestCase):
+    def test_lru_evicts_least_recently_used(self):
+        table = TranspositionTable(capacity=2)
+        table.store(1, "a")
+        table.store(2, "b")
+        table.get(1)
+        table.store(3, "c")
+        self.assertNotIn(2, table)
+        self.assertEqual(table.get(1), "a")
+        self.assertEqual(len(table), 2)
+
+    def test_depth_keeps_deeper_entry(self):
+        table = TranspositionTable(capacity=4, policy=TranspositionTable.DEPTH)
+        table.store(1, "deep", depth=3)
+        table.store(5, "shallow", depth=1)
+        self.assertEqual(table.get(1), "deep")
+        self.assertNotIn(5, table)
+        table.store(5, "deeper", depth=4)
+        self.assertEqual(table.get(5), "deeper")
+
+    def test_get_requires_depth(self):
+        table = TranspositionTable()
+        table.store(1, "a", depth=2)
+        self.assertIsNone(table.get(1, depth=3))
+        self.assertEqual(table.get(1, depth=2), "a")